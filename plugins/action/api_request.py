@@ -13,9 +13,21 @@ class ActionModule(ActionBase):
     _supports_async = True
     _PASSTHROUGH_ARGS = frozenset(
         [
+            "api_cache_dir",
+            "api_cache_ttl",
             "api_http_method",
+            "api_job_timeout",
             "api_key",
+            "api_list_workers",
+            "api_page_size",
+            "api_poll_interval",
+            "api_poll_max_interval",
+            "api_pool_size",
+            "api_rate_limit",
+            "api_retries",
             "api_secret",
+            "api_stats",
+            "api_stats_file",
             "api_timeout",
             "api_url",
             "api_verify_ssl_cert",
@@ -57,6 +57,105 @@ options:
     type: bool
     default: true
     version_added: 2.4.0
+  api_cache_ttl:
+    description:
+      - Time in seconds lookups of zones, domains, accounts, projects, networks, VPCs, OS types and hypervisors are cached on disk.
+      - The cache is shared between module runs using the same I(api_url) and I(api_key).
+      - Cached entries of a resource type are invalidated when a module changes a resource of this type or a resource listed with it, e.g. the networks of a VPC.
+      - A value of V(0) disables the cache.
+      - If not given, the C(CLOUDSTACK_CACHE_TTL) env variable is considered.
+    type: int
+    default: 0
+    version_added: 3.4.0
+  api_cache_dir:
+    description:
+      - Directory the lookup cache is stored in, see I(api_cache_ttl).
+      - If not given, the C(CLOUDSTACK_CACHE_DIR) env variable is considered.
+    type: path
+    default: ~/.cache/ansible-cloudstack
+    version_added: 3.4.0
+  api_poll_interval:
+    description:
+      - Initial interval in seconds between polls of an async job result.
+      - The interval is doubled with every poll (with jitter) up to I(api_poll_max_interval).
+      - If not given, the C(CLOUDSTACK_POLL_INTERVAL) env variable is considered.
+    type: float
+    default: 0.5
+    version_added: 3.4.0
+  api_poll_max_interval:
+    description:
+      - Maximum interval in seconds between polls of an async job result.
+      - If not given, the C(CLOUDSTACK_POLL_MAX_INTERVAL) env variable is considered.
+    type: float
+    default: 10
+    version_added: 3.4.0
+  api_job_timeout:
+    description:
+      - Time in seconds to wait for an async job to finish before failing.
+      - A value of V(0) waits without a deadline.
+      - If not given, the C(CLOUDSTACK_JOB_TIMEOUT) env variable is considered.
+    type: int
+    default: 0
+    version_added: 3.4.0
+  api_page_size:
+    description:
+      - Number of items fetched per page when listing resources.
+      - If not given, the C(CLOUDSTACK_PAGE_SIZE) env variable is considered.
+    type: int
+    default: 500
+    version_added: 3.4.0
+  api_list_workers:
+    description:
+      - Number of pages fetched concurrently when listing resources.
+      - The first page is fetched to get the total count, the remaining pages are fetched in parallel.
+      - If not given, the C(CLOUDSTACK_LIST_WORKERS) env variable is considered.
+    type: int
+    default: 4
+    version_added: 3.4.0
+  api_pool_size:
+    description:
+      - Maximum number of HTTP connections to the API kept alive for reuse.
+      - Connections are reused by the requests of a module run, saving a TCP and TLS handshake per request.
+      - Connections are not shared between tasks or hosts, each module run opens its own connections.
+      - Should not be lower than I(api_list_workers).
+      - If not given, the C(CLOUDSTACK_POOL_SIZE) env variable is considered.
+    type: int
+    default: 10
+    version_added: 3.4.0
+  api_rate_limit:
+    description:
+      - Maximum number of requests per second to the API, shared by all tasks and forks using the same API key on the controller.
+      - The state of the limit is stored in I(api_cache_dir).
+      - V(0) disables the limit.
+      - If not given, the C(CLOUDSTACK_RATE_LIMIT) env variable is considered.
+    type: float
+    default: 0
+    version_added: 3.4.0
+  api_retries:
+    description:
+      - Number of retries of a request throttled by the API or failed by a transient error, with an exponential backoff.
+      - Read-only commands, e.g. C(list*), are retried on server errors (HTTP 500, 502, 503 and 504), timeouts and connection errors.
+      - Commands changing resources are only retried if the connection could not be established, as the request may have been processed otherwise.
+      - Errors of CloudStack e.g. HTTP 531 for a denied permission or 537 for an invalid parameter are never retried.
+      - If not given, the C(CLOUDSTACK_RETRIES) env variable is considered.
+    type: int
+    default: 3
+    version_added: 3.4.0
+  api_stats:
+    description:
+      - Whether to record statistics of the requests to the API and the async jobs waited for.
+      - The statistics are returned in C(cloudstack_api_stats), having the number of requests, pages, bytes, the duration and a latency histogram per command and the number, duration and polls of the async jobs.
+      - If the OpenTelemetry API is installed, a span is emitted per request and per async job to the configured tracer provider.
+      - If not given, the C(CLOUDSTACK_STATS) env variable is considered.
+    type: bool
+    default: false
+    version_added: 3.4.0
+  api_stats_file:
+    description:
+      - File the statistics of each request and async job are appended to as JSON lines if I(api_stats) is enabled.
+      - If not given, the C(CLOUDSTACK_STATS_FILE) env variable is considered.
+    type: path
+    version_added: 3.4.0
 requirements:
   - python >= 2.6
   - cs >= 0.9.0
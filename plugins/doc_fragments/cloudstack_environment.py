@@ -31,4 +31,16 @@ options:
   api_verify_ssl_cert:
     env:
       - name: CLOUDSTACK_VERIFY
+  api_pool_size:
+    env:
+      - name: CLOUDSTACK_POOL_SIZE
+  api_rate_limit:
+    env:
+      - name: CLOUDSTACK_RATE_LIMIT
+  api_retries:
+    env:
+      - name: CLOUDSTACK_RETRIES
+  api_cache_dir:
+    env:
+      - name: CLOUDSTACK_CACHE_DIR
 """
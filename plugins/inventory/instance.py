@@ -35,14 +35,21 @@ options:
         - v4_public_ip
         - hostname
   filter_by_zone:
-    description: Only return instances in the provided zone.
-    type: string
+    description:
+      - Only return instances in the provided zones.
+      - Instances of multiple zones are queried concurrently, see I(query_workers).
+    type: list
+    elements: string
   filter_by_domain:
     description: Only return instances in the provided domain.
     type: string
   filter_by_project:
-    description: Only return instances in the provided project.
-    type: string
+    description:
+      - Only return instances in the provided projects.
+      - Instances of multiple projects are queried concurrently, see I(query_workers).
+      - Use V(-1) to return instances of all projects, it can not be combined with other projects.
+    type: list
+    elements: string
   filter_by_vpc:
     description: Only return instances in the provided VPC.
     type: string
@@ -58,9 +65,61 @@ options:
       value:
         description: Tag value to filter by.
         type: string
+  query_workers:
+    description:
+      - Maximum number of concurrent queries for instances, one query is made per combination of I(filter_by_zone) and I(filter_by_project).
+      - Instances returned by multiple queries are only added once.
+    version_added: 3.4.0
+    type: integer
+    default: 4
+  incremental_refresh:
+    description:
+      - Refresh the inventory incrementally based on a snapshot of the last refresh stored in I(snapshot_dir).
+      - Only instances referenced by events since the last refresh are queried and patched into the snapshot.
+      - Events not related to a specific instance, e.g. tag changes, trigger a full refresh.
+      - The events of instances in projects are listed per project of I(filter_by_project).
+      - The CPU usage C(cpu_usage) of unchanged instances is not refreshed.
+      - Requires CloudStack >= 4.17 returning the resource of an event, a full refresh is made otherwise.
+    version_added: 3.4.0
+    type: boolean
+    default: false
+  snapshot_dir:
+    description:
+      - Directory the snapshot for I(incremental_refresh) is stored in.
+    version_added: 3.4.0
+    type: path
+    default: ~/.cache/ansible-cloudstack
+  normalization_template:
+    description:
+      - Jinja2 template to normalize the instance data returned by the API for custom layouts.
+      - The template gets the API data as C(instance) and must render YAML having the normalized data in a top-level key C(instance).
+      - If not set, the instance data is normalized to the default layout without rendering a template.
+    version_added: 3.4.0
+    type: string
+  details:
+    description:
+      - Details of the instances to be returned by the API.
+      - If not given, all details are returned.
+      - Use a subset, e.g. V(nics) and V(tmpl), to reduce the size of the API responses for large numbers of instances.
+      - The details V(nics) are required for the default I(hostname) V(v4_default_ip) and the C(networks) host variable.
+    version_added: 3.4.0
+    type: list
+    elements: string
+    choices: [ all, group, nics, stats, secgrp, tmpl, servoff, diskoff, backoff, iso, volume, min, affgrp ]
+  fields:
+    description:
+      - Host variables to be set for the instances, e.g. V(zone), V(state) or V(tags).
+      - The API data of the instances is trimmed to the data required for these host variables before it is normalized.
+      - The host variables C(name) and the one selected by I(hostname) are always set.
+      - If I(normalization_template) is set, the normalized data is trimmed to these keys instead.
+      - If not given, all host variables are set.
+    version_added: 3.4.0
+    type: list
+    elements: string
 
 extends_documentation_fragment:
   - constructed
+  - inventory_cache
   - ngine_io.cloudstack.cloudstack
   - ngine_io.cloudstack.cloudstack_environment
 """
@@ -74,9 +133,18 @@ plugin: ngine_io.cloudstack.instance
 # Use the default ip as ansible_host
 hostname: v4_default_ip
 
-# Return only instances related to the VPC vpc1 and in the zone EU, having tag mytag.
+# Only get the details and set the host variables required for grouping by zone and state
+details:
+  - nics
+fields:
+  - zone
+  - state
+
+# Return only instances related to the VPC vpc1 and in the zones EU or US, having tag mytag.
 filter_by_vpc: vpc1
-filter_by_zone: EU
+filter_by_zone:
+  - EU
+  - US
 filter_by_tags:
  - key: mytag
    value: mytagvalue
@@ -94,10 +162,17 @@ keyed_groups:
     key: networks
   - prefix: sla
     key: tags.sla
+
+# Cache the instances for an hour, skipping the API on subsequent runs
+cache: true
+cache_plugin: ansible.builtin.jsonfile
+cache_connection: /tmp/cloudstack-inventory
+cache_timeout: 3600
 """
 
 # The J2 Template takes 'instance' object as returned from ACS and returns 'instance' object as returned by
-# This inventory plugin.
+# This inventory plugin. It documents the default layout built by InventoryModule.normalize_instance_data()
+# and may be used as base for a custom normalization_template.
 # The data structure of this inventory has been designed according to the following criteria:
 # - do not duplicate/compete with Ansible instance facts
 # - do not duplicate/compete with Cloudstack facts modules
@@ -165,20 +240,75 @@ instance:
   created: {{ instance.created }}
 """
 
+import json
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import yaml
+from ansible.module_utils._text import to_text
 from ansible.module_utils.basic import missing_required_lib
-from ansible.plugins.inventory import AnsibleError, BaseInventoryPlugin, Constructable
+from ansible.plugins.inventory import AnsibleError, BaseInventoryPlugin, Cacheable, Constructable
 from jinja2 import Template
 
-from ..module_utils.cloudstack import HAS_LIB_CS
+from ..module_utils.cloudstack import HAS_LIB_CS, CloudStackRateLimiter, CloudStackSession, call_api
 
 try:
     from cs import CloudStack
 except ImportError:
     pass
 
-
-class InventoryModule(BaseInventoryPlugin, Constructable):
+# Events changing the data of an instance in the inventory
+INSTANCE_EVENT_TYPES = (
+    "VM.",
+    "NIC.",
+    "STATICNAT.",
+    "CREATE_TAGS",
+    "DELETE_TAGS",
+)
+
+# Number of instances queried by IDs at once on incremental refresh
+INCREMENTAL_CHUNK_SIZE = 100
+
+# The keys of the API data required per host variable of the default normalization
+INSTANCE_FIELDS = {
+    "name": ("name",),
+    "hostname": ("hostname", "name"),
+    "v4_default_ip": ("nic",),
+    "v4_public_ip": ("publicip",),
+    "zone": ("zonename",),
+    "domain": ("domain",),
+    "account": ("account",),
+    "project": ("project",),
+    "username": ("username",),
+    "group": ("group",),
+    "tags": ("tags",),
+    "template": ("templatename",),
+    "service_offering": ("serviceofferingname",),
+    "disk_offering": ("diskofferingname",),
+    "affinity_groups": ("affinitygroup",),
+    "networks": ("nic",),
+    "ha_enabled": ("haenable",),
+    "password_enabled": ("passwordenabled",),
+    "hypervisor": ("hypervisor",),
+    "cpu_speed": ("cpuspeed",),
+    "cpu_number": ("cpunumber",),
+    "memory": ("memory",),
+    "dynamically_scalable": ("isdynamicallyscalable",),
+    "state": ("state",),
+    "cpu_usage": ("cpuused",),
+    "created": ("created",),
+}
+
+# The keys of nested API data required by the default normalization
+INSTANCE_NESTED_FIELDS = {
+    "nic": ("ipaddress", "networkname"),
+    "tags": ("key", "value"),
+    "affinitygroup": ("name",),
+}
+
+
+class InventoryModule(BaseInventoryPlugin, Constructable, Cacheable):
     """InventoryModule"""
 
     NAME = "ngine_io.cloudstack.instance"
@@ -188,28 +318,46 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
         if not HAS_LIB_CS:
             raise AnsibleError(missing_required_lib("cs"))
         self._cs = None
-        self._normalization_template = Template(INVENTORY_NORMALIZATION_J2)
-
-    def init_cs(self):
+        self._session = None
+        self._thread_local = threading.local()
+        self._normalization_templates = {}
+        self._yaml_resolver = yaml.resolver.Resolver()
 
+    def get_api_config(self):
         # The configuration logic matches modules specification
-        api_config = {
+        return {
             "endpoint": self.get_option("api_url"),
             "key": self.get_option("api_key"),
             "secret": self.get_option("api_secret"),
             "timeout": self.get_option("api_timeout"),
             "method": self.get_option("api_http_method"),
             "verify": self.get_option("api_verify_ssl_cert"),
+            "session": self._session,
         }
 
-        self._cs = CloudStack(**api_config)
+    def init_cs(self):
+        # The connections are kept alive and shared by the clients of all query workers
+        rate_limiter = None
+        if self.get_option("api_rate_limit"):
+            rate_limiter = CloudStackRateLimiter(
+                path=self.get_option("api_cache_dir"),
+                rate=self.get_option("api_rate_limit"),
+                endpoint=self.get_option("api_url"),
+                api_key=self.get_option("api_key"),
+            )
+        self._session = CloudStackSession(
+            pool_size=max(self.get_option("query_workers") or 1, self.get_option("api_pool_size") or 1),
+            rate_limiter=rate_limiter,
+            retries=self.get_option("api_retries"),
+        )
+        self._cs = CloudStack(**self.get_api_config())
 
     @property
     def cs(self):
         return self._cs
 
     def query_api(self, command, **args):
-        res = getattr(self.cs, command)(**args)
+        res = call_api(self.cs, command, args, retries=self.get_option("api_retries") or 0)
 
         if "errortext" in res:
             raise AnsibleError(res["errortext"])
@@ -225,6 +373,20 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
                 valid = True
         return valid
 
+    def get_filter_ids(self, filter_option, query):
+        ids = []
+        searches = [to_text(search) for search in self.get_option("filter_by_" + filter_option) or []]
+        if searches:
+            # we return all items related to the query involved in the filtering
+            result = self.query_api(query, listItems=True)
+            for search in searches:
+                # if we find the searched value as either an id or a name
+                found = [item["id"] for item in result.get(filter_option, []) if search in [item["id"], item["name"]]]
+                if not found:
+                    raise AnsibleError("Could not apply filter_by_{fo}. No {fo} with id or name {s} found".format(fo=filter_option, s=search))
+                ids.append(found[-1])
+        return ids
+
     def add_filter(self, args, filter_option, query, arg):
         # is there a value to filter by? we will search with it
         search = self.get_option("filter_by_" + filter_option)
@@ -244,29 +406,164 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
         return args
 
     def get_filters(self):
+        """Return the query arguments per combination of zone and project to be queried."""
         # Filtering as supported by ACS goes here
         args = {
             "tags": self.get_option("filter_by_tags"),
+            "details": self.get_option("details"),
             "fetch_list": True,
         }
+        self.add_filter(args, "domain", "listDomains", "domainid")
+        self.add_filter(args, "vpc", "listVPCs", "vpcid")
 
+        project_ids = [None]
         if self.get_option("filter_by_project"):
-            if self.get_option("filter_by_project") == "-1":
+            projects = [to_text(project) for project in self.get_option("filter_by_project")]
+            if "-1" in projects:
                 # if the project is set to -1, we want to get all instances of any project
-                args["projectid"] = "-1"
+                if len(set(projects)) > 1:
+                    raise AnsibleError("Could not apply filter_by_project. The project -1 of all projects can not be combined with other projects")
+                project_ids = ["-1"]
             else:
-                self.add_filter(args, "project", "listProjects", "projectid")
-        self.add_filter(args, "domain", "listDomains", "domainid")
-        self.add_filter(args, "zone", "listZones", "zoneid")
-        self.add_filter(args, "vpc", "listVPCs", "vpcid")
-
-        return args
+                project_ids = self.get_filter_ids("project", "listProjects")
+        zone_ids = self.get_filter_ids("zone", "listZones") or [None]
+
+        filters = []
+        for project_id in project_ids:
+            for zone_id in zone_ids:
+                filters.append(dict(args, projectid=project_id, zoneid=zone_id))
+        return filters
+
+    def _query_instances(self, args):
+        # The client is not shared between threads
+        if not hasattr(self._thread_local, "cs"):
+            self._thread_local.cs = CloudStack(**self.get_api_config())
+        res = call_api(self._thread_local.cs, "listVirtualMachines", args, retries=self.get_option("api_retries") or 0)
+        if "errortext" in res:
+            raise AnsibleError(res["errortext"])
+        return res
 
-    def normalize_instance_data(self, instance):
-        inventory_instance_str = self._normalization_template.render(instance=instance)
+    def get_fields(self):
+        """Return the host variables to be set, None for all."""
+        fields = self.get_option("fields")
+        if not fields:
+            return None
+        return set(fields) | set(["name", self.get_option("hostname")])
+
+    def get_instance_keys(self):
+        """Return the keys of the API data required for the host variables, None for all."""
+        fields = self.get_fields()
+        if fields is None or self.get_option("normalization_template"):
+            return None
+
+        unknown = sorted(fields - set(INSTANCE_FIELDS))
+        if unknown:
+            raise AnsibleError("Unknown fields: %s. Valid fields are: %s" % (", ".join(unknown), ", ".join(sorted(INSTANCE_FIELDS))))
+
+        # The ID is required to merge the instances of multiple queries
+        keys = set(["id"])
+        for field in fields:
+            keys.update(INSTANCE_FIELDS[field])
+        return keys
+
+    def trim_instance_data(self, instance, keys):
+        trimmed = {}
+        for key in keys:
+            if key not in instance:
+                continue
+            value = instance[key]
+            if key in INSTANCE_NESTED_FIELDS and isinstance(value, list):
+                value = [dict((k, item[k]) for k in INSTANCE_NESTED_FIELDS[key] if k in item) for item in value]
+            trimmed[key] = value
+        return trimmed
+
+    def render_instance_data(self, instance, template=INVENTORY_NORMALIZATION_J2):
+        if template not in self._normalization_templates:
+            self._normalization_templates[template] = Template(template)
+        inventory_instance_str = self._normalization_templates[template].render(instance=instance)
         inventory_instance = yaml.load(inventory_instance_str, Loader=yaml.FullLoader)
         return inventory_instance["instance"]
 
+    def _to_scalar(self, value):
+        # Values are typed as if rendered into the YAML template and parsed back
+        if value is None:
+            return "None"
+        if not isinstance(value, str):
+            return value
+        value = value.strip()
+        if self._yaml_resolver.resolve(yaml.ScalarNode, value, (True, False)) == "tag:yaml.org,2002:str":
+            return value
+        try:
+            return yaml.load(value, Loader=yaml.FullLoader)
+        except yaml.YAMLError:
+            return value
+
+    def _get_scalar(self, instance, key, lower=False):
+        # Missing keys are rendered as empty value in the YAML template
+        if key not in instance:
+            return None
+        if lower:
+            return self._to_scalar(to_text(instance[key]).lower())
+        return self._to_scalar(instance[key])
+
+    def normalize_instance_data(self, instance):
+        template = self.get_option("normalization_template")
+        if template:
+            inventory_instance = self.render_instance_data(instance, template=template)
+        else:
+            inventory_instance = self.map_instance_data(instance)
+
+        fields = self.get_fields()
+        if fields is None:
+            return inventory_instance
+        return dict((key, value) for key, value in inventory_instance.items() if key in fields)
+
+    def map_instance_data(self, instance):
+        scalar = self._get_scalar
+        nics = instance.get("nic") or []
+        inventory_instance = {
+            "name": scalar(instance, "name"),
+            "hostname": self._to_scalar(instance["hostname"]) if instance.get("hostname") else scalar(instance, "name", lower=True),
+            "v4_default_ip": scalar(nics[0], "ipaddress") if nics else None,
+        }
+        if instance.get("publicip"):
+            inventory_instance["v4_public_ip"] = scalar(instance, "publicip")
+
+        inventory_instance["zone"] = scalar(instance, "zonename")
+        inventory_instance["domain"] = scalar(instance, "domain", lower=True)
+        inventory_instance["account"] = scalar(instance, "account")
+        if instance.get("project"):
+            inventory_instance["project"] = scalar(instance, "project")
+
+        inventory_instance["username"] = scalar(instance, "username")
+        if instance.get("group"):
+            inventory_instance["group"] = scalar(instance, "group")
+
+        if instance.get("tags"):
+            inventory_instance["tags"] = dict((scalar(tag, "key"), scalar(tag, "value")) for tag in instance["tags"])
+
+        inventory_instance["template"] = scalar(instance, "templatename")
+        inventory_instance["service_offering"] = scalar(instance, "serviceofferingname")
+        if "diskofferingname" in instance:
+            inventory_instance["disk_offering"] = scalar(instance, "diskofferingname")
+        if instance.get("affinitygroup"):
+            inventory_instance["affinity_groups"] = [scalar(ag, "name") for ag in instance["affinitygroup"]]
+        inventory_instance["networks"] = [scalar(nic, "networkname") for nic in nics] or None
+
+        inventory_instance["ha_enabled"] = scalar(instance, "haenable")
+        inventory_instance["password_enabled"] = scalar(instance, "passwordenabled")
+
+        inventory_instance["hypervisor"] = scalar(instance, "hypervisor", lower=True)
+        inventory_instance["cpu_speed"] = scalar(instance, "cpuspeed")
+        inventory_instance["cpu_number"] = scalar(instance, "cpunumber")
+        inventory_instance["memory"] = scalar(instance, "memory")
+        inventory_instance["dynamically_scalable"] = scalar(instance, "isdynamicallyscalable")
+
+        inventory_instance["state"] = scalar(instance, "state")
+        inventory_instance["cpu_usage"] = scalar(instance, "cpuused")
+        inventory_instance["created"] = scalar(instance, "created")
+        return inventory_instance
+
     def parse(self, inventory, loader, path, cache=False):
 
         # call base method to ensure properties are available for use with other helper methods
@@ -275,23 +572,181 @@ class InventoryModule(BaseInventoryPlugin, Constructable):
         # This is the inventory Config
         self._read_config_data(path)
 
+        # Use the cached normalized instances if the inventory is refreshed on cache miss only
+        cache_key = self.get_cache_key(path)
+        user_cache_setting = self.get_option("cache")
+        attempt_to_read_cache = user_cache_setting and cache
+        cache_needs_update = user_cache_setting and not cache
+
+        instances = None
+        if attempt_to_read_cache:
+            try:
+                instances = self._cache[cache_key]
+            except KeyError:
+                cache_needs_update = True
+
+        if instances is None:
+            if self.get_option("incremental_refresh"):
+                instances = self.get_instances_incremental(path)
+            else:
+                instances = self.get_instances()
+
+        if cache_needs_update:
+            self._cache[cache_key] = instances
+
+        self.populate(instances)
+
+    def list_instances(self, filters):
+        # Retrieve the filtered list of instances, one query per zone and project
+        if len(filters) == 1:
+            results = [self.query_api("listVirtualMachines", **filters[0])]
+        else:
+            with ThreadPoolExecutor(max_workers=max(self.get_option("query_workers") or 1, 1)) as executor:
+                results = list(executor.map(self._query_instances, filters))
+
+        # Merge the results, instances may be returned by multiple queries
+        keys = self.get_instance_keys()
+        instances = []
+        instance_ids = set()
+        while results:
+            # Release the API data of each query as soon as it has been trimmed
+            for instance in results.pop(0):
+                if instance["id"] not in instance_ids:
+                    instance_ids.add(instance["id"])
+                    instances.append(instance if keys is None else self.trim_instance_data(instance, keys))
+        return instances
+
+    def get_instances(self):
         # We Initialize the query_api
         self.init_cs()
 
+        return [self.normalize_instance_data(instance) for instance in self.list_instances(self.get_filters())]
+
+    def get_event_project_ids(self, filters):
+        """Return the projects to list the events of, as the events of projects are only listed by project."""
+        return sorted(set(args["projectid"] for args in filters if args.get("projectid"))) or [None]
+
+    def get_latest_event(self, project_ids):
+        events = []
+        for project_id in project_ids:
+            # Events are listed by date descending
+            res = self.query_api("listEvents", listall=True, projectid=project_id, page=1, pagesize=1)
+            events.extend(res.get("event") or [])
+        return max(events, key=lambda event: event["created"]) if events else None
+
+    def get_changed_instance_ids(self, last_event, project_ids):
+        """Return the IDs of instances changed since the last event and the latest event.
+
+        Returns None if changes can not be related to instances.
+        """
+        # Event dates are returned in the time zone of the management server, as the start date is interpreted.
+        args = {
+            "startdate": last_event["created"][:19].replace("T", " "),
+            "listall": True,
+            "fetch_list": True,
+        }
+        events = []
+        for project_id in project_ids:
+            events.extend(self.query_api("listEvents", projectid=project_id, **args) or [])
+
+        instance_ids = []
+        for event in events:
+            if event["id"] == last_event["id"] or not event.get("type", "").startswith(INSTANCE_EVENT_TYPES):
+                continue
+            if event.get("resourcetype") != "VirtualMachine" or not event.get("resourceid"):
+                return None
+            if event["resourceid"] not in instance_ids:
+                instance_ids.append(event["resourceid"])
+
+        latest_event = max(events + [last_event], key=lambda event: event["created"])
+        return instance_ids, latest_event
+
+    def get_snapshot_file(self, path):
+        return os.path.join(os.path.expanduser(self.get_option("snapshot_dir")), "%s.json" % self.get_cache_key(path))
+
+    def get_snapshot_options(self):
+        # The snapshot must not be used if options affecting the instances changed
+        options = [
+            "api_url",
+            "filter_by_zone",
+            "filter_by_domain",
+            "filter_by_project",
+            "filter_by_vpc",
+            "filter_by_tags",
+            "normalization_template",
+            "details",
+            "fields",
+        ]
+        return json.dumps(dict((option, self.get_option(option)) for option in options), sort_keys=True, default=str)
+
+    def load_snapshot(self, snapshot_file):
+        try:
+            with open(snapshot_file) as f:
+                snapshot = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if snapshot.get("options") != self.get_snapshot_options() or not snapshot.get("last_event"):
+            return None
+        return snapshot
+
+    def save_snapshot(self, snapshot_file, last_event, instances):
+        snapshot = {
+            "options": self.get_snapshot_options(),
+            "last_event": last_event,
+            "instances": instances,
+        }
+        snapshot_dir = os.path.dirname(snapshot_file)
+        if not os.path.isdir(snapshot_dir):
+            os.makedirs(snapshot_dir, mode=0o700)
+        tmp_file = "%s.%s.tmp" % (snapshot_file, os.getpid())
+        with open(tmp_file, "w") as f:
+            json.dump(snapshot, f)
+        os.replace(tmp_file, snapshot_file)
+
+    def get_instances_incremental(self, path):
+        # We Initialize the query_api
+        self.init_cs()
+
+        filters = self.get_filters()
+        project_ids = self.get_event_project_ids(filters)
+        snapshot_file = self.get_snapshot_file(path)
+        snapshot = self.load_snapshot(snapshot_file)
+
+        changes = None
+        if snapshot:
+            changes = self.get_changed_instance_ids(snapshot["last_event"], project_ids)
+
+        if changes is not None:
+            instance_ids, last_event = changes
+            instances = snapshot["instances"]
+
+            # Query the changed instances in chunks, instances not returned anymore have been removed
+            for i in range(0, len(instance_ids), INCREMENTAL_CHUNK_SIZE):
+                chunk = instance_ids[i : i + INCREMENTAL_CHUNK_SIZE]
+                found = dict((instance["id"], instance) for instance in self.list_instances([dict(args, ids=chunk) for args in filters]))
+                for instance_id in chunk:
+                    if instance_id in found:
+                        instances[instance_id] = self.normalize_instance_data(found[instance_id])
+                    else:
+                        instances.pop(instance_id, None)
+        else:
+            # Get the latest event before listing to not miss any change in between
+            last_event = self.get_latest_event(project_ids)
+            instances = dict((instance["id"], self.normalize_instance_data(instance)) for instance in self.list_instances(filters))
+
+        if last_event:
+            self.save_snapshot(snapshot_file, last_event, instances)
+        return list(instances.values())
+
+    def populate(self, instances):
         # All Hosts from
         self.inventory.add_group("cloudstack")
 
         # The ansible_host preference
         hostname_preference = self.get_option("hostname")
 
-        # Retrieve the filtered list of instances
-        instances = self.query_api("listVirtualMachines", **self.get_filters())
-
         for instance in instances:
 
-            # we normalize the instance data using the embedded J2 template
-            instance = self.normalize_instance_data(instance)
-
             inventory_name = instance["name"]
             self.inventory.add_host(inventory_name, group="cloudstack")
 
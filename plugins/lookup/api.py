@@ -9,19 +9,68 @@ name: api
 author: Lorenzo Tanganelli (@tanganellilore)
 short_description: Iteract with the Cloudstack API via lookup
 requirements:
-  - None
+  - jmespath (for I(query))
 description:
   - Returns GET requests from the Cloudstack API.
+  - If one of I(page), I(pagesize), I(max_items), I(fields) or I(query) is given, the items of a list command are returned
+    instead of the raw response. The pages are fetched one after the other and the items are trimmed as they arrive.
 options:
   _terms:
     description:
       - The endpoint to query, i.e. listUserData, listVirtualMachines, etc.
+      - To query multiple endpoints concurrently, a list of endpoints, a list of dicts with the keys C(command), C(query_params)
+        and optionally C(name), or a dict of names and dicts with the keys C(command) and C(query_params).
+      - The responses of multiple endpoints are returned as a dict by the C(name) or the endpoint.
     required: True
   query_params:
     description:
       - The query parameters to search for in the form of key/value pairs.
+      - Used as defaults of the C(query_params) of multiple endpoints.
     type: dict
     required: False
+  page:
+    description:
+      - Only return the items of this page, counted from V(1).
+      - By default all pages are fetched.
+    type: int
+    version_added: 3.4.0
+  pagesize:
+    description:
+      - Number of items fetched per request.
+      - Defaults to V(500) or I(max_items) if lower.
+    type: int
+    version_added: 3.4.0
+  max_items:
+    description:
+      - Stop fetching pages after this number of items.
+    type: int
+    version_added: 3.4.0
+  fields:
+    description:
+      - Only keep these keys of the items.
+    type: list
+    elements: str
+    version_added: 3.4.0
+  query:
+    description:
+      - JMESPath expression applied on the list of items, after I(fields) and I(max_items).
+    type: str
+    version_added: 3.4.0
+  cache:
+    description:
+      - Whether to memoize the response of list, get and query commands in the controller process.
+      - Lookups in C(vars) are evaluated each time the variable is referenced, the response is queried only once per I(cache_ttl).
+      - Responses are cached by I(api_url), I(api_key), command and I(query_params).
+      - A memoized response may be outdated by up to I(cache_ttl) seconds, do not enable it for lookups waiting for a state change, e.g. in C(until) loops.
+    type: bool
+    default: false
+    version_added: 3.4.0
+  cache_ttl:
+    description:
+      - Time in seconds a memoized response is used, see I(cache).
+    type: int
+    default: 60
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 notes:
@@ -40,23 +89,77 @@ EXAMPLES = """
 - name: List specific Virtual Machines from the API
   set_fact:
     virtual_machines: "{{ lookup('ngine_io.cloudstack.api', 'listVirtualMachines', query_params={ 'name': 'myvmname' }) }}"
+
+- name: List the names and states of the first 100 Virtual Machines
+  set_fact:
+    virtual_machines: "{{ query('ngine_io.cloudstack.api', 'listVirtualMachines', query_params={ 'listall': true }, max_items=100, fields=['name', 'state']) }}"
+
+- name: List the names of the running Virtual Machines
+  set_fact:
+    virtual_machines: "{{ query('ngine_io.cloudstack.api', 'listVirtualMachines', query_params={ 'listall': true }, query=\"[?state=='Running'].name\") }}"
+
+- name: List networks, VPCs, zones and service offerings at once
+  set_fact:
+    cloud: "{{ lookup('ngine_io.cloudstack.api', specs, query_params={ 'zoneid': zone_id }, fields=['id', 'name']) }}"
+  vars:
+    specs:
+      networks:
+        command: listNetworks
+      vpcs:
+        command: listVPCs
+      zones:
+        command: listZones
+        query_params:
+          id: "{{ zone_id }}"
+      service_offerings:
+        command: listServiceOfferings
+        query_params: {}
+
+- name: Query the zones once for a variable referenced many times
+  debug:
+    msg: "{{ zones }}"
+  vars:
+    zones: "{{ lookup('ngine_io.cloudstack.api', 'listZones', cache=true, cache_ttl=300) }}"
 """
 
 RETURN = """
 _raw:
   description:
     - Response from the API
+    - The items of the list command if one of I(page), I(pagesize), I(max_items), I(fields) or I(query) is given.
+    - A dict of the responses by name if multiple endpoints are given.
   type: dict
   returned: on successful request
 """
 
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+
 from ansible.plugins.lookup import LookupBase
 from ansible.errors import AnsibleError
 from ansible.module_utils._text import to_native
+from ansible.module_utils.six import string_types
 from ansible.utils.display import Display
 
+try:
+    import jmespath
+
+    HAS_LIB_JMESPATH = True
+except ImportError:
+    HAS_LIB_JMESPATH = False
+
+from ..module_utils.cloudstack import is_read_only_command
 from ..module_utils.cloudstack_api import AnsibleCloudStackAPI
 
+LIST_OPTIONS = ("page", "pagesize", "max_items", "fields", "query")
+
+# Responses memoized in the controller process, see the cache option
+_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
 
 class LookupModule(LookupBase):
     display = Display()
@@ -67,9 +170,85 @@ class LookupModule(LookupBase):
     def warn_callback(self, warning):
         self.display.warning(warning)
 
+    def query_api(self, module, command, args):
+        return module.query_api(command, **args)
+
+    def query_items(self, module, command, args):
+        max_items = self.get_option("max_items")
+        fields = self.get_option("fields")
+        query = self.get_option("query")
+        if query and not HAS_LIB_JMESPATH:
+            raise AnsibleError("You need to install jmespath prior to using the query option")
+
+        items = module.query_api_iter(command, page=self.get_option("page"), page_size=self.get_option("pagesize") or min(500, max_items or 500), **args)
+        if max_items:
+            items = islice(items, max_items)
+        if fields:
+            items = (dict((k, item[k]) for k in fields if k in item) for item in items)
+        items = list(items)
+
+        if query:
+            return jmespath.search(query, items)
+        return items
+
+    def query_api_cached(self, query, module, command, args):
+        options = [self.get_option(option) for option in LIST_OPTIONS]
+        key = json.dumps([module.api_url, module.api_key, command, args, options], sort_keys=True, default=str)
+        now = time.time()
+        with _CACHE_LOCK:
+            entry = _CACHE.get(key)
+            if entry and entry[0] > now:
+                return entry[1]
+
+            # Drop expired entries while we are at it
+            for k in [k for k, v in _CACHE.items() if v[0] <= now]:
+                del _CACHE[k]
+
+        res = query(module, command, args)
+        with _CACHE_LOCK:
+            _CACHE[key] = (now + self.get_option("cache_ttl"), res)
+        return res
+
+    def query(self, module, command, args):
+        if any(self.get_option(option) is not None for option in LIST_OPTIONS):
+            query = self.query_items
+        else:
+            query = self.query_api
+
+        if self.get_option("cache") and is_read_only_command(command):
+            return self.query_api_cached(query, module, command, args)
+        return query(module, command, args)
+
+    def get_specs(self, terms):
+        """Return the specs of multiple endpoints by the keys of the result."""
+        if len(terms) == 1 and isinstance(terms[0], (list, dict)):
+            terms = terms[0]
+
+        if isinstance(terms, dict) and "command" in terms:
+            terms = [terms]
+
+        if isinstance(terms, dict):
+            items = terms.items()
+        else:
+            items = ((spec.get("name") or spec.get("command"), spec) if isinstance(spec, dict) else (spec, spec) for spec in terms)
+
+        specs = {}
+        for key, spec in items:
+            if isinstance(spec, string_types):
+                spec = {"command": spec}
+            if not isinstance(spec, dict) or not spec.get("command"):
+                raise AnsibleError("Missing command to query for %s" % key)
+            if key in specs:
+                raise AnsibleError("Duplicate endpoint %s, use a unique name" % key)
+            specs[key] = spec
+
+        if not specs:
+            raise AnsibleError("You must pass at least one endpoint to query")
+        return specs
+
     def run(self, terms, variables=None, **kwargs):
-        if len(terms) != 1:
-            raise AnsibleError("You must pass exactly one endpoint to query")
+        if not terms:
+            raise AnsibleError("You must pass at least one endpoint to query")
 
         self.set_options(direct=kwargs)
 
@@ -79,11 +258,19 @@ class LookupModule(LookupBase):
         if self.get_option("query_params"):
             args.update(self.get_option("query_params", {}))
 
-        res = module.query_api(terms[0], **args)
+        if len(terms) != 1 or not isinstance(terms[0], string_types):
+            specs = self.get_specs(terms)
+            with ThreadPoolExecutor(max_workers=max(1, min(len(specs), int(module.api_pool_size)))) as executor:
+                futures = dict(
+                    (key, executor.submit(self.query, module, spec["command"], dict(args, **(spec.get("query_params") or {})))) for key, spec in specs.items()
+                )
+                return [dict((key, future.result()) for key, future in futures.items())]
+
+        res = self.query(module, terms[0], args)
 
         if res is None:
             return []
         if isinstance(res, list):
-            return res
+            return list(res)
 
         return [res]
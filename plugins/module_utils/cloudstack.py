@@ -7,10 +7,21 @@ from __future__ import absolute_import, division, print_function
 __metaclass__ = type
 
 
+import fcntl
+import hashlib
+import json
+import math
 import os
+import random
+import re
+import shutil
 import sys
+import threading
 import time
 import traceback
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import parse_qsl, urlsplit
 
 from ansible.module_utils._text import to_native, to_text
 from ansible.module_utils.basic import env_fallback, missing_required_lib
@@ -18,12 +29,24 @@ from ansible.module_utils.basic import env_fallback, missing_required_lib
 CS_IMP_ERR = None
 try:
     from cs import CloudStack, CloudStackException
+    from requests import Response, Session
+    from requests.adapters import HTTPAdapter
+    from requests.exceptions import ConnectionError as RequestsConnectionError
+    from requests.exceptions import ConnectTimeout, RequestException
+    from requests.structures import CaseInsensitiveDict
+    from urllib3.exceptions import ConnectTimeoutError
 
     HAS_LIB_CS = True
 except ImportError:
     CS_IMP_ERR = traceback.format_exc()
     HAS_LIB_CS = False
 
+try:
+    from opentelemetry import trace
+
+    HAS_LIB_OTEL = True
+except ImportError:
+    HAS_LIB_OTEL = False
 
 if sys.version_info > (3,):
     long = int
@@ -38,6 +61,18 @@ def cs_argument_spec():
         api_timeout=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_TIMEOUT"]), default=10),
         api_verify_ssl_cert=dict(type="str", fallback=(env_fallback, ["CLOUDSTACK_VERIFY"])),
         validate_certs=dict(type="bool", fallback=(env_fallback, ["CLOUDSTACK_DANGEROUS_NO_TLS_VERIFY"]), default=True),
+        api_cache_ttl=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_CACHE_TTL"]), default=0),
+        api_cache_dir=dict(type="path", fallback=(env_fallback, ["CLOUDSTACK_CACHE_DIR"]), default="~/.cache/ansible-cloudstack"),
+        api_poll_interval=dict(type="float", fallback=(env_fallback, ["CLOUDSTACK_POLL_INTERVAL"]), default=0.5),
+        api_poll_max_interval=dict(type="float", fallback=(env_fallback, ["CLOUDSTACK_POLL_MAX_INTERVAL"]), default=10),
+        api_job_timeout=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_JOB_TIMEOUT"]), default=0),
+        api_page_size=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_PAGE_SIZE"]), default=500),
+        api_list_workers=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_LIST_WORKERS"]), default=4),
+        api_pool_size=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_POOL_SIZE"]), default=10),
+        api_rate_limit=dict(type="float", fallback=(env_fallback, ["CLOUDSTACK_RATE_LIMIT"]), default=0),
+        api_retries=dict(type="int", fallback=(env_fallback, ["CLOUDSTACK_RETRIES"]), default=3),
+        api_stats=dict(type="bool", fallback=(env_fallback, ["CLOUDSTACK_STATS"]), default=False),
+        api_stats_file=dict(type="path", fallback=(env_fallback, ["CLOUDSTACK_STATS_FILE"])),
     )
 
 
@@ -45,6 +80,486 @@ def cs_required_together():
     return []
 
 
+# Commands not changing any state, safe to be cached or repeated.
+READ_ONLY_COMMAND_PREFIXES = ("list", "get", "query")
+
+
+def is_read_only_command(command):
+    return command.startswith(READ_ONLY_COMMAND_PREFIXES)
+
+
+def get_backoff_delay(attempt, max_delay=30):
+    """Return the exponential backoff delay with jitter before the retry of an attempt."""
+    delay = min(2**attempt, max_delay)
+    return random.uniform(delay / 2.0, delay)
+
+
+def is_not_sent_error(e):
+    """Return True if the request failed before it was sent, e.g. the connection was refused."""
+    if isinstance(e, ConnectTimeout):
+        return True
+    if isinstance(e, RequestsConnectionError) and e.args:
+        return isinstance(getattr(e.args[0], "reason", e.args[0]), ConnectTimeoutError)
+    return False
+
+
+# HTTP status codes of gateway and server errors, CloudStack uses 53x and 570 for permanent errors
+# e.g. 531 for permission denied or 537 for an invalid parameter value.
+TRANSIENT_STATUS_CODES = (500, 502, 503, 504)
+
+
+def is_transient_error(e):
+    """Return True for errors of the server or the network likely to succeed on retry."""
+    if isinstance(e, CloudStackException):
+        response = getattr(e, "response", None)
+        return response is not None and response.status_code in TRANSIENT_STATUS_CODES
+    return isinstance(e, RequestException)
+
+
+def call_api(client, command, args, retries=0):
+    """Call a command of the API, transient errors are retried with backoff.
+
+    Read-only commands are retried on any transient error, mutating commands only
+    if the request was not sent, as it may have been processed otherwise.
+    """
+    attempt = 0
+    while True:
+        try:
+            return getattr(client, command)(**args)
+        except Exception as e:
+            if attempt >= retries:
+                raise
+            if not (is_not_sent_error(e) or (is_read_only_command(command) and is_transient_error(e))):
+                raise
+        time.sleep(get_backoff_delay(attempt))
+        attempt += 1
+
+
+# Cached list commands of resources embedding the resources changed by a command,
+# invalidated in addition to the list command of the resource type, e.g. a VPC lists its networks.
+CACHE_RELATED_LIST_COMMANDS = {
+    "createNetwork": ["listVPCs"],
+    "updateNetwork": ["listVPCs"],
+    "deleteNetwork": ["listVPCs"],
+    "restartNetwork": ["listVPCs"],
+    "replaceNetworkACLList": ["listNetworks", "listVPCs"],
+    "deleteVPC": ["listNetworks"],
+    "deployVirtualMachine": ["listNics"],
+    "destroyVirtualMachine": ["listNics"],
+    "expungeVirtualMachine": ["listNics"],
+    "addNicToVirtualMachine": ["listNics", "listVirtualMachines"],
+    "removeNicFromVirtualMachine": ["listNics", "listVirtualMachines"],
+    "updateDefaultNicForVirtualMachine": ["listNics", "listVirtualMachines"],
+    "createUser": ["listAccounts"],
+    "updateUser": ["listAccounts"],
+    "deleteUser": ["listAccounts"],
+    "enableUser": ["listAccounts"],
+    "disableUser": ["listAccounts"],
+    "lockUser": ["listAccounts"],
+    "addAccountToProject": ["listProjects"],
+    "deleteAccountFromProject": ["listProjects"],
+}
+
+
+class CloudStackLookupCache:
+    """File based cache with TTL for list queries, shared between module processes.
+
+    Entries are namespaced by endpoint and API key and stored per list command,
+    so a mutating command is able to drop all entries of the resource type it touches.
+    """
+
+    def __init__(self, path, ttl, endpoint, api_key):
+        self.ttl = ttl
+        namespace = hashlib.sha256(to_text("%s|%s" % (endpoint, api_key)).encode("utf-8")).hexdigest()
+        self.path = os.path.join(os.path.expanduser(path), namespace)
+        self.lock_file = os.path.join(self.path, ".lock")
+
+    @contextmanager
+    def _lock(self, exclusive=False):
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, mode=0o700)
+        with open(self.lock_file, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def _get_file(self, command, args):
+        args = dict((k, v) for k, v in args.items() if v is not None)
+        key = hashlib.sha256(to_text(json.dumps([command, args], sort_keys=True, default=str)).encode("utf-8")).hexdigest()
+        return os.path.join(self.path, command.lower(), key + ".json")
+
+    def get(self, command, args):
+        cache_file = self._get_file(command, args)
+        try:
+            with self._lock():
+                with open(cache_file) as f:
+                    entry = json.load(f)
+        except (IOError, OSError, ValueError):
+            return None
+        if entry.get("expires", 0) < time.time():
+            return None
+        return entry.get("data")
+
+    def set(self, command, args, data):
+        cache_file = self._get_file(command, args)
+        entry = {
+            "expires": time.time() + self.ttl,
+            "data": data,
+        }
+        try:
+            with self._lock(exclusive=True):
+                cache_dir = os.path.dirname(cache_file)
+                if not os.path.isdir(cache_dir):
+                    os.makedirs(cache_dir, mode=0o700)
+                tmp_file = "%s.%s.tmp" % (cache_file, os.getpid())
+                with open(tmp_file, "w") as f:
+                    json.dump(entry, f)
+                os.rename(tmp_file, cache_file)
+        except (IOError, OSError, TypeError, ValueError):
+            pass
+
+    def invalidate(self, command):
+        """Drop the cached list queries of the resource type a mutating command is related to,
+        e.g. createZone and updateZone invalidate listZones, and of the resources embedding it,
+        e.g. createNetwork invalidates listVPCs."""
+        prefixes = [related.lower() for related in CACHE_RELATED_LIST_COMMANDS.get(command, [])]
+        match = re.match(r"^[a-z]+([A-Z]\w*)$", command)
+        if match:
+            prefixes.append("list" + match.group(1).lower())
+        if not prefixes:
+            return
+        try:
+            with self._lock(exclusive=True):
+                for name in os.listdir(self.path):
+                    if name.startswith(tuple(prefixes)):
+                        shutil.rmtree(os.path.join(self.path, name), ignore_errors=True)
+        except (IOError, OSError):
+            pass
+
+
+class CloudStackRateLimiter:
+    """Token bucket limiting the requests per second to the API, shared between module processes.
+
+    The bucket is namespaced by endpoint and API key and its state is stored in a file locked on access.
+    """
+
+    def __init__(self, path, rate, endpoint, api_key):
+        self.rate = float(rate)
+        self.burst = max(self.rate, 1.0)
+        namespace = hashlib.sha256(to_text("%s|%s" % (endpoint, api_key)).encode("utf-8")).hexdigest()
+        self.path = os.path.expanduser(path)
+        self.state_file = os.path.join(self.path, "ratelimit-%s" % namespace)
+
+    def _take(self):
+        """Take a token from the bucket, return the seconds to wait for the next token if empty."""
+        if not os.path.isdir(self.path):
+            os.makedirs(self.path, mode=0o700)
+        with open(self.state_file, "a+") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.seek(0)
+                try:
+                    state = json.loads(f.read())
+                except ValueError:
+                    state = {}
+
+                now = time.time()
+                tokens = state.get("tokens", self.burst) + max(now - state.get("time", now), 0) * self.rate
+                tokens = min(tokens, self.burst)
+
+                wait = 0
+                # A token refilled by the wait may be short of 1 by float rounding
+                if tokens >= 1 - 1e-9:
+                    tokens = max(tokens - 1, 0)
+                else:
+                    wait = (1 - tokens) / self.rate
+
+                f.seek(0)
+                f.truncate()
+                json.dump({"tokens": tokens, "time": now}, f)
+                # Write the state before it is unlocked
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+        return wait
+
+    def acquire(self):
+        while True:
+            try:
+                wait = self._take()
+            except (IOError, OSError):
+                # Do not limit if the state is not accessible
+                return
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class CloudStackApiStats:
+    """Statistics of the requests to the API and the async jobs waited for.
+
+    The summary is updated in place, records are optionally appended as JSON lines
+    to a file and traced as OpenTelemetry spans if the library is installed.
+    """
+
+    # Upper bounds in seconds of the latency histogram buckets
+    LATENCY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    # Request parameters not related to the command
+    IGNORED_PARAMS = ("apiKey", "command", "expires", "page", "pagesize", "response", "signature", "signatureVersion")
+
+    def __init__(self, stats_file=None, module_name=None):
+        self.stats_file = stats_file
+        self.module_name = module_name
+        self.summary = {
+            "requests": 0,
+            "duration": 0.0,
+            "bytes": 0,
+            "commands": {},
+            "jobs": {"count": 0, "duration": 0.0, "polls": 0},
+        }
+        self._lock = threading.Lock()
+        self.tracer = trace.get_tracer("ngine_io.cloudstack") if HAS_LIB_OTEL else None
+
+    def _get_latency_bucket(self, duration):
+        for bucket in self.LATENCY_BUCKETS:
+            if duration <= bucket:
+                return str(bucket)
+        return "+Inf"
+
+    def _write(self, record):
+        if not self.stats_file:
+            return
+        record = dict(record, module=self.module_name, pid=os.getpid())
+        try:
+            with open(os.path.expanduser(self.stats_file), "a") as f:
+                f.write(json.dumps(record, sort_keys=True) + "\n")
+        except (IOError, OSError):
+            pass
+
+    def _trace(self, name, started, duration, attributes):
+        if not self.tracer:
+            return
+        span = self.tracer.start_span(name, start_time=int(started * 1e9), attributes=attributes)
+        span.end(end_time=int((started + duration) * 1e9))
+
+    def add_request(self, request, started, duration, response=None, error=None):
+        url = urlsplit(request.url)
+        params = dict(parse_qsl(url.query))
+        if isinstance(request.body, str):
+            params.update(parse_qsl(request.body))
+        command = params.get("command", "unknown")
+        record = {
+            "type": "request",
+            "command": command,
+            "args": sorted(key for key in params if key not in self.IGNORED_PARAMS),
+            "page": int(params["page"]) if params.get("page", "").isdigit() else None,
+            "started": round(started, 3),
+            "duration": round(duration, 3),
+            "status": response.status_code if response is not None else None,
+            "bytes": len(response.content) if response is not None else 0,
+            "error": to_text(error) if error is not None else None,
+        }
+        with self._lock:
+            self.summary["requests"] += 1
+            self.summary["duration"] = round(self.summary["duration"] + duration, 3)
+            self.summary["bytes"] += record["bytes"]
+            stats = self.summary["commands"].setdefault(command, {"requests": 0, "pages": 0, "duration": 0.0, "max_duration": 0.0, "bytes": 0, "latency": {}})
+            stats["requests"] += 1
+            if record["page"]:
+                stats["pages"] += 1
+            stats["duration"] = round(stats["duration"] + duration, 3)
+            stats["max_duration"] = max(stats["max_duration"], record["duration"])
+            stats["bytes"] += record["bytes"]
+            bucket = self._get_latency_bucket(duration)
+            stats["latency"][bucket] = stats["latency"].get(bucket, 0) + 1
+            self._write(record)
+
+        attributes = {
+            "cloudstack.command": command,
+            "cloudstack.args": ",".join(record["args"]),
+            "http.response.body.size": record["bytes"],
+        }
+        if record["status"] is not None:
+            attributes["http.response.status_code"] = record["status"]
+        self._trace(command, started, duration, attributes)
+
+    def add_job(self, jobid, started, duration, polls):
+        record = {
+            "type": "job",
+            "jobid": jobid,
+            "started": round(started, 3),
+            "duration": round(duration, 3),
+            "polls": polls,
+        }
+        with self._lock:
+            self.summary["jobs"]["count"] += 1
+            self.summary["jobs"]["duration"] = round(self.summary["jobs"]["duration"] + duration, 3)
+            self.summary["jobs"]["polls"] += polls
+            self._write(record)
+        self._trace("asyncjob", started, duration, {"cloudstack.jobid": jobid, "cloudstack.polls": polls})
+
+
+class CloudStackCassetteError(Exception):
+    pass
+
+
+class CloudStackCassette:
+    """Record the responses of the API to a file as JSON lines and replay them without network.
+
+    Requests are matched by method and parameters, without the signature and other volatile parameters.
+    Responses of the same request are replayed in the recorded order, the last one is repeated.
+    """
+
+    VOLATILE_PARAMS = ("apiKey", "expires", "signature", "signatureVersion")
+
+    def __init__(self, path, mode="replay"):
+        if mode not in ("record", "replay"):
+            raise CloudStackCassetteError("Invalid cassette mode %s, expected record or replay" % mode)
+        self.path = os.path.expanduser(path)
+        self.mode = mode
+        self._responses = None
+        self._lock = threading.Lock()
+
+    def _get_params(self, request):
+        params = parse_qsl(urlsplit(request.url).query)
+        if request.body:
+            params += parse_qsl(to_text(request.body))
+        return sorted([key, value] for key, value in params if key not in self.VOLATILE_PARAMS)
+
+    def _get_key(self, method, params):
+        return json.dumps([method, params])
+
+    def _load(self):
+        responses = {}
+        try:
+            with open(self.path) as f:
+                for line in f:
+                    if line.strip():
+                        entry = json.loads(line)
+                        responses.setdefault(self._get_key(entry["method"], entry["params"]), []).append(entry)
+        except (IOError, OSError, ValueError) as e:
+            raise CloudStackCassetteError("Could not load cassette %s: %s" % (self.path, to_native(e)))
+        return responses
+
+    def record(self, request, response):
+        entry = {
+            "method": request.method,
+            "params": self._get_params(request),
+            "status": response.status_code,
+            "reason": response.reason,
+            "content_type": response.headers.get("Content-Type"),
+            "body": response.text,
+        }
+        # Appended by all processes of a run
+        with open(self.path, "a") as f:
+            fcntl.flock(f, fcntl.LOCK_EX)
+            try:
+                f.write(json.dumps(entry, separators=(",", ":")) + "\n")
+                f.flush()
+            finally:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+    def replay(self, request):
+        key = self._get_key(request.method, self._get_params(request))
+        with self._lock:
+            if self._responses is None:
+                self._responses = self._load()
+            entries = self._responses.get(key)
+            if not entries:
+                raise CloudStackCassetteError("No response recorded in cassette %s for request %s" % (self.path, key))
+            entry = entries.pop(0) if len(entries) > 1 else entries[0]
+
+        response = Response()
+        response.status_code = entry["status"]
+        response.reason = entry["reason"]
+        response.headers = CaseInsensitiveDict({"Content-Type": entry["content_type"]} if entry["content_type"] else {})
+        response.encoding = "utf-8"
+        response._content = entry["body"].encode("utf-8")
+        response.url = request.url
+        response.request = request
+        return response
+
+
+class CloudStackSession:
+    """HTTP session keeping its connections alive across the requests of the clients sharing it.
+
+    The cs client closes its session after each request, which would close the pooled connections.
+    The pool lives in the process only, every module run and every task using the api lookup opens
+    its own connections.
+    Requests are rate limited if a limiter is given and retried with backoff if throttled by the API.
+    The responses are recorded to or replayed from the cassette of the env variable CLOUDSTACK_CASSETTE
+    in the mode of CLOUDSTACK_CASSETTE_MODE.
+    """
+
+    def __init__(self, pool_size=10, rate_limiter=None, retries=0, stats=None):
+        self.session = Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size or 1, 1))
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.rate_limiter = rate_limiter
+        self.retries = max(retries or 0, 0)
+        self.stats = stats
+        self.cassette = None
+        if os.getenv("CLOUDSTACK_CASSETTE"):
+            self.cassette = CloudStackCassette(os.getenv("CLOUDSTACK_CASSETTE"), mode=os.getenv("CLOUDSTACK_CASSETTE_MODE", "replay"))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        return False
+
+    def __getattr__(self, name):
+        return getattr(self.session, name)
+
+    def _get_retry_delay(self, response, attempt):
+        retry_after = response.headers.get("Retry-After", "")
+        if retry_after.isdigit():
+            return int(retry_after)
+        return get_backoff_delay(attempt)
+
+    def _send_request(self, request, **kwargs):
+        if self.cassette is None:
+            return self.session.send(request, **kwargs)
+        if self.cassette.mode == "replay":
+            return self.cassette.replay(request)
+        response = self.session.send(request, **kwargs)
+        self.cassette.record(request, response)
+        return response
+
+    def _send(self, request, **kwargs):
+        if not self.stats:
+            return self._send_request(request, **kwargs)
+
+        started = time.time()
+        try:
+            response = self._send_request(request, **kwargs)
+        except Exception as e:
+            self.stats.add_request(request, started, time.time() - started, error=e)
+            raise
+        self.stats.add_request(request, started, time.time() - started, response=response)
+        return response
+
+    def send(self, request, **kwargs):
+        attempt = 0
+        while True:
+            if self.rate_limiter and not (self.cassette and self.cassette.mode == "replay"):
+                self.rate_limiter.acquire()
+            response = self._send(request, **kwargs)
+            # Throttled requests are rejected before processed, safe to be repeated
+            if response.status_code != 429 or attempt >= self.retries:
+                return response
+            time.sleep(self._get_retry_delay(response, attempt))
+            attempt += 1
+
+
+# Seconds the clock of the API server may be behind, when listing the async jobs submitted since a time
+JOBS_CLOCK_SKEW = 300
+
+
 class AnsibleCloudStack:
     """AnsibleCloudStack"""
 
@@ -84,7 +599,19 @@ class AnsibleCloudStack:
         ]
 
         self.module = module
+        self.started = time.time()
+        # Submission time of the async jobs by job ID, used to list only recent jobs in poll_jobs()
+        self._jobs_submitted = dict()
         self._cs = None
+        self._session = None
+        self._thread_local = threading.local()
+        self._lookup_cache = None
+
+        self.api_stats = None
+        if module.params.get("api_stats"):
+            self.api_stats = CloudStackApiStats(stats_file=module.params.get("api_stats_file"), module_name=getattr(module, "_name", None))
+            # Updated in place until the result is returned
+            self.result["cloudstack_api_stats"] = self.api_stats.summary
 
         # Helper for VPCs
         self._vpc_networks_ids = None
@@ -112,6 +639,45 @@ class AnsibleCloudStack:
             self._cs = CloudStack(**api_config)
         return self._cs
 
+    @property
+    def session(self):
+        # Connections are reused by all clients, also the ones of other threads
+        if self._session is None:
+            rate_limiter = None
+            if self.module.params.get("api_rate_limit"):
+                rate_limiter = CloudStackRateLimiter(
+                    path=self.module.params.get("api_cache_dir") or "~/.cache/ansible-cloudstack",
+                    rate=self.module.params.get("api_rate_limit"),
+                    endpoint=self.module.params.get("api_url"),
+                    api_key=self.module.params.get("api_key"),
+                )
+            self._session = CloudStackSession(
+                pool_size=self.module.params.get("api_pool_size"),
+                rate_limiter=rate_limiter,
+                retries=self.module.params.get("api_retries"),
+                stats=self.api_stats,
+            )
+        return self._session
+
+    def _get_thread_cs(self):
+        """Return a client per thread, used to fetch pages concurrently."""
+        if threading.current_thread() is threading.main_thread():
+            return self.cs
+        if getattr(self._thread_local, "cs", None) is None:
+            self._thread_local.cs = CloudStack(**self.get_api_config())
+        return self._thread_local.cs
+
+    @property
+    def lookup_cache(self):
+        if self._lookup_cache is None and self.module.params.get("api_cache_ttl"):
+            self._lookup_cache = CloudStackLookupCache(
+                path=self.module.params.get("api_cache_dir") or "~/.cache/ansible-cloudstack",
+                ttl=self.module.params.get("api_cache_ttl"),
+                endpoint=self.module.params.get("api_url"),
+                api_key=self.module.params.get("api_key"),
+            )
+        return self._lookup_cache
+
     def get_api_config(self):
         api_config = {
             "endpoint": self.module.params.get("api_url"),
@@ -121,6 +687,7 @@ class AnsibleCloudStack:
             "method": self.module.params.get("api_http_method"),
             "verify": self.module.params.get("api_verify_ssl_cert"),
             "dangerous_no_tls_verify": not self.module.params.get("validate_certs"),
+            "session": self.session,
         }
 
         self.result.update(
@@ -211,9 +778,76 @@ class AnsibleCloudStack:
             self.fail_json(msg="Something went wrong: %s not found" % key)
         return my_dict
 
+    def _query_page(self, command, args):
+        res = call_api(self._get_thread_cs(), command, args, retries=self.module.params.get("api_retries") or 0)
+        if "errortext" in res:
+            raise CloudStackException("Failed: '%s'" % res["errortext"])
+
+        items = []
+        for key, value in res.items():
+            if key != "count":
+                items = value
+                break
+        return items, res.get("count", len(items))
+
+    def _iter_pages(self, command, args):
+        """Yield the items of a list command, the first page tells the count of pages left to be fetched concurrently."""
+        page_size = self.module.params.get("api_page_size") or 500
+        workers = self.module.params.get("api_list_workers") or 1
+
+        args = dict(args)
+        args.pop("fetch_list", None)
+        args["pagesize"] = page_size
+        args["page"] = 1
+
+        items, count = self._query_page(command, args)
+        for item in items:
+            yield item
+
+        if len(items) < page_size or len(items) >= count:
+            return
+
+        pages = range(2, int(math.ceil(count / float(page_size))) + 1)
+        if workers < 2:
+            for page in pages:
+                items, count = self._query_page(command, dict(args, page=page))
+                for item in items:
+                    yield item
+            return
+
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [executor.submit(self._query_page, command, dict(args, page=page)) for page in pages]
+            try:
+                for future in futures:
+                    items, count = future.result()
+                    for item in items:
+                        yield item
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def query_api_iter(self, command, **args):
+        """Stream the items of a list command, pages are fetched concurrently."""
+        try:
+            for item in self._iter_pages(command, args):
+                yield item
+
+        except CloudStackException as e:
+            self.fail_json(msg="CloudStackException: %s" % to_native(e))
+
+        except Exception as e:
+            self.fail_json(msg=to_native(e))
+
     def query_api(self, command, **args):
+        if args.get("fetch_list"):
+            return list(self.query_api_iter(command, **args))
+
         try:
-            res = getattr(self.cs, command)(**args)
+            submitted = time.time()
+            res = call_api(self.cs, command, args, retries=self.module.params.get("api_retries") or 0)
+
+            if "jobid" in res and not is_read_only_command(command):
+                self._jobs_submitted.setdefault(res["jobid"], submitted)
 
             if "errortext" in res:
                 self.fail_json(msg="Failed: '%s'" % res["errortext"])
@@ -224,6 +858,23 @@ class AnsibleCloudStack:
         except Exception as e:
             self.fail_json(msg=to_native(e))
 
+        if self.lookup_cache and not is_read_only_command(command):
+            self.lookup_cache.invalidate(command)
+
+        return res
+
+    def query_api_cached(self, command, **args):
+        """Query the API and cache the response if a lookup cache is configured.
+
+        Only used for resolving names of rarely changing resources like zones, domains or accounts into IDs.
+        """
+        if not self.lookup_cache:
+            return self.query_api(command, **args)
+
+        res = self.lookup_cache.get(command, args)
+        if res is None:
+            res = self.query_api(command, **args)
+            self.lookup_cache.set(command, args, res)
         return res
 
     def getCallerUser(self):
@@ -269,7 +920,7 @@ class AnsibleCloudStack:
             "projectid": self.get_project(key="id"),
             "zoneid": self.get_zone(key="id"),
         }
-        vpcs = self.query_api("listVPCs", **args)
+        vpcs = self.query_api_cached("listVPCs", **args)
         if not vpcs:
             self.fail_json(msg="No VPCs available.")
 
@@ -295,7 +946,7 @@ class AnsibleCloudStack:
                 "projectid": self.get_project(key="id"),
                 "zoneid": self.get_zone(key="id"),
             }
-            vpcs = self.query_api("listVPCs", **args)
+            vpcs = self.query_api_cached("listVPCs", **args)
             self._vpc_networks_ids = []
             if vpcs:
                 for vpc in vpcs["vpc"]:
@@ -338,7 +989,7 @@ class AnsibleCloudStack:
             "zoneid": self.get_zone(key="id"),
             "vpcid": self.get_vpc(key="id"),
         }
-        networks = self.query_api("listNetworks", **args)
+        networks = self.query_api_cached("listNetworks", **args)
         if not networks:
             self.fail_json(msg="No networks available.")
 
@@ -362,7 +1013,7 @@ class AnsibleCloudStack:
         if not project:
             return None
         args = {"account": self.get_account(key="name"), "domainid": self.get_domain(key="id")}
-        projects = self.query_api("listProjects", **args)
+        projects = self.query_api_cached("listProjects", **args)
         if projects:
             for p in projects["project"]:
                 if project.lower() in [p["name"].lower(), p["id"]]:
@@ -474,6 +1125,33 @@ class AnsibleCloudStack:
 
         self.fail_json(msg="Virtual machine '%s' not found" % vm)
 
+    def get_vms_index(self, names, **args):
+        """Resolve names or IDs of instances, return a dict of the names and IDs to the instances.
+
+        The instances are listed once, scoped by the args e.g. zoneid, networkid or ids.
+        A single name is queried by name, the API matches it as substring, so the first exact match wins.
+        """
+        args.update(
+            {
+                "account": self.get_account(key="name"),
+                "domainid": self.get_domain(key="id"),
+                "projectid": self.get_project(key="id"),
+                "fetch_list": True,
+            }
+        )
+        names = list(names)
+        vms = None
+        if len(names) == 1 and "ids" not in args:
+            vms = [vm for vm in self.query_api("listVirtualMachines", name=names[0], **args) or [] if vm["name"] == names[0]]
+        if not vms:
+            vms = self.query_api("listVirtualMachines", **args) or []
+
+        index = {}
+        for vm in vms:
+            index.setdefault(vm["name"], vm)
+            index.setdefault(vm["id"], vm)
+        return index
+
     def get_disk_offering(self, key=None):
         disk_offering = self.module.params.get("disk_offering")
         if not disk_offering:
@@ -494,7 +1172,7 @@ class AnsibleCloudStack:
         zone = self.module.params.get("zone")
         if not zone:
             zone = os.environ.get("CLOUDSTACK_ZONE")
-        zones = self.query_api("listZones")
+        zones = self.query_api_cached("listZones")
 
         if not zones:
             self.fail_json(msg="No zones available. Please create a zone first")
@@ -522,7 +1200,7 @@ class AnsibleCloudStack:
         if not os_type:
             return None
 
-        os_types = self.query_api("listOsTypes")
+        os_types = self.query_api_cached("listOsTypes")
         if os_types:
             for o in os_types["ostype"]:
                 if os_type in [o["description"], o["id"]]:
@@ -535,7 +1213,7 @@ class AnsibleCloudStack:
             return self.hypervisor
 
         hypervisor = self.module.params.get("hypervisor")
-        hypervisors = self.query_api("listHypervisors")
+        hypervisors = self.query_api_cached("listHypervisors")
 
         # use the first hypervisor if no hypervisor param given
         if not hypervisor:
@@ -570,7 +1248,7 @@ class AnsibleCloudStack:
             self.fail_json(msg="Account must be specified with Domain")
 
         args = {"name": account, "domainid": domain_id, "listall": True}
-        accounts = self.query_api("listAccounts", **args)
+        accounts = self.query_api_cached("listAccounts", **args)
         if accounts:
             self.account = accounts["account"][0]
             self.result["account"] = self.account["name"]
@@ -597,7 +1275,7 @@ class AnsibleCloudStack:
         args = {
             "listall": True,
         }
-        domains = self.query_api("listDomains", **args)
+        domains = self.query_api_cached("listDomains", **args)
         if domains:
             for d in domains["domain"]:
                 if d["path"].lower() in [domain.lower(), "root/" + domain.lower(), "root" + domain.lower()]:
@@ -621,7 +1299,7 @@ class AnsibleCloudStack:
                 existing_tags.append({"key": tag["key"], "value": tag["value"]})
         return existing_tags
 
-    def _process_tags(self, resource, resource_type, tags, operation="create"):
+    def _process_tags(self, resource, resource_type, tags, operation="create", poll_async=True):
         if tags:
             self.result["changed"] = True
             if not self.module.check_mode:
@@ -634,7 +1312,10 @@ class AnsibleCloudStack:
                     response = self.query_api("createTags", **args)
                 else:
                     response = self.query_api("deleteTags", **args)
+                if not poll_async:
+                    return response
                 self.poll_job(response)
+        return None
 
     def _tags_that_should_exist_or_be_updated(self, resource, tags):
         existing_tags = self.get_tags(resource)
@@ -651,8 +1332,19 @@ class AnsibleCloudStack:
         if "tags" in resource:
             tags = self.module.params.get("tags")
             if tags is not None:
-                self._process_tags(resource, resource_type, self._tags_that_should_not_exist(resource, tags), operation="delete")
-                self._process_tags(resource, resource_type, self._tags_that_should_exist_or_be_updated(resource, tags))
+                tags_to_delete = self._tags_that_should_not_exist(resource, tags)
+                tags_to_create = self._tags_that_should_exist_or_be_updated(resource, tags)
+
+                # Updated tags must be deleted before created again, unrelated tags are processed at once.
+                if set(tag["key"] for tag in tags_to_delete) & set(tag["key"] for tag in tags_to_create):
+                    self._process_tags(resource, resource_type, tags_to_delete, operation="delete")
+                    self._process_tags(resource, resource_type, tags_to_create)
+                else:
+                    jobs = [
+                        self._process_tags(resource, resource_type, tags_to_delete, operation="delete", poll_async=False),
+                        self._process_tags(resource, resource_type, tags_to_create, poll_async=False),
+                    ]
+                    self.poll_jobs(jobs)
                 resource["tags"] = self.query_tags(resource=resource, resource_type=resource_type)
         return resource
 
@@ -663,11 +1355,47 @@ class AnsibleCloudStack:
         self.capabilities = capabilities["capability"]
         return self._get_by_key(key, self.capabilities)
 
+    def _get_poll_param(self, name):
+        """Return a poll param, the default of the argument spec if not given, e.g. by a plugin."""
+        value = self.module.params.get(name)
+        if value is None:
+            return cs_argument_spec()[name]["default"]
+        return value
+
+    def _wait_for_jobs(self, started, polls, jobids):
+        """Sleep before the next poll of async jobs, exponential backoff with jitter."""
+        elapsed = time.time() - started
+        timeout = self.module.params.get("api_job_timeout")
+        if timeout and elapsed >= timeout:
+            self.fail_json(msg="Timeout after %ss waiting for async jobs: %s" % (timeout, ", ".join(jobids)))
+
+        interval = self._get_poll_param("api_poll_interval")
+        max_interval = max(self._get_poll_param("api_poll_max_interval"), interval)
+        interval = min(interval * 2 ** (polls - 1), max_interval)
+        interval = random.uniform(interval / 2, interval)
+        if timeout:
+            interval = min(interval, timeout - elapsed)
+        time.sleep(interval)
+
+    def _add_job_stats(self, jobid, started, polls):
+        if self.api_stats:
+            self.api_stats.add_job(jobid, started, time.time() - started, polls)
+
+    def add_api_stats(self, result):
+        """Add the API stats to a result not based on self.result."""
+        if self.api_stats:
+            result["cloudstack_api_stats"] = self.api_stats.summary
+        return result
+
     def poll_job(self, job=None, key=None):
         if job is not None and "jobid" in job:
+            started = time.time()
+            polls = 0
             while True:
                 res = self.query_api("queryAsyncJobResult", jobid=job["jobid"])
+                polls += 1
                 if res["jobstatus"] != 0 and "jobresult" in res:
+                    self._add_job_stats(job["jobid"], started, polls)
 
                     if "errortext" in res["jobresult"]:
                         self.fail_json(msg="Failed: '%s'" % res["jobresult"]["errortext"])
@@ -676,9 +1404,74 @@ class AnsibleCloudStack:
                         job = res["jobresult"][key]
 
                     break
-                time.sleep(2)
+                self._wait_for_jobs(started, polls, [job["jobid"]])
         return job
 
+    def poll_jobs(self, jobs, key=None):
+        """Wait for a set of async jobs.
+
+        All pending jobs are resolved together by one listAsyncJobs query per poll cycle, limited to the jobs
+        started since the first pending job was submitted. Jobs not listed (e.g. owned by another account)
+        and the last two pending jobs are queried by queryAsyncJobResult.
+        The key to return from a job result may be given per job as a list.
+        Returns the results in the order of the given jobs.
+        """
+        results = list(jobs)
+        keys = key if isinstance(key, list) else [key] * len(results)
+        pending = dict((job["jobid"], idx) for idx, job in enumerate(results) if job is not None and "jobid" in job)
+        if len(pending) < 2:
+            return [self.poll_job(job, keys[idx]) for idx, job in enumerate(results)]
+
+        # Tolerate a clock skew to the API server
+        submitted = min(self._jobs_submitted.get(jobid, self.started) for jobid in pending) - JOBS_CLOCK_SKEW
+        startdate = time.strftime("%Y-%m-%dT%H:%M:%S+0000", time.gmtime(submitted))
+
+        errors = []
+        started = time.time()
+        polls = 0
+        while pending:
+            polls += 1
+            job_results = dict()
+            if len(pending) > 2:
+                async_jobs = self.query_api("listAsyncJobs", startdate=startdate, fetch_list=True)
+                job_results = dict((j["jobid"], j) for j in async_jobs or [] if j["jobid"] in pending)
+
+            for jobid, idx in list(pending.items()):
+                res = job_results.get(jobid)
+                if res is None:
+                    res = self.query_api("queryAsyncJobResult", jobid=jobid)
+
+                if res["jobstatus"] == 0 or "jobresult" not in res:
+                    continue
+
+                del pending[jobid]
+                self._add_job_stats(jobid, started, polls)
+
+                if "errortext" in res["jobresult"]:
+                    errors.append(res["jobresult"]["errortext"])
+                elif keys[idx] and keys[idx] in res["jobresult"]:
+                    results[idx] = res["jobresult"][keys[idx]]
+
+            if pending:
+                self._wait_for_jobs(started, polls, list(pending))
+
+        if errors:
+            self.fail_json(msg="Failed: '%s'" % "', '".join(errors))
+        return results
+
+    def run_jobs(self, commands, key=None, window=None):
+        """Submit the async jobs of a list of (command, args) and wait for them.
+
+        At most window jobs are running at once, the jobs of a window are awaited together by poll_jobs.
+        Returns the results in the order of the given commands.
+        """
+        window = window or len(commands) or 1
+        results = []
+        for idx in range(0, len(commands), window):
+            jobs = [self.query_api(command, **args) for command, args in commands[idx : idx + window]]
+            results.extend(self.poll_jobs(jobs, key=key))
+        return results
+
     def update_result(self, resource, result=None):
         if result is None:
             result = dict()
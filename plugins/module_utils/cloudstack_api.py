@@ -10,11 +10,14 @@ __metaclass__ = type
 import os
 import re
 import sys
+import threading
 import traceback
 
 from ansible.module_utils._text import to_native
 from ansible.module_utils.basic import missing_required_lib, AnsibleModule
 
+from .cloudstack import CloudStackRateLimiter, CloudStackSession, call_api
+
 CS_IMP_ERR = None
 try:
     from cs import CloudStack, CloudStackException
@@ -41,6 +44,10 @@ class AnsibleCloudStackAPI(AnsibleModule):
         api_timeout=os.getenv("CLOUDSTACK_TIMEOUT", 10),
         api_verify_ssl_cert=os.getenv("CLOUDSTACK_VERIFY"),
         validate_certs=os.getenv("CLOUDSTACK_DANGEROUS_NO_TLS_VERIFY", True),
+        api_pool_size=os.getenv("CLOUDSTACK_POOL_SIZE", 10),
+        api_rate_limit=os.getenv("CLOUDSTACK_RATE_LIMIT", 0),
+        api_retries=os.getenv("CLOUDSTACK_RETRIES", 3),
+        api_cache_dir=os.getenv("CLOUDSTACK_CACHE_DIR", "~/.cache/ansible-cloudstack"),
     )
 
     def __init__(self, argument_spec=None, direct_params=None, error_callback=None, warn_callback=None, **kwargs):
@@ -56,7 +63,8 @@ class AnsibleCloudStackAPI(AnsibleModule):
         self.error_callback = error_callback
         self.warn_callback = warn_callback
 
-        self._cs = None
+        self._session = None
+        self._thread_local = threading.local()
         self.result = {}
 
         if direct_params is not None:
@@ -83,10 +91,17 @@ class AnsibleCloudStackAPI(AnsibleModule):
 
     @property
     def cs(self):
-        if self._cs is None:
+        """Return a client per thread, the clients share the pooled session."""
+        if getattr(self._thread_local, "cs", None) is None:
             api_config = self.get_api_config()
-            self._cs = CloudStack(**api_config)
-        return self._cs
+            self._thread_local.cs = CloudStack(**api_config)
+        return self._thread_local.cs
+
+    @property
+    def session(self):
+        if self._session is None:
+            self._session = self.get_session()
+        return self._session
 
     def get_api_config(self):
         api_config = {
@@ -97,14 +112,21 @@ class AnsibleCloudStackAPI(AnsibleModule):
             "method": self.api_http_method,
             "verify": self.api_verify_ssl_cert,
             "dangerous_no_tls_verify": not self.validate_certs,
+            "session": self.session,
         }
 
         return api_config
 
+    def get_session(self):
+        rate_limiter = None
+        if float(self.api_rate_limit):
+            rate_limiter = CloudStackRateLimiter(path=self.api_cache_dir, rate=self.api_rate_limit, endpoint=self.api_url, api_key=self.api_key)
+        return CloudStackSession(pool_size=int(self.api_pool_size), rate_limiter=rate_limiter, retries=int(self.api_retries))
+
     def query_api(self, command, **args):
 
         try:
-            res = getattr(self.cs, command)(**args)
+            res = call_api(self.cs, command, args, retries=int(self.api_retries))
 
             if "errortext" in res:
                 self.fail_json(msg="Failed: '%s'" % res["errortext"])
@@ -117,3 +139,21 @@ class AnsibleCloudStackAPI(AnsibleModule):
 
         # res.update({'params': self.result, 'query_params': args})
         return res
+
+    def query_api_iter(self, command, page=None, page_size=500, **args):
+        """Stream the items of a list command page by page, only the items of the page if given."""
+        args = dict(args, page=page or 1, pagesize=page_size)
+        while True:
+            res = self.query_api(command, **args) or {}
+
+            items = []
+            for key, value in res.items():
+                if key != "count":
+                    items = value
+                    break
+            for item in items:
+                yield item
+
+            if page or len(items) < page_size or args["page"] * page_size >= res.get("count", 0):
+                return
+            args["page"] += 1
@@ -151,7 +151,7 @@ class AnsibleCloudStackClusterInfo(AnsibleCloudStack):
             clusters = clusters["cluster"]
         else:
             clusters = []
-        return {"clusters": [self.update_result(resource) for resource in clusters]}
+        return self.add_api_stats({"clusters": [self.update_result(resource) for resource in clusters]})
 
 
 def main():
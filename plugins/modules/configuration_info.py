@@ -99,7 +99,7 @@ class AnsibleCloudStackConfigurationInfo(AnsibleCloudStack):
             else:
                 configurations = []
 
-        return {"configurations": [self.update_result(config) for config in configurations]}
+        return self.add_api_stats({"configurations": [self.update_result(config) for config in configurations]})
 
 
 def main():
@@ -112,6 +112,66 @@ options:
     type: list
     elements: dict
     aliases: [ tag ]
+  rules:
+    description:
+      - List of firewall rules of the I(ip_address) or I(network) to be reconciled in one run.
+      - The rules are listed once, the jobs to create or remove rules are run concurrently, see I(max_jobs).
+      - If I(state=present), missing rules are created and with I(purge=true) other rules are removed.
+      - If I(state=absent), the rules are removed.
+      - Mutually exclusive with I(start_port), I(end_port), I(icmp_type), I(icmp_code) and I(tags).
+    type: list
+    elements: dict
+    version_added: 3.4.0
+    suboptions:
+      protocol:
+        description:
+          - Protocol of the firewall rule.
+          - Defaults to I(protocol) of the module.
+        type: str
+        choices: [ tcp, udp, icmp, all ]
+      cidrs:
+        description:
+          - List of CIDRs (full notation) to be used for firewall rule.
+          - Defaults to I(cidrs) of the module.
+        type: list
+        elements: str
+        aliases: [ cidr ]
+      dest_cidrs:
+        description:
+          - List of destination CIDRs (full notation) to forward traffic to if I(type=egress).
+          - Defaults to I(dest_cidrs) of the module.
+        type: list
+        elements: str
+        aliases: [ dest_cidr ]
+      start_port:
+        description:
+          - Start port for this rule.
+        type: int
+        aliases: [ port ]
+      end_port:
+        description:
+          - End port for this rule, defaults to I(start_port).
+        type: int
+      icmp_type:
+        description:
+          - Type of the icmp message being sent.
+        type: int
+      icmp_code:
+        description:
+          - Error code for this icmp message.
+        type: int
+  purge:
+    description:
+      - Whether to remove the firewall rules of the I(ip_address) or I(network) not in I(rules) if I(state=present).
+    type: bool
+    default: false
+    version_added: 3.4.0
+  max_jobs:
+    description:
+      - Maximum number of jobs creating or removing rules of I(rules) running at once.
+    type: int
+    default: 10
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 """
@@ -157,6 +217,22 @@ EXAMPLES = """
     type: egress
     port: 80
     cidr: 10.101.1.20
+
+- name: Ensure only the web ports are open on 4.3.2.1
+  ngine_io.cloudstack.firewall:
+    ip_address: 4.3.2.1
+    zone: zone01
+    rules:
+      - port: 80
+      - port: 443
+      - protocol: icmp
+        icmp_type: 8
+        icmp_code: 0
+      - start_port: 8000
+        end_port: 8080
+        cidrs:
+          - 10.0.0.0/8
+    purge: true
 """
 
 RETURN = """
@@ -222,6 +298,22 @@ network:
   returned: success
   type: str
   sample: my_network
+rules:
+  description:
+    - Firewall rules of I(rules) having the same keys as a single rule.
+    - If I(state=absent), the removed rules.
+  returned: if I(rules) is given
+  type: list
+  elements: dict
+  sample: '[ { "id": "04589590-ac63-4ffc-93f5-b698b8ac38b6", "protocol": "tcp", "start_port": 80, "end_port": 80, "cidrs": [ "0.0.0.0/0" ] } ]'
+  version_added: 3.4.0
+purged_rules:
+  description: Firewall rules removed by I(purge=true).
+  returned: if I(rules) is given
+  type: list
+  elements: dict
+  sample: '[ { "id": "04589590-ac63-4ffc-93f5-b698b8ac38b6", "protocol": "tcp", "start_port": 22, "end_port": 22, "cidrs": [ "0.0.0.0/0" ] } ]'
+  version_added: 3.4.0
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -392,6 +484,175 @@ class AnsibleCloudStackFirewall(AnsibleCloudStack):
         return self.result
 
 
+class AnsibleCloudStackFirewallRules(AnsibleCloudStackFirewall):
+    """Reconciles the list of firewall rules of an IP address or network in one run."""
+
+    def get_rule_specs(self):
+        fw_type = self.module.params.get("type")
+        specs = []
+        for rule in self.module.params.get("rules"):
+            spec = dict(rule)
+            for param in ["protocol", "cidrs", "dest_cidrs"]:
+                if spec.get(param) is None:
+                    spec[param] = self.module.params.get(param)
+            spec["end_port"] = spec.get("end_port") or spec.get("start_port")
+
+            protocol = spec["protocol"]
+            if protocol in ["tcp", "udp"] and not spec["start_port"]:
+                self.module.fail_json(msg="missing required argument for protocol '%s' in rules: start_port" % protocol)
+
+            if protocol == "icmp" and spec["icmp_type"] is None:
+                self.module.fail_json(msg="missing required argument for protocol 'icmp' in rules: icmp_type")
+
+            if protocol == "all" and fw_type != "egress":
+                self.module.fail_json(msg="protocol 'all' could only be used for type 'egress'")
+            specs.append(spec)
+        return specs
+
+    def get_rule_key(self, protocol, cidrs, dest_cidrs=None, start_port=None, end_port=None, icmp_type=None, icmp_code=None):
+        """Return the normalized key of a rule by type, protocol, ports, CIDRs and destination CIDRs."""
+        if protocol in ["tcp", "udp"]:
+            ports = (start_port, end_port)
+        elif protocol == "icmp":
+            ports = (icmp_type, icmp_code)
+        else:
+            ports = ()
+        return (self.module.params.get("type"), protocol) + ports + (",".join(sorted(cidrs)), ",".join(sorted(dest_cidrs or [])))
+
+    def get_existing_rule_key(self, rule, network_cidr=None):
+        cidrs = rule["cidrlist"].split(",") if rule.get("cidrlist") else []
+        if network_cidr:
+            # CloudStack 4.11 use the network cidr for 0.0.0.0/0 in egress
+            cidrs = ["0.0.0.0/0" if cidr == network_cidr else cidr for cidr in cidrs]
+
+        def get_int(key):
+            return int(rule[key]) if rule.get(key) is not None else None
+
+        return self.get_rule_key(
+            protocol=rule["protocol"],
+            cidrs=cidrs,
+            dest_cidrs=rule["destcidrlist"].split(",") if rule.get("destcidrlist") else [],
+            start_port=get_int("startport"),
+            end_port=get_int("endport"),
+            icmp_type=get_int("icmptype"),
+            icmp_code=get_int("icmpcode"),
+        )
+
+    def get_firewall_rules(self):
+        """List the firewall rules of the IP address or network once."""
+        args = {
+            "account": self.get_account("name"),
+            "domainid": self.get_domain("id"),
+            "projectid": self.get_project("id"),
+            "fetch_list": True,
+        }
+        if self.module.params.get("type") == "egress":
+            args["networkid"] = self.get_network(key="id")
+            if not args["networkid"]:
+                self.module.fail_json(msg="missing required argument for type egress: network")
+            return self.query_api("listEgressFirewallRules", **args) or []
+
+        args["ipaddressid"] = self.get_ip_address("id")
+        if not args["ipaddressid"]:
+            self.module.fail_json(msg="missing required argument for type ingress: ip_address")
+        return self.query_api("listFirewallRules", **args) or []
+
+    def get_create_args(self, spec):
+        args = {
+            "cidrlist": spec["cidrs"],
+            "destcidrlist": spec["dest_cidrs"],
+            "protocol": spec["protocol"],
+            "startport": spec["start_port"],
+            "endport": spec["end_port"],
+            "icmptype": spec["icmp_type"],
+            "icmpcode": spec["icmp_code"],
+        }
+        if self.module.params.get("type") == "egress":
+            args["networkid"] = self.get_network(key="id")
+        else:
+            args["ipaddressid"] = self.get_ip_address("id")
+        return args
+
+    def reconcile_firewall_rules(self):
+        state = self.module.params.get("state")
+        egress = self.module.params.get("type") == "egress"
+        specs = self.get_rule_specs()
+
+        network_cidr = self.get_network(key="cidr") if egress else None
+        index = {}
+        for rule in self.get_firewall_rules():
+            index.setdefault(self.get_existing_rule_key(rule, network_cidr), []).append(rule)
+
+        rules = []
+        to_create = []
+        to_remove = []
+        keys = set()
+        for spec in specs:
+            key = self.get_rule_key(
+                protocol=spec["protocol"],
+                cidrs=spec["cidrs"],
+                dest_cidrs=spec["dest_cidrs"],
+                start_port=spec["start_port"],
+                end_port=spec["end_port"],
+                icmp_type=spec["icmp_type"],
+                icmp_code=spec["icmp_code"],
+            )
+            # A rule listed twice is reconciled once
+            if key in keys:
+                continue
+            keys.add(key)
+
+            matches = index.get(key, [])
+            rule = matches.pop(0) if matches else None
+
+            if state == "absent":
+                if rule:
+                    to_remove.append(rule)
+            elif rule:
+                rules.append(rule)
+            else:
+                to_create.append(spec)
+
+        purged = []
+        if state == "present" and self.module.params.get("purge"):
+            purged = [rule for matches in index.values() for rule in matches]
+
+        commands = []
+        created = []
+        for spec in to_create:
+            args = self.get_create_args(spec)
+            commands.append(("createEgressFirewallRule" if egress else "createFirewallRule", args))
+            # Known values of the rule until it is created
+            created.append(dict((k, ",".join(v) if isinstance(v, list) else v) for k, v in args.items() if v is not None))
+        for rule in to_remove + purged:
+            commands.append(("deleteEgressFirewallRule" if egress else "deleteFirewallRule", {"id": rule["id"]}))
+
+        if commands:
+            self.result["changed"] = True
+
+        if commands and not self.module.check_mode:
+            if self.module.params.get("poll_async"):
+                results = self.run_jobs(commands, key="firewallrule", window=self.module.params.get("max_jobs"))
+                created = [res if res and "jobid" not in res else rule for res, rule in zip(results, created)]
+            else:
+                for command, args in commands:
+                    self.query_api(command, **args)
+
+        rules = to_remove if state == "absent" else rules + created
+        self.result["rules"] = [self.get_rule_result(rule) for rule in rules]
+        self.result["purged_rules"] = [self.get_rule_result(rule) for rule in purged]
+        self.result["type"] = self.module.params.get("type")
+        if egress:
+            self.result["network"] = self.get_network(key="displaytext")
+        return self.result
+
+    def get_rule_result(self, rule):
+        result = self.update_result(rule)
+        if "cidrlist" in rule:
+            result["cidrs"] = rule["cidrlist"].split(",")
+        return result
+
+
 def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(
@@ -413,6 +674,23 @@ def main():
             project=dict(type="str"),
             poll_async=dict(type="bool", default=True),
             tags=dict(type="list", elements="dict", aliases=["tag"]),
+            rules=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    protocol=dict(type="str", choices=["tcp", "udp", "icmp", "all"]),
+                    cidrs=dict(type="list", elements="str", aliases=["cidr"]),
+                    dest_cidrs=dict(type="list", elements="str", aliases=["dest_cidr"]),
+                    start_port=dict(type="int", aliases=["port"]),
+                    end_port=dict(type="int"),
+                    icmp_type=dict(type="int"),
+                    icmp_code=dict(type="int"),
+                ),
+                required_together=(["icmp_type", "icmp_code"],),
+                mutually_exclusive=(["icmp_type", "start_port"], ["icmp_type", "end_port"]),
+            ),
+            purge=dict(type="bool", default=False),
+            max_jobs=dict(type="int", default=10),
         )
     )
 
@@ -431,10 +709,20 @@ def main():
             ["icmp_type", "start_port"],
             ["icmp_type", "end_port"],
             ["ip_address", "network"],
+            ["rules", "start_port"],
+            ["rules", "end_port"],
+            ["rules", "icmp_type"],
+            ["rules", "icmp_code"],
+            ["rules", "tags"],
         ),
         supports_check_mode=True,
     )
 
+    if module.params.get("rules") is not None:
+        acs_fw = AnsibleCloudStackFirewallRules(module)
+        result = acs_fw.reconcile_firewall_rules()
+        module.exit_json(**result)
+
     acs_fw = AnsibleCloudStackFirewall(module)
 
     state = module.params.get("state")
@@ -228,6 +228,52 @@ options:
     description:
       - Map to specify custom parameters.
     type: dict
+  instances:
+    description:
+      - List of instances to be reconciled in one run, sharing all other options like I(template), I(service_offering) or I(networks).
+      - Instances in scope are listed once and the jobs of the instances are run concurrently, see I(max_jobs).
+      - Supported states are V(present), V(deployed), V(started), V(stopped), V(absent), V(destroyed) and V(expunged).
+      - Changes of existing instances requiring a restart, e.g. the service offering, are only applied without I(instances).
+      - Mutually exclusive with I(name), I(display_name), I(ip_address), I(ip6_address) and I(ip_to_networks).
+    type: list
+    elements: dict
+    version_added: 3.4.0
+    suboptions:
+      name:
+        description:
+          - Host name of the instance.
+          - Either I(name) or I(display_name) is required.
+        type: str
+      display_name:
+        description:
+          - Custom display name of the instance.
+          - Either I(name) or I(display_name) is required.
+        type: str
+      group:
+        description:
+          - Group in where the instance should be in.
+          - Defaults to I(group) of the module.
+        type: str
+      ip_address:
+        description:
+          - IPv4 address for default instance's network during creation.
+        type: str
+      ip6_address:
+        description:
+          - IPv6 address for default instance's network during creation.
+        type: str
+      tags:
+        description:
+          - List of tags of the instance, overrides I(tags) of the module.
+        type: list
+        elements: dict
+  max_jobs:
+    description:
+      - Maximum number of jobs deploying, starting, stopping or destroying instances of I(instances) running at once.
+      - Only considered if I(poll_async=true).
+    type: int
+    default: 10
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 """
@@ -305,6 +351,23 @@ EXAMPLES = """
     name: web-vm-1
     zone: zone01
     state: absent
+
+- name: ensure a fleet of instances is running
+  ngine_io.cloudstack.instance:
+    instances:
+      - name: web-vm-1
+      - name: web-vm-2
+        ip_address: 10.1.1.2
+      - name: web-vm-3
+        tags:
+          - key: role
+            value: canary
+    zone: zone01
+    template: Linux Debian 7 64-bit
+    service_offering: Tiny
+    networks:
+      - NetworkA
+    state: started
 """
 
 RETURN = """
@@ -455,6 +518,13 @@ user_data_details:
   returned: success
   type: dict
   sample: { "foo": "bar" }
+instances:
+  description: Results of the instances reconciled by I(instances), having the same keys as a single instance and C(changed).
+  returned: if I(instances) is given
+  type: list
+  elements: dict
+  sample: '[ { "name": "web-vm-1", "state": "Running", "changed": true } ]'
+  version_added: 3.4.0
 """
 
 import base64
@@ -827,8 +897,7 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
 
         return details
 
-    def deploy_instance(self, start_vm=True):
-        self.result["changed"] = True
+    def get_deploy_args(self, start_vm=True):
         networkids = self.get_network_ids()
         if networkids is not None:
             networkids = ",".join(networkids)
@@ -869,6 +938,11 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         template_iso = self.get_template_or_iso()
         if template_iso and "hypervisor" not in template_iso:
             args["hypervisor"] = self.get_hypervisor()
+        return args
+
+    def deploy_instance(self, start_vm=True):
+        self.result["changed"] = True
+        args = self.get_deploy_args(start_vm=start_vm)
 
         instance = None
         if not self.module.check_mode:
@@ -1151,6 +1225,225 @@ class AnsibleCloudStackInstance(AnsibleCloudStack):
         return self.result
 
 
+class AnsibleCloudStackInstanceFleet(AnsibleCloudStackInstance):
+    """Reconciles a list of instances sharing the same settings in one run."""
+
+    def __init__(self, module):
+        super(AnsibleCloudStackInstanceFleet, self).__init__(module)
+        self._lookups = {}
+
+    def _lookup_once(self, name, lookup):
+        if name not in self._lookups:
+            self._lookups[name] = lookup()
+        return self._lookups[name]
+
+    def get_service_offering_id(self):
+        return self._lookup_once("service_offering", super(AnsibleCloudStackInstanceFleet, self).get_service_offering_id)
+
+    def get_host_id(self):
+        return self._lookup_once("host", super(AnsibleCloudStackInstanceFleet, self).get_host_id)
+
+    def get_user_data_id_by_name(self):
+        return self._lookup_once("user_data_name", super(AnsibleCloudStackInstanceFleet, self).get_user_data_id_by_name)
+
+    def get_fleet_deploy_args(self):
+        """Return the deploy args shared by the instances, only resolved if an instance is to be deployed."""
+        return self._lookup_once("deploy_args", lambda: self.get_deploy_args(start_vm=self.module.params.get("state") != "stopped"))
+
+    def get_instances(self):
+        """Index all instances in scope by lower case name and display name with one listing."""
+        args = {
+            "account": self.get_account(key="name"),
+            "domainid": self.get_domain(key="id"),
+            "projectid": self.get_project(key="id"),
+            "fetch_list": True,
+        }
+        instances = self.query_api("listVirtualMachines", **args)
+
+        match_display_name = self.module.params.get("match_display_name")
+        index = {}
+        for v in instances or []:
+            if "keypairs" not in v:
+                v["keypairs"] = list()
+
+            # Workaround for keypairs not a list
+            if not isinstance(v["keypairs"], list):
+                v["keypairs"] = [v["keypairs"]]
+
+            names = set([v["name"].lower()])
+            if match_display_name:
+                names.add(v["displayname"].lower())
+            for name in names:
+                index.setdefault(name, []).append(v)
+        return index
+
+    def _plan_instance(self, spec, instance):
+        """Return the API command and args to converge an instance to the wanted state, if any."""
+        state = self.module.params.get("state")
+
+        if state in ["absent", "destroyed"]:
+            if instance and instance["state"].lower() not in ["expunging", "destroying", "destroyed"]:
+                return "destroyVirtualMachine", {"id": instance["id"]}
+            return None, None
+
+        if state in ["expunged"]:
+            if instance and instance["state"].lower() not in ["expunging"]:
+                return "destroyVirtualMachine", {"id": instance["id"], "expunge": True}
+            return None, None
+
+        if not instance:
+            args = dict(self.get_fleet_deploy_args())
+            args["name"] = spec.get("name")
+            args["displayname"] = spec.get("display_name") or spec.get("name")
+            args["ipaddress"] = spec.get("ip_address")
+            args["ip6address"] = spec.get("ip6_address")
+            if spec.get("group"):
+                args["group"] = spec.get("group")
+            return "deployVirtualMachine", args
+
+        instance_state = instance["state"].lower()
+        if state == "started" and instance_state in ["stopped", "stopping"]:
+            return "startVirtualMachine", {"id": instance["id"], "hostid": self.get_host_id()}
+
+        if state == "stopped" and instance_state in ["starting", "running"]:
+            return "stopVirtualMachine", {"id": instance["id"]}
+
+        return None, None
+
+    def present_instances(self):
+        state = self.module.params.get("state")
+        specs = self.module.params.get("instances")
+        index = self.get_instances()
+
+        instances = []
+        commands = []
+        changes = []
+        changed = self.result["changed"]
+        for spec in specs:
+            instance_name = spec.get("name") or spec.get("display_name")
+            matches = index.get(instance_name.lower(), [])
+            if len(matches) > 1:
+                self.module.fail_json(
+                    msg="Multiple instances found with name / displayname '%s', consider using the 'match_display_name=false' option" % instance_name
+                )
+            instance = matches[0] if matches else None
+
+            # Track changes per instance
+            self.result["changed"] = False
+
+            if instance and state not in ["absent", "destroyed", "expunged"]:
+                instance = self.recover_instance(instance=instance)
+
+                args_instance_update = {
+                    "id": instance["id"],
+                    "group": spec.get("group"),
+                    "displayname": spec.get("display_name"),
+                }
+                if self.has_changed(args_instance_update, instance):
+                    self.result["changed"] = True
+                    if not self.module.check_mode:
+                        instance = self.query_api("updateVirtualMachine", **args_instance_update)["virtualmachine"]
+
+            command, args = self._plan_instance(spec, instance)
+            if command:
+                self.result["changed"] = True
+            instances.append(instance)
+            commands.append((command, args))
+            changes.append(self.result["changed"])
+            changed = changed or self.result["changed"]
+        self.result["changed"] = changed
+
+        # Run the jobs in windows of max_jobs, the jobs of a window are awaited together
+        if not self.module.check_mode:
+            planned = [idx for idx, (command, args) in enumerate(commands) if command]
+            planned_commands = [commands[idx] for idx in planned]
+            if self.module.params.get("poll_async"):
+                jobs = self.run_jobs(planned_commands, key="virtualmachine", window=self.module.params.get("max_jobs"))
+            else:
+                jobs = [self.query_api(command, **args) for command, args in planned_commands]
+
+            for idx, job in zip(planned, jobs):
+                if job is None:
+                    continue
+                if "jobid" not in job:
+                    instances[idx] = job
+                elif instances[idx] is None and "id" in job:
+                    # Not polled deployment, only the ID is known
+                    instances[idx] = {"id": job["id"]}
+
+        if state not in ["absent", "destroyed", "expunged"]:
+            self.ensure_instances_tags(specs, instances, changes)
+
+        return self.get_instances_result(specs, instances, changes)
+
+    def ensure_instances_tags(self, specs, instances, changes):
+        tag_jobs = []
+        changed = self.result["changed"]
+        for idx, (spec, instance) in enumerate(zip(specs, instances)):
+            tags = spec.get("tags")
+            if tags is None:
+                tags = self.module.params.get("tags")
+            if tags is None:
+                continue
+
+            # In check mode instances to be deployed are unknown
+            if not instance or "id" not in instance:
+                changes[idx] = changes[idx] or bool(tags)
+                continue
+
+            self.result["changed"] = False
+
+            if "tags" not in instance:
+                instance["tags"] = []
+
+            tags_to_delete = self._tags_that_should_not_exist(instance, tags)
+            tags_to_create = self._tags_that_should_exist_or_be_updated(instance, tags)
+
+            # Updated tags must be deleted before created again
+            if set(tag["key"] for tag in tags_to_delete) & set(tag["key"] for tag in tags_to_create):
+                self._process_tags(instance, "UserVm", tags_to_delete, operation="delete")
+                tag_jobs.append(self._process_tags(instance, "UserVm", tags_to_create, poll_async=False))
+            else:
+                tag_jobs.append(self._process_tags(instance, "UserVm", tags_to_delete, operation="delete", poll_async=False))
+                tag_jobs.append(self._process_tags(instance, "UserVm", tags_to_create, poll_async=False))
+            changes[idx] = changes[idx] or self.result["changed"]
+            changed = changed or self.result["changed"]
+        self.result["changed"] = changed
+        self.poll_jobs(tag_jobs)
+
+    def get_instances_result(self, specs, instances, changes):
+        # Refresh all instances with one listing
+        ids = [instance["id"] for instance in instances if instance and "id" in instance]
+        refreshed = {}
+        if ids and not self.module.check_mode:
+            args = {
+                "ids": ids,
+                "account": self.get_account(key="name"),
+                "domainid": self.get_domain(key="id"),
+                "projectid": self.get_project(key="id"),
+                "fetch_list": True,
+            }
+            for instance in self.query_api("listVirtualMachines", **args) or []:
+                refreshed[instance["id"]] = instance
+
+        results = []
+        for spec, instance, changed in zip(specs, instances, changes):
+            if instance and "id" in instance and not self.module.check_mode:
+                # Instances not listed anymore were expunged
+                instance = refreshed.get(instance["id"])
+            result = self.update_result(instance)
+            result.setdefault("name", spec.get("name"))
+            result.setdefault("display_name", spec.get("display_name") or spec.get("name"))
+            result["changed"] = changed
+            results.append(result)
+
+            if instance and instance.get("state", "").lower() == "error":
+                self.fail_json(msg="Instance named '%s' in error state." % result["name"], instances=results)
+
+        self.result["instances"] = results
+        return self.result
+
+
 def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(
@@ -1198,24 +1491,51 @@ def main():
             poll_async=dict(type="bool", default=True),
             allow_root_disk_shrink=dict(type="bool", default=False),
             match_display_name=dict(type="bool", default=True),
+            instances=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    name=dict(),
+                    display_name=dict(),
+                    group=dict(),
+                    ip_address=dict(),
+                    ip6_address=dict(),
+                    tags=dict(type="list", elements="dict"),
+                ),
+                required_one_of=(["display_name", "name"],),
+            ),
+            max_jobs=dict(type="int", default=10),
         )
     )
 
     module = AnsibleModule(
         argument_spec=argument_spec,
         required_together=cs_required_together(),
-        required_one_of=(["display_name", "name"],),
+        required_one_of=(["display_name", "name", "instances"],),
         mutually_exclusive=(
             ["template", "iso"],
             ["user_data", "user_data_name"],
+            ["instances", "name"],
+            ["instances", "display_name"],
+            ["instances", "ip_address"],
+            ["instances", "ip6_address"],
+            ["instances", "ip_to_networks"],
         ),
         supports_check_mode=True,
     )
 
-    ainstance = AnsibleCloudStackInstance(module)
-
     state = module.params.get("state")
 
+    if module.params.get("instances") is not None:
+        if state in ["restored", "restarted"]:
+            module.fail_json(msg="State '%s' is not supported with instances." % state)
+
+        ainstances = AnsibleCloudStackInstanceFleet(module)
+        result = ainstances.present_instances()
+        module.exit_json(**result)
+
+    ainstance = AnsibleCloudStackInstance(module)
+
     if state in ["absent", "destroyed"]:
         instance = ainstance.absent_instance()
 
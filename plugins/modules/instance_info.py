@@ -47,6 +47,30 @@ options:
       - Filter by host name.
     type: str
     version_added: 2.2.0
+  volumes:
+    description:
+      - Whether to return the volumes of the instances.
+      - The volumes of all instances are queried at once unless I(name) is given.
+    type: bool
+    default: true
+    version_added: 3.4.0
+  details:
+    description:
+      - Details of the instances to be returned by the API.
+      - If not given, all details are returned.
+      - Use V(min) to only get the minimal details, which reduces the size of the API responses for large numbers of instances.
+    type: list
+    elements: str
+    choices: [ all, group, nics, stats, secgrp, tmpl, servoff, diskoff, backoff, iso, volume, min, affgrp ]
+    version_added: 3.4.0
+  fields:
+    description:
+      - Keys of the returned instances to be kept, e.g. V(name), V(state) or V(volumes).
+      - The volumes of the instances are only queried if V(volumes) is in the list, see also I(volumes).
+      - If not given, all keys are returned.
+    type: list
+    elements: str
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 """
@@ -73,6 +97,14 @@ EXAMPLES = """
   ngine_io.cloudstack.instance_info:
     host: host01.example.com
   register: vms
+
+- name: Gather the name and state of all instances only
+  ngine_io.cloudstack.instance_info:
+    details: min
+    fields:
+      - name
+      - state
+  register: vms
 """
 
 RETURN = """
@@ -297,8 +329,13 @@ class AnsibleCloudStackInstanceInfo(AnsibleCloudStack):
             "keypair": "ssh_key",
             "hostname": "host",
         }
+        self.volumes = None
+        self.host = None
 
     def get_host(self, key=None):
+        if self.host:
+            return self._get_by_key(key, self.host)
+
         host = self.module.params.get("host")
         if not host:
             return
@@ -310,15 +347,17 @@ class AnsibleCloudStackInstanceInfo(AnsibleCloudStack):
         if res:
             for h in res:
                 if host.lower() in [h["id"], h["ipaddress"], h["name"].lower()]:
-                    return self._get_by_key(key, h)
+                    self.host = h
+                    return self._get_by_key(key, self.host)
         self.fail_json(msg="Host not found: %s" % host)
 
-    def get_instances(self):
+    def iter_instances(self):
         args = {
             "account": self.get_account(key="name"),
             "domainid": self.get_domain(key="id"),
             "projectid": self.get_project(key="id"),
             "hostid": self.get_host(key="id"),
+            "details": self.module.params.get("details"),
             "fetch_list": True,
         }
         instance_name = self.module.params.get("name")
@@ -327,22 +366,42 @@ class AnsibleCloudStackInstanceInfo(AnsibleCloudStack):
             args["keyword"] = instance_name
 
         # Do not pass zoneid, as the instance name must be unique across zones.
-        instances = self.query_api("listVirtualMachines", **args)
-
-        if not instance_name:
-            return instances or []
+        instances = self.query_api_iter("listVirtualMachines", **args)
 
         match_display_name = self.module.params.get("match_display_name")
-        matches = []
-        if instances:
-            for v in instances:
-                if instance_name.lower() == v["name"].lower() or (match_display_name and instance_name.lower() == v["displayname"].lower()):
-                    matches.append(v)
-        return matches
+        for v in instances:
+            if not instance_name or instance_name.lower() == v["name"].lower() or (match_display_name and instance_name.lower() == v["displayname"].lower()):
+                yield v
+
+    def get_instances(self):
+        return list(self.iter_instances())
+
+    def get_volumes_index(self):
+        """Return the volumes of all instances indexed by instance ID, queried at once.
+
+        The volumes are scoped like the instances, e.g. to the volumes of instances on the host.
+        """
+        if self.volumes is None:
+            args = {
+                "account": self.get_account(key="name"),
+                "domainid": self.get_domain(key="id"),
+                "projectid": self.get_project(key="id"),
+                "hostid": self.get_host(key="id"),
+                "fetch_list": True,
+            }
+            self.volumes = {}
+            for vol in self.query_api_iter("listVolumes", **args):
+                if vol.get("virtualmachineid"):
+                    self.volumes.setdefault(vol["virtualmachineid"], []).append({"size": vol["size"], "type": vol["type"], "name": vol["name"]})
+        return self.volumes
 
     def get_volumes(self, instance):
         volume_details = []
         if instance:
+            # Few instances are expected to match the name, query their volumes only
+            if not self.module.params.get("name"):
+                return self.get_volumes_index().get(instance["id"], [])
+
             args = {
                 "account": self.get_account(key="name"),
                 "domainid": self.get_domain(key="id"),
@@ -358,10 +417,17 @@ class AnsibleCloudStackInstanceInfo(AnsibleCloudStack):
         return volume_details
 
     def run(self):
-        instances = self.get_instances()
+        # The API data of an instance is dropped as soon as its result is built
+        instances = [self.trim_result(self.update_result(resource)) for resource in self.iter_instances()]
         if self.module.params.get("name") and not instances:
             self.module.fail_json(msg="Instance not found: %s" % self.module.params.get("name"))
-        return {"instances": [self.update_result(resource) for resource in instances]}
+        return self.add_api_stats({"instances": instances})
+
+    def trim_result(self, result):
+        fields = self.module.params.get("fields")
+        if not fields:
+            return result
+        return dict((key, value) for key, value in result.items() if key in fields)
 
     def update_result(self, resource, result=None):
         result = super(AnsibleCloudStackInstanceInfo, self).update_result(resource, result)
@@ -381,9 +447,11 @@ class AnsibleCloudStackInstanceInfo(AnsibleCloudStack):
                     if nic["isdefault"] and "ipaddress" in nic:
                         result["default_ip"] = nic["ipaddress"]
                 result["nic"] = resource["nic"]
-            volumes = self.get_volumes(instance=resource)
-            if volumes:
-                result["volumes"] = volumes
+            fields = self.module.params.get("fields")
+            if self.module.params.get("volumes") and (not fields or "volumes" in fields):
+                volumes = self.get_volumes(instance=resource)
+                if volumes:
+                    result["volumes"] = volumes
         return result
 
 
@@ -397,6 +465,13 @@ def main():
             project=dict(type="str"),
             host=dict(type="str"),
             match_display_name=dict(type="bool", default=True),
+            volumes=dict(type="bool", default=True),
+            details=dict(
+                type="list",
+                elements="str",
+                choices=["all", "group", "nics", "stats", "secgrp", "tmpl", "servoff", "diskoff", "backoff", "iso", "volume", "min", "affgrp"],
+            ),
+            fields=dict(type="list", elements="str"),
         )
     )
 
@@ -177,7 +177,7 @@ class AnsibleCloudStackLbInternalMember(AnsibleCloudStack):
     def __init__(self, module):
         super(AnsibleCloudStackLbInternalMember, self).__init__(module)
         self.lb_internal = None
-        self.vms = None
+        self.vms = dict()
         self.returns = {
             "algorithm": "algorithm",
             "networkid": "network_id",
@@ -225,17 +225,20 @@ class AnsibleCloudStackLbInternalMember(AnsibleCloudStack):
 
         return None
 
-    def _get_vms(self):
-        """Return the instances of the load balanced network."""
-        if self.vms is None:
-            args = {
-                "account": self.get_account(key="name"),
-                "domainid": self.get_domain(key="id"),
-                "networkid": self.get_network(key="id"),
-                "projectid": self.get_project(key="id"),
-                "fetch_list": True,
-            }
-            self.vms = self.query_api("listVirtualMachines", **args) or []
+    def _get_vms(self, names=None, ids=None):
+        """Return the instances of the load balanced network by name and UUID.
+
+        Only the wanted names or the UUIDs are listed, found instances are kept for the diff and the result.
+        """
+        args = {
+            "networkid": self.get_network(key="id"),
+        }
+        if ids is not None:
+            ids = [i for i in ids if i not in self.vms]
+            if not ids:
+                return self.vms
+            args["ids"] = ids
+        self.vms.update(self.get_vms_index(names or [], **args))
         return self.vms
 
     def _get_member_ids(self, lb_internal):
@@ -249,11 +252,8 @@ class AnsibleCloudStackLbInternalMember(AnsibleCloudStack):
     def _get_member_names(self, lb_internal):
         """Return the user facing names of the instances assigned to the load balancer."""
         member_ids = self._get_member_ids(lb_internal)
-        names = []
-        for vm in self._get_vms():
-            if vm["id"] in member_ids:
-                names.append(vm["name"])
-        return sorted(names)
+        vms = self._get_vms(ids=member_ids)
+        return sorted(vms[i]["name"] for i in member_ids if i in vms)
 
     def _ensure_members(self, operation):
         lb_internal = self.get_lb_internal()
@@ -262,16 +262,13 @@ class AnsibleCloudStackLbInternalMember(AnsibleCloudStack):
 
         # Resolve the wanted instances to UUIDs. Only instances of the load balanced network
         # can be assigned, so a name not found here would fail in the API anyway.
-        by_name = dict()
-        for vm in self._get_vms():
-            by_name[vm["name"]] = vm["id"]
-            by_name[vm["id"]] = vm["id"]
+        vms = self._get_vms(names=self.module.params.get("vms"))
 
         wanted_ids = []
         for name in self.module.params.get("vms"):
-            if name not in by_name:
+            if name not in vms:
                 self.fail_json(msg="Instance not found in network %s: %s" % (self.module.params.get("network"), name))
-            wanted_ids.append(by_name[name])
+            wanted_ids.append(vms[name]["id"])
 
         existing_ids = self._get_member_ids(lb_internal)
 
@@ -287,7 +284,7 @@ class AnsibleCloudStackLbInternalMember(AnsibleCloudStack):
         if not to_change_ids:
             return lb_internal
 
-        id_to_name = dict((vm["id"], vm["name"]) for vm in self._get_vms())
+        id_to_name = dict((vm["id"], vm["name"]) for vm in self._get_vms(ids=existing_ids).values())
         self.result["changed"] = True
         self.result["diff"]["before"]["vms"] = sorted(id_to_name.get(i, i) for i in existing_ids)
         self.result["diff"]["after"]["vms"] = sorted(id_to_name.get(i, i) for i in after_ids)
@@ -267,17 +267,17 @@ class AnsibleCloudStackLBRuleMember(AnsibleCloudStack):
         if not to_change:
             return rule
 
-        args = self._get_common_args()
-        args["fetch_list"] = True
-        vms = self.query_api("listVirtualMachines", **args)
+        if operation == "add":
+            # Only instances in the network of the rule can be assigned
+            vms = self.get_vms_index(to_change, zoneid=rule.get("zoneid"), networkid=rule.get("networkid"))
+        else:
+            vms = dict((name, {"id": vm_id}) for name, vm_id in existing.items())
+
         to_change_ids = []
         for name in to_change:
-            for vm in vms:
-                if vm["name"] == name:
-                    to_change_ids.append(vm["id"])
-                    break
-            else:
+            if name not in vms:
                 self.module.fail_json(msg="Unknown VM: %s" % name)
+            to_change_ids.append(vms[name]["id"])
 
         if to_change_ids:
             self.result["changed"] = True
@@ -34,8 +34,8 @@ options:
   rule_position:
     description:
       - The position of the network ACL rule.
+      - Required if I(rules) is not given.
     type: int
-    required: true
     aliases: [ number ]
   protocol:
     description:
@@ -123,6 +123,77 @@ options:
       - Poll async jobs until job has finished.
     type: bool
     default: true
+  rules:
+    description:
+      - Complete ordered list of the rules of the network ACL to be reconciled in one run.
+      - The rules of the ACL are listed once and compared by rule position, rules not in the list are removed.
+      - The jobs to create, update and remove rules are run concurrently, see I(max_jobs).
+      - If I(state=absent), the rules at the positions of the list are removed.
+      - Mutually exclusive with I(rule_position), I(start_port), I(end_port), I(icmp_type), I(icmp_code) and I(tags).
+    type: list
+    elements: dict
+    version_added: 3.4.0
+    suboptions:
+      rule_position:
+        description:
+          - The position of the network ACL rule.
+          - Defaults to the position of the previous rule plus one, starting at V(1).
+        type: int
+        aliases: [ number ]
+      cidrs:
+        description:
+          - CIDRs of the rule.
+          - Defaults to I(cidrs) of the module.
+        type: list
+        elements: str
+        aliases: [ cidr ]
+      protocol:
+        description:
+          - Protocol of the rule.
+          - Defaults to I(protocol) of the module.
+        type: str
+        choices: [ tcp, udp, icmp, all, by_number ]
+      protocol_number:
+        description:
+          - Protocol number from 1 to 256 required if I(protocol=by_number).
+        type: int
+      start_port:
+        description:
+          - Start port for this rule.
+        type: int
+        aliases: [ port ]
+      end_port:
+        description:
+          - End port for this rule, defaults to I(start_port).
+        type: int
+      icmp_type:
+        description:
+          - Type of the icmp message being sent.
+        type: int
+      icmp_code:
+        description:
+          - Error code for this icmp message.
+        type: int
+      traffic_type:
+        description:
+          - Traffic type of the rule.
+          - Defaults to I(traffic_type) of the module.
+        type: str
+        choices: [ ingress, egress ]
+        aliases: [ type ]
+      action_policy:
+        description:
+          - Action policy of the rule.
+          - Defaults to I(action_policy) of the module.
+        type: str
+        choices: [ allow, deny ]
+        aliases: [ action ]
+  max_jobs:
+    description:
+      - Maximum number of jobs creating, updating or removing rules of I(rules) running at once.
+    type: int
+    default: 10
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 """
@@ -160,6 +231,22 @@ EXAMPLES = """
     vpc: my vpc
     zone: zone01
     state: absent
+
+- name: ensure the network ACL has exactly these rules
+  ngine_io.cloudstack.network_acl_rule:
+    network_acl: web
+    vpc: my vpc
+    zone: zone01
+    rules:
+      - port: 80
+      - port: 443
+      - protocol: icmp
+        icmp_type: -1
+        icmp_code: -1
+        cidr: 10.0.0.0/8
+      - rule_position: 100
+        protocol: all
+        action_policy: deny
 """
 
 RETURN = """
@@ -259,6 +346,21 @@ zone:
   returned: success
   type: str
   sample: ch-gva-2
+rules:
+  description:
+    - Rules of I(rules) having the same keys as a single rule.
+    - If I(state=absent), the removed rules.
+  returned: if I(rules) is given
+  type: list
+  elements: dict
+  sample: '[ { "rule_position": 1, "protocol": "tcp", "start_port": 80, "end_port": 80, "cidrs": [ "0.0.0.0/0" ] } ]'
+  version_added: 3.4.0
+plan:
+  description: Rule positions created, updated and removed to reconcile I(rules).
+  returned: if I(rules) is given
+  type: dict
+  sample: '{ "create": [ 3 ], "update": [ 1 ], "delete": [ 4, 5 ] }'
+  version_added: 3.4.0
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -390,16 +492,124 @@ class AnsibleCloudStackNetworkAclRule(AnsibleCloudStack):
 
         return network_acl_rule
 
-    def get_result(self, resource):
-        super(AnsibleCloudStackNetworkAclRule, self).get_result(resource)
+    def get_rule_result(self, resource, result=None):
+        result = self.update_result(resource, result)
         if resource:
             if "cidrlist" in resource:
-                self.result["cidrs"] = resource["cidrlist"].split(",") or [resource["cidrlist"]]
+                result["cidrs"] = resource["cidrlist"].split(",") or [resource["cidrlist"]]
             if resource["protocol"] not in ["tcp", "udp", "icmp", "all"]:
-                self.result["protocol_number"] = int(resource["protocol"])
-                self.result["protocol"] = "by_number"
-            self.result["action_policy"] = self.result["action_policy"].lower()
-            self.result["traffic_type"] = self.result["traffic_type"].lower()
+                result["protocol_number"] = int(resource["protocol"])
+                result["protocol"] = "by_number"
+            result["action_policy"] = result["action_policy"].lower()
+            result["traffic_type"] = result["traffic_type"].lower()
+        return result
+
+    def get_result(self, resource):
+        return self.get_rule_result(resource, self.result)
+
+
+class AnsibleCloudStackNetworkAclRules(AnsibleCloudStackNetworkAclRule):
+    """Reconciles all rules of a network ACL by rule position in one run."""
+
+    def get_rule_specs(self):
+        specs = {}
+        rule_position = 0
+        for rule in self.module.params.get("rules"):
+            spec = dict(rule)
+            for param in ["cidrs", "protocol", "traffic_type", "action_policy"]:
+                if spec.get(param) is None:
+                    spec[param] = self.module.params.get(param)
+            spec["end_port"] = spec.get("end_port") or spec.get("start_port")
+
+            rule_position = spec["rule_position"] or rule_position + 1
+            if rule_position in specs:
+                self.module.fail_json(msg="Duplicate rule position in rules: %s" % rule_position)
+            spec["rule_position"] = rule_position
+
+            protocol = spec["protocol"]
+            if protocol in ["tcp", "udp"] and spec["start_port"] is None:
+                self.module.fail_json(msg="protocol is %s but the following are missing in rule %s: start_port, end_port" % (protocol, rule_position))
+
+            elif protocol == "icmp" and (spec["icmp_type"] is None or spec["icmp_code"] is None):
+                self.module.fail_json(msg="protocol is icmp but the following are missing in rule %s: icmp_type, icmp_code" % rule_position)
+
+            elif protocol == "by_number" and spec["protocol_number"] is None:
+                self.module.fail_json(msg="protocol is by_number but the following are missing in rule %s: protocol_number" % rule_position)
+            specs[rule_position] = spec
+        return specs
+
+    def get_network_acl_rules(self):
+        """Index the rules of the network ACL by rule position with one listing."""
+        args = {
+            "aclid": self.get_network_acl(key="id"),
+            "account": self.get_account(key="name"),
+            "domainid": self.get_domain(key="id"),
+            "projectid": self.get_project(key="id"),
+            "fetch_list": True,
+        }
+        return dict((int(rule["number"]), rule) for rule in self.query_api("listNetworkACLs", **args) or [])
+
+    def get_rule_args(self, spec):
+        protocol = spec["protocol"]
+        return {
+            "action": spec["action_policy"],
+            "protocol": protocol if protocol != "by_number" else str(spec["protocol_number"]),
+            "startport": spec["start_port"],
+            "endport": spec["end_port"],
+            "number": spec["rule_position"],
+            "icmpcode": spec["icmp_code"],
+            "icmptype": spec["icmp_type"],
+            "traffictype": spec["traffic_type"],
+            "cidrlist": ",".join(spec["cidrs"]),
+        }
+
+    def reconcile_network_acl_rules(self):
+        state = self.module.params.get("state")
+        specs = self.get_rule_specs()
+        index = self.get_network_acl_rules()
+
+        plan = {"create": [], "update": [], "delete": []}
+        commands = []
+        rules = {}
+        if state == "absent":
+            for rule_position in specs:
+                if rule_position in index:
+                    plan["delete"].append(rule_position)
+                    rules[rule_position] = index[rule_position]
+        else:
+            for rule_position, spec in specs.items():
+                args = self.get_rule_args(spec)
+                rule = index.get(rule_position)
+                if rule is None:
+                    plan["create"].append(rule_position)
+                    commands.append(("createNetworkACL", dict(args, aclid=self.get_network_acl(key="id"))))
+                    # Known values of the rule until it is created
+                    rule = dict((k, v) for k, v in args.items() if v is not None)
+                elif self.has_changed(args, rule):
+                    plan["update"].append(rule_position)
+                    args.pop("number")
+                    commands.append(("updateNetworkACLItem", dict(args, id=rule["id"])))
+                    rule = dict(rule, **dict((k, v) for k, v in args.items() if v is not None))
+                rules[rule_position] = rule
+            plan["delete"] = sorted(set(index) - set(specs))
+
+        commands.extend(("deleteNetworkACL", {"id": index[rule_position]["id"]}) for rule_position in plan["delete"])
+
+        if commands:
+            self.result["changed"] = True
+
+        if commands and not self.module.check_mode:
+            if self.module.params.get("poll_async"):
+                results = self.run_jobs(commands, key="networkacl", window=self.module.params.get("max_jobs"))
+                for res in results:
+                    if res and "jobid" not in res and "number" in res:
+                        rules[int(res["number"])] = res
+            else:
+                for command, args in commands:
+                    self.query_api(command, **args)
+
+        self.result["plan"] = plan
+        self.result["rules"] = [self.get_rule_result(rule) for rule_position, rule in sorted(rules.items())]
         return self.result
 
 
@@ -408,7 +618,7 @@ def main():
     argument_spec.update(
         dict(
             network_acl=dict(required=True, aliases=["acl"]),
-            rule_position=dict(required=True, type="int", aliases=["number"]),
+            rule_position=dict(type="int", aliases=["number"]),
             vpc=dict(required=True),
             cidrs=dict(type="list", elements="str", default=["0.0.0.0/0"], aliases=["cidr"]),
             protocol=dict(choices=["tcp", "udp", "icmp", "all", "by_number"], default="tcp"),
@@ -426,6 +636,25 @@ def main():
             project=dict(),
             tags=dict(type="list", elements="dict", aliases=["tag"]),
             poll_async=dict(type="bool", default=True),
+            rules=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    rule_position=dict(type="int", aliases=["number"]),
+                    cidrs=dict(type="list", elements="str", aliases=["cidr"]),
+                    protocol=dict(choices=["tcp", "udp", "icmp", "all", "by_number"]),
+                    protocol_number=dict(type="int"),
+                    start_port=dict(type="int", aliases=["port"]),
+                    end_port=dict(type="int"),
+                    icmp_type=dict(type="int"),
+                    icmp_code=dict(type="int"),
+                    traffic_type=dict(choices=["ingress", "egress"], aliases=["type"]),
+                    action_policy=dict(choices=["allow", "deny"], aliases=["action"]),
+                ),
+                required_together=(["icmp_type", "icmp_code"],),
+                mutually_exclusive=(["icmp_type", "start_port"], ["icmp_type", "end_port"]),
+            ),
+            max_jobs=dict(type="int", default=10),
         )
     )
 
@@ -439,13 +668,25 @@ def main():
     module = AnsibleModule(
         argument_spec=argument_spec,
         required_together=cs_required_together(),
+        required_one_of=(["rule_position", "rules"],),
         mutually_exclusive=(
             ["icmp_type", "start_port"],
             ["icmp_type", "end_port"],
+            ["rules", "rule_position"],
+            ["rules", "start_port"],
+            ["rules", "end_port"],
+            ["rules", "icmp_type"],
+            ["rules", "icmp_code"],
+            ["rules", "tags"],
         ),
         supports_check_mode=True,
     )
 
+    if module.params.get("rules") is not None:
+        anetwork_acl_rules = AnsibleCloudStackNetworkAclRules(module)
+        result = anetwork_acl_rules.reconcile_network_acl_rules()
+        module.exit_json(**result)
+
     anetwork_acl_rule = AnsibleCloudStackNetworkAclRule(module)
 
     state = module.params.get("state")
@@ -136,7 +136,7 @@ class AnsibleCloudStackPodInfo(AnsibleCloudStack):
             pods = pods["pod"]
         else:
             pods = []
-        return {"pods": [self.update_result(self._transform_ip_list(resource)) for resource in pods]}
+        return self.add_api_stats({"pods": [self.update_result(self._transform_ip_list(resource)) for resource in pods]})
 
 
 def main():
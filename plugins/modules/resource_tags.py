@@ -0,0 +1,427 @@
+#!/usr/bin/python
+# -*- coding: utf-8 -*-
+#
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+
+DOCUMENTATION = """
+---
+module: resource_tags
+short_description: Manages tags of many resources on Apache CloudStack based clouds.
+description:
+    - Create, update and remove tags of a set of resources of a resource type at once.
+    - The resources are selected by IDs, names or their existing tags.
+    - Resources needing the same tags to be created or removed are tagged by a single job per I(batch_size) resources.
+author: agent (@agent)
+version_added: 3.4.0
+options:
+  resource_type:
+    description:
+      - Type of the resources, e.g. C(UserVm), C(Volume), C(Template), C(Snapshot), C(Network) or C(PublicIpAddress).
+    type: str
+    required: true
+  resource_ids:
+    description:
+      - IDs of the resources.
+      - Mutually exclusive with I(resource_names) and I(filter_tags).
+    type: list
+    elements: str
+    aliases: [ resource_id ]
+  resource_names:
+    description:
+      - Names of the resources.
+      - Only supported for I(resource_type) C(UserVm), C(Volume), C(Template), C(ISO), C(Snapshot), C(Network), C(Vpc) and C(SecurityGroup).
+      - Mutually exclusive with I(resource_ids) and I(filter_tags).
+    type: list
+    elements: str
+    aliases: [ resource_name ]
+  filter_tags:
+    description:
+      - Select the resources having all of these tags.
+      - Mutually exclusive with I(resource_ids) and I(resource_names).
+    type: list
+    elements: dict
+    suboptions:
+      key:
+        description:
+          - Key of the tag.
+        type: str
+        required: true
+      value:
+        description:
+          - Value of the tag, any value if not given.
+        type: str
+  tags:
+    description:
+      - List of tags. Tags are a list of dictionaries having keys I(key) and I(value).
+      - If I(state=present), tags with another value are updated.
+      - If I(state=absent), the tags are removed, a tag without I(value) is removed regardless of its value.
+    type: list
+    elements: dict
+    required: true
+    aliases: [ tag ]
+    suboptions:
+      key:
+        description:
+          - Key of the tag.
+        type: str
+        required: true
+      value:
+        description:
+          - Value of the tag.
+          - Required if I(state=present).
+        type: str
+  purge:
+    description:
+      - Whether to remove the tags of the resources not in I(tags) if I(state=present).
+    type: bool
+    default: false
+  state:
+    description:
+      - State of the tags.
+    type: str
+    default: present
+    choices: [ present, absent ]
+  domain:
+    description:
+      - Domain the resources are related to.
+    type: str
+  account:
+    description:
+      - Account the resources are related to.
+    type: str
+  project:
+    description:
+      - Name of the project the resources are related to.
+    type: str
+  batch_size:
+    description:
+      - Maximum number of resources tagged by a single job.
+    type: int
+    default: 500
+  max_jobs:
+    description:
+      - Maximum number of jobs running at once.
+    type: int
+    default: 10
+  poll_async:
+    description:
+      - Poll async jobs until job has finished.
+      - Jobs removing tags to be updated are always awaited.
+    type: bool
+    default: true
+extends_documentation_fragment:
+- ngine_io.cloudstack.cloudstack
+"""
+
+EXAMPLES = """
+- name: Tag volumes by name
+  ngine_io.cloudstack.resource_tags:
+    resource_type: Volume
+    resource_names:
+      - web-01-data
+      - web-02-data
+    tags:
+      - key: backup
+        value: daily
+
+- name: Move the instances of a tier to another SLA
+  ngine_io.cloudstack.resource_tags:
+    resource_type: UserVm
+    filter_tags:
+      - key: tier
+        value: web
+    tags:
+      - key: sla
+        value: gold
+
+- name: Ensure the instances only have these tags
+  ngine_io.cloudstack.resource_tags:
+    resource_type: UserVm
+    resource_ids:
+      - 4f8a2b4e-3a5c-4a1e-9d4b-2f4c5e6a7b8c
+      - 9e6d5c4b-3a2f-4e1d-8c7b-6a5f4e3d2c1b
+    tags:
+      - key: sla
+        value: silver
+    purge: true
+
+- name: Remove a tag of any value
+  ngine_io.cloudstack.resource_tags:
+    resource_type: UserVm
+    filter_tags:
+      - key: maintenance
+    tags:
+      - key: maintenance
+    state: absent
+"""
+
+RETURN = """
+---
+resource_type:
+  description: Type of the resources.
+  returned: success
+  type: str
+  sample: Volume
+resources:
+  description: The tagged resources.
+  returned: success
+  type: list
+  elements: dict
+  contains:
+    id:
+      description: ID of the resource.
+      returned: success
+      type: str
+      sample: 04589590-ac63-4ffc-93f5-b698b8ac38b6
+    tags:
+      description: Tags of the resource.
+      returned: success
+      type: list
+      elements: dict
+      sample: [ { "key": "backup", "value": "daily" } ]
+"""
+
+from ansible.module_utils.basic import AnsibleModule
+
+from ..module_utils.cloudstack import AnsibleCloudStack, cs_argument_spec, cs_required_together
+
+# List commands and their args to resolve names of resources by resource type
+RESOURCE_LISTS = {
+    "UserVm": ("listVirtualMachines", {}),
+    "Volume": ("listVolumes", {}),
+    "Template": ("listTemplates", {"templatefilter": "self"}),
+    "ISO": ("listIsos", {"isofilter": "self"}),
+    "Snapshot": ("listSnapshots", {}),
+    "Network": ("listNetworks", {}),
+    "Vpc": ("listVPCs", {}),
+    "SecurityGroup": ("listSecurityGroups", {}),
+}
+
+# Up to this number of resources, the tags are listed per resource instead of all tags of the resource type
+TAGS_PER_RESOURCE_MAX = 10
+
+
+class AnsibleCloudStackResourceTags(AnsibleCloudStack):
+    """AnsibleCloudStackResourceTags"""
+
+    def _get_common_args(self):
+        return {
+            "account": self.get_account(key="name"),
+            "domainid": self.get_domain(key="id"),
+            "projectid": self.get_project(key="id"),
+            "fetch_list": True,
+        }
+
+    def get_tag_specs(self):
+        tags = {}
+        for tag in self.module.params.get("tags"):
+            if tag["key"] in tags:
+                self.module.fail_json(msg="Duplicate key in tags: %s" % tag["key"])
+            if tag["value"] is None and self.module.params.get("state") == "present":
+                self.module.fail_json(msg="missing required argument for state present in tags: value")
+            tags[tag["key"]] = tag["value"]
+        return tags
+
+    def get_resource_ids(self):
+        """Return the IDs of the selected resources."""
+        if self.module.params.get("resource_ids") is not None:
+            return list(dict.fromkeys(self.module.params.get("resource_ids")))
+
+        if self.module.params.get("resource_names") is not None:
+            return self.get_resource_ids_by_names(self.module.params.get("resource_names"))
+
+        resource_ids = None
+        for tag in self.module.params.get("filter_tags"):
+            args = self._get_common_args()
+            args.update(
+                {
+                    "resourcetype": self.module.params.get("resource_type"),
+                    "key": tag["key"],
+                    "value": tag["value"],
+                    "listall": True,
+                }
+            )
+            ids = set(t["resourceid"] for t in self.query_api("listTags", **args) or [])
+            resource_ids = ids if resource_ids is None else resource_ids & ids
+        return sorted(resource_ids or [])
+
+    def get_resource_ids_by_names(self, names):
+        resource_type = self.module.params.get("resource_type")
+        if resource_type not in RESOURCE_LISTS:
+            self.module.fail_json(msg="Selecting resources by names is not supported for resource type %s, use resource_ids." % resource_type)
+
+        command, args = RESOURCE_LISTS[resource_type]
+        args = dict(args, **self._get_common_args())
+        if len(names) == 1:
+            # The API matches the keyword as substring
+            args["keyword"] = names[0]
+
+        index = {}
+        for resource in self.query_api(command, **args) or []:
+            index.setdefault(resource["name"], []).append(resource["id"])
+
+        resource_ids = []
+        for name in names:
+            if name not in index:
+                self.module.fail_json(msg="Resource of type %s not found: %s" % (resource_type, name))
+            if len(index[name]) > 1:
+                self.module.fail_json(msg="More than one resource of type %s having name %s. Please use resource_ids." % (resource_type, name))
+            resource_ids.append(index[name][0])
+        return list(dict.fromkeys(resource_ids))
+
+    def get_existing_tags(self, resource_ids, keys):
+        """Return the tags of the resources by ID.
+
+        The tags of a few resources are listed per resource, else the tags of the resource type
+        are listed once per key or all at once if keys is None.
+        """
+        existing = dict((resource_id, {}) for resource_id in resource_ids)
+        if not resource_ids:
+            return existing
+
+        args = self._get_common_args()
+        args.update(
+            {
+                "resourcetype": self.module.params.get("resource_type"),
+                "listall": True,
+            }
+        )
+        if len(resource_ids) <= TAGS_PER_RESOURCE_MAX:
+            queries = [dict(resourceid=resource_id) for resource_id in resource_ids]
+        else:
+            queries = [dict(key=key) for key in (keys if keys is not None else [None])]
+
+        for query in queries:
+            for tag in self.query_api("listTags", **dict(args, **query)) or []:
+                if tag["resourceid"] in existing and (keys is None or tag["key"] in keys):
+                    existing[tag["resourceid"]][tag["key"]] = tag["value"]
+        return existing
+
+    def get_tag_commands(self, command, groups):
+        """Return the commands for groups of resources by the tags to be created or removed."""
+        batch_size = self.module.params.get("batch_size")
+        commands = []
+        for tags, resource_ids in groups.items():
+            for idx in range(0, len(resource_ids), batch_size):
+                args = {
+                    "resourceids": resource_ids[idx : idx + batch_size],
+                    "resourcetype": self.module.params.get("resource_type"),
+                    "tags": [dict(key=key, value=value) if value is not None else dict(key=key) for key, value in tags],
+                }
+                commands.append((command, args))
+        return commands
+
+    def ensure_resource_tags(self):
+        state = self.module.params.get("state")
+        purge = state == "present" and self.module.params.get("purge")
+        tags = self.get_tag_specs()
+
+        resource_ids = self.get_resource_ids()
+        existing = self.get_existing_tags(resource_ids, keys=None if purge else list(tags))
+
+        to_delete = {}
+        to_create = {}
+        resources = []
+        for resource_id in resource_ids:
+            current = existing[resource_id]
+            if state == "absent":
+                delete = [(key, current[key]) for key, value in tags.items() if key in current and value in (None, current[key])]
+                create = []
+            else:
+                delete = [(key, value) for key, value in current.items() if (key in tags and tags[key] != value) or (key not in tags and purge)]
+                create = [(key, value) for key, value in tags.items() if current.get(key) != value]
+
+            if delete:
+                # Tags are removed by key, resources are grouped regardless of the values
+                to_delete.setdefault(tuple(sorted((key, None) for key, value in delete)), []).append(resource_id)
+            if create:
+                to_create.setdefault(tuple(sorted(create)), []).append(resource_id)
+
+            after = dict(current)
+            for key, value in delete:
+                after.pop(key)
+            after.update(create)
+            resources.append({"id": resource_id, "tags": [{"key": key, "value": value} for key, value in sorted(after.items())]})
+
+        deletes = self.get_tag_commands("deleteTags", to_delete)
+        creates = self.get_tag_commands("createTags", to_create)
+        if deletes or creates:
+            self.result["changed"] = True
+
+        if not self.module.check_mode:
+            window = self.module.params.get("max_jobs")
+            # Updated tags must be deleted before created again
+            if self.module.params.get("poll_async") or creates:
+                self.run_jobs(deletes, window=window)
+            else:
+                for command, args in deletes:
+                    self.query_api(command, **args)
+
+            if self.module.params.get("poll_async"):
+                self.run_jobs(creates, window=window)
+            else:
+                for command, args in creates:
+                    self.query_api(command, **args)
+
+        self.result["resource_type"] = self.module.params.get("resource_type")
+        self.result["resources"] = resources
+        return self.result
+
+
+def main():
+    argument_spec = cs_argument_spec()
+    argument_spec.update(
+        dict(
+            resource_type=dict(type="str", required=True),
+            resource_ids=dict(type="list", elements="str", aliases=["resource_id"]),
+            resource_names=dict(type="list", elements="str", aliases=["resource_name"]),
+            filter_tags=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    key=dict(type="str", required=True, no_log=False),
+                    value=dict(type="str"),
+                ),
+            ),
+            tags=dict(
+                type="list",
+                elements="dict",
+                required=True,
+                aliases=["tag"],
+                options=dict(
+                    key=dict(type="str", required=True, no_log=False),
+                    value=dict(type="str"),
+                ),
+            ),
+            purge=dict(type="bool", default=False),
+            state=dict(type="str", choices=["present", "absent"], default="present"),
+            domain=dict(type="str"),
+            account=dict(type="str"),
+            project=dict(type="str"),
+            batch_size=dict(type="int", default=500),
+            max_jobs=dict(type="int", default=10),
+            poll_async=dict(type="bool", default=True),
+        )
+    )
+
+    module = AnsibleModule(
+        argument_spec=argument_spec,
+        required_together=cs_required_together(),
+        required_one_of=(["resource_ids", "resource_names", "filter_tags"],),
+        mutually_exclusive=(["resource_ids", "resource_names", "filter_tags"],),
+        supports_check_mode=True,
+    )
+
+    acs_resource_tags = AnsibleCloudStackResourceTags(module)
+    result = acs_resource_tags.ensure_resource_tags()
+    module.exit_json(**result)
+
+
+if __name__ == "__main__":
+    main()
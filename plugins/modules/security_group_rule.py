@@ -76,6 +76,70 @@ options:
       - Poll async jobs until job has finished.
     default: true
     type: bool
+  rules:
+    description:
+      - List of rules of the security group to be reconciled in one run.
+      - The security group is fetched once, missing rules differing only in the CIDR or user security group
+        are authorized together by one API call.
+      - If I(state=present), missing rules are authorized and with I(purge=true) other ingress and egress rules of the security group are revoked.
+      - If I(state=absent), the rules are revoked.
+      - Mutually exclusive with I(user_security_group), I(start_port), I(end_port), I(icmp_type) and I(icmp_code).
+    type: list
+    elements: dict
+    version_added: 3.4.0
+    suboptions:
+      type:
+        description:
+          - Ingress or egress security group rule.
+          - Defaults to I(type) of the module.
+        type: str
+        choices: [ ingress, egress ]
+      protocol:
+        description:
+          - Protocol of the security group rule.
+          - Defaults to I(protocol) of the module.
+        type: str
+        choices: [ tcp, udp, icmp, ah, esp, gre ]
+      cidrs:
+        description:
+          - List of CIDRs (full notation) to be used for security group rule.
+          - Defaults to I(cidr) of the module.
+        type: list
+        elements: str
+        aliases: [ cidr ]
+      user_security_group:
+        description:
+          - Security group this rule is based of.
+        type: str
+      start_port:
+        description:
+          - Start port for this rule. Required if I(protocol=tcp) or I(protocol=udp).
+        type: int
+        aliases: [ port ]
+      end_port:
+        description:
+          - End port for this rule, defaults to I(start_port).
+        type: int
+      icmp_type:
+        description:
+          - Type of the icmp message being sent. Required if I(protocol=icmp).
+        type: int
+      icmp_code:
+        description:
+          - Error code for this icmp message. Required if I(protocol=icmp).
+        type: int
+  purge:
+    description:
+      - Whether to revoke the rules of the security group not in I(rules) if I(state=present).
+    type: bool
+    default: false
+    version_added: 3.4.0
+  max_jobs:
+    description:
+      - Maximum number of jobs authorizing or revoking rules of I(rules) running at once.
+    type: int
+    default: 10
+    version_added: 3.4.0
 extends_documentation_fragment:
 - ngine_io.cloudstack.cloudstack
 """
@@ -117,6 +181,21 @@ EXAMPLES = """
     security_group: default
     port: 80
     user_security_group: web
+
+- name: ensure the rules of security group 'web', authorized by 2 API calls
+  ngine_io.cloudstack.security_group_rule:
+    security_group: web
+    rules:
+      - port: 443
+        cidrs:
+          - 10.0.0.0/8
+          - 172.16.0.0/12
+          - 192.168.0.0/16
+      - port: 443
+        cidr: 198.51.100.0/24
+      - port: 22
+        user_security_group: bastion
+    purge: true
 """
 
 RETURN = """
@@ -161,6 +240,22 @@ end_port:
   returned: success
   type: int
   sample: 80
+rules:
+  description:
+    - Rules of I(rules) by CIDR or user security group having the same keys as a single rule.
+    - If I(state=absent), the revoked rules.
+  returned: if I(rules) is given
+  type: list
+  elements: dict
+  sample: '[ { "type": "ingress", "protocol": "tcp", "start_port": 443, "end_port": 443, "cidr": "10.0.0.0/8" } ]'
+  version_added: 3.4.0
+purged_rules:
+  description: Rules revoked by I(purge=true).
+  returned: if I(rules) is given
+  type: list
+  elements: dict
+  sample: '[ { "type": "ingress", "protocol": "tcp", "start_port": 22, "end_port": 22, "cidr": "0.0.0.0/0" } ]'
+  version_added: 3.4.0
 """
 
 from ansible.module_utils.basic import AnsibleModule
@@ -327,6 +422,188 @@ class AnsibleCloudStackSecurityGroupRule(AnsibleCloudStack):
         return self.result
 
 
+class AnsibleCloudStackSecurityGroupRules(AnsibleCloudStackSecurityGroupRule):
+    """Reconciles the rules of a security group in one run."""
+
+    def get_security_groups(self, names):
+        """Return the security groups by name, listed once if user security groups are needed."""
+        if len(names) == 1:
+            return {names[0]: self.get_security_group(names[0])}
+
+        args = {
+            "projectid": self.get_project("id"),
+            "fetch_list": True,
+        }
+        security_groups = dict((sg["name"], sg) for sg in self.query_api("listSecurityGroups", **args) or [] if sg["name"] in names)
+        for name in names:
+            if name not in security_groups:
+                self.module.fail_json(msg="security group '%s' not found" % name)
+        return security_groups
+
+    def get_rule_specs(self):
+        specs = []
+        for rule in self.module.params.get("rules"):
+            spec = dict(rule)
+            for param in ["type", "protocol"]:
+                if spec.get(param) is None:
+                    spec[param] = self.module.params.get(param)
+            if spec.get("cidrs") is None:
+                spec["cidrs"] = [self.module.params.get("cidr")]
+            spec["end_port"] = spec.get("end_port") or spec.get("start_port")
+
+            protocol = spec["protocol"]
+            if protocol in ["tcp", "udp"] and spec["start_port"] is None:
+                self.module.fail_json(msg="no start_port or end_port set for protocol '%s' in rules" % protocol)
+
+            if protocol == "icmp" and (spec["icmp_type"] is None or spec["icmp_code"] is None):
+                self.module.fail_json(msg="no icmp_type or icmp_code set for protocol '%s' in rules" % protocol)
+            specs.append(spec)
+        return specs
+
+    def get_rule_key(self, sg_type, protocol, start_port=None, end_port=None, icmp_type=None, icmp_code=None):
+        """Return the normalized key of a rule by type, protocol and ports, without the CIDR or user security group."""
+        if protocol in ["tcp", "udp"]:
+            ports = (start_port, end_port)
+        elif protocol == "icmp":
+            ports = (icmp_type, icmp_code)
+        else:
+            ports = ()
+        return (sg_type, protocol) + ports
+
+    def get_existing_rule_key(self, sg_type, rule):
+        def get_int(key):
+            return int(rule[key]) if rule.get(key) is not None else None
+
+        key = self.get_rule_key(
+            sg_type,
+            rule["protocol"],
+            start_port=get_int("startport"),
+            end_port=get_int("endport"),
+            icmp_type=get_int("icmptype"),
+            icmp_code=get_int("icmpcode"),
+        )
+        if rule.get("securitygroupname"):
+            return key, ("group", rule["securitygroupname"])
+        return key, ("cidr", rule.get("cidr"))
+
+    def index_rules(self, security_group):
+        # Rules with the same key may exist more than once
+        index = {}
+        for sg_type in ["ingress", "egress"]:
+            for rule in security_group.get(sg_type + "rule") or []:
+                index.setdefault(self.get_existing_rule_key(sg_type, rule), []).append(dict(rule, type=sg_type))
+        return index
+
+    def reconcile_rules(self):
+        state = self.module.params.get("state")
+        security_group_name = self.module.params.get("security_group")
+        specs = self.get_rule_specs()
+
+        names = [security_group_name]
+        names.extend(set(spec["user_security_group"] for spec in specs if spec["user_security_group"]) - set(names))
+        security_groups = self.get_security_groups(names)
+        security_group = security_groups[security_group_name]
+        index = self.index_rules(security_group)
+
+        # Missing rules by key of type, protocol and ports, CIDRs and user security groups are authorized together
+        wanted = {}
+        existing = {}
+        to_authorize = {}
+        to_revoke = []
+        for spec in specs:
+            key = self.get_rule_key(spec["type"], spec["protocol"], spec["start_port"], spec["end_port"], spec["icmp_type"], spec["icmp_code"])
+            if spec["user_security_group"]:
+                targets = [("group", spec["user_security_group"])]
+            else:
+                targets = [("cidr", cidr) for cidr in spec["cidrs"]]
+
+            for target in targets:
+                if (key, target) in wanted:
+                    continue
+                wanted[(key, target)] = True
+
+                matches = index.pop((key, target), [])
+                if state == "absent":
+                    to_revoke.extend(matches)
+                elif matches:
+                    existing[(key, target)] = matches.pop(0)
+                    index[(key, target)] = matches
+                else:
+                    to_authorize.setdefault(key, ([], []))[0 if target[0] == "cidr" else 1].append(target[1])
+
+        # Unwanted rules and the extra copies of a wanted rule are purged
+        purged = []
+        if state == "present" and self.module.params.get("purge"):
+            purged = [rule for matches in index.values() for rule in matches]
+
+        commands = []
+        for key, (cidrs, groups) in to_authorize.items():
+            args = {
+                "securitygroupid": security_group["id"],
+                "projectid": self.get_project("id"),
+                "protocol": key[1],
+            }
+            if key[1] in ["tcp", "udp"]:
+                args["startport"], args["endport"] = key[2:]
+            elif key[1] == "icmp":
+                args["icmptype"], args["icmpcode"] = key[2:]
+
+            command = "authorizeSecurityGroupIngress" if key[0] == "ingress" else "authorizeSecurityGroupEgress"
+            if cidrs:
+                commands.append((command, dict(args, cidrlist=cidrs)))
+            if groups:
+                usersecuritygrouplist = [{"group": name, "account": security_groups[name]["account"]} for name in groups]
+                commands.append((command, dict(args, usersecuritygrouplist=usersecuritygrouplist)))
+        for rule in to_revoke + purged:
+            commands.append(("revokeSecurityGroupIngress" if rule["type"] == "ingress" else "revokeSecurityGroupEgress", {"id": rule["ruleid"]}))
+
+        if commands:
+            self.result["changed"] = True
+
+        if commands and not self.module.check_mode:
+            if self.module.params.get("poll_async"):
+                # The authorized rules are in the security group returned by the jobs
+                for res in self.run_jobs(commands, key="securitygroup", window=self.module.params.get("max_jobs")):
+                    if res and "jobid" not in res:
+                        for rule_key, matches in self.index_rules(res).items():
+                            existing.setdefault(rule_key, matches[0])
+            else:
+                for command, args in commands:
+                    self.query_api(command, **args)
+
+        if state == "absent":
+            rules = to_revoke
+        else:
+            rules = []
+            for key, target in wanted:
+                rule = existing.get((key, target))
+                if rule is None:
+                    # Known values of the rule until it is authorized
+                    rule = self.get_rule_from_key(key, target)
+                rules.append(rule)
+
+        self.result["rules"] = [self.get_rule_result(rule) for rule in rules]
+        self.result["purged_rules"] = [self.get_rule_result(rule) for rule in purged]
+        self.result["security_group"] = security_group_name
+        return self.result
+
+    def get_rule_from_key(self, key, target):
+        rule = {"type": key[0], "protocol": key[1]}
+        if key[1] in ["tcp", "udp"]:
+            rule["startport"], rule["endport"] = key[2:]
+        elif key[1] == "icmp":
+            rule["icmptype"], rule["icmpcode"] = key[2:]
+        rule["cidr" if target[0] == "cidr" else "securitygroupname"] = target[1]
+        return rule
+
+    def get_rule_result(self, rule):
+        result = self.update_result(rule)
+        if "ruleid" in rule:
+            result["id"] = rule["ruleid"]
+        result["type"] = rule["type"]
+        return result
+
+
 def main():
     argument_spec = cs_argument_spec()
     argument_spec.update(
@@ -343,6 +620,30 @@ def main():
             state=dict(choices=["present", "absent"], default="present"),
             project=dict(),
             poll_async=dict(type="bool", default=True),
+            rules=dict(
+                type="list",
+                elements="dict",
+                options=dict(
+                    type=dict(choices=["ingress", "egress"]),
+                    protocol=dict(choices=["tcp", "udp", "icmp", "ah", "esp", "gre"]),
+                    cidrs=dict(type="list", elements="str", aliases=["cidr"]),
+                    user_security_group=dict(),
+                    start_port=dict(type="int", aliases=["port"]),
+                    end_port=dict(type="int"),
+                    icmp_type=dict(type="int"),
+                    icmp_code=dict(type="int"),
+                ),
+                required_together=(["icmp_type", "icmp_code"],),
+                mutually_exclusive=(
+                    ["cidrs", "user_security_group"],
+                    ["icmp_type", "start_port"],
+                    ["icmp_type", "end_port"],
+                    ["icmp_code", "start_port"],
+                    ["icmp_code", "end_port"],
+                ),
+            ),
+            purge=dict(type="bool", default=False),
+            max_jobs=dict(type="int", default=10),
         )
     )
     required_together = cs_required_together()
@@ -360,10 +661,20 @@ def main():
             ["icmp_type", "end_port"],
             ["icmp_code", "start_port"],
             ["icmp_code", "end_port"],
+            ["rules", "user_security_group"],
+            ["rules", "start_port"],
+            ["rules", "end_port"],
+            ["rules", "icmp_type"],
+            ["rules", "icmp_code"],
         ),
         supports_check_mode=True,
     )
 
+    if module.params.get("rules") is not None:
+        acs_sg_rules = AnsibleCloudStackSecurityGroupRules(module)
+        result = acs_sg_rules.reconcile_rules()
+        module.exit_json(**result)
+
     acs_sg_rule = AnsibleCloudStackSecurityGroupRule(module)
 
     state = module.params.get("state")
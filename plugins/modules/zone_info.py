@@ -182,7 +182,7 @@ class AnsibleCloudStackZoneInfo(AnsibleCloudStack):
                 zones = zones["zone"]
             else:
                 zones = []
-        return {"zones": [self.update_result(resource) for resource in zones]}
+        return self.add_api_stats({"zones": [self.update_result(resource) for resource in zones]})
 
 
 def main():
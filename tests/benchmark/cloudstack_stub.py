@@ -0,0 +1,423 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Local HTTP stub of the CloudStack API serving synthetic resources for benchmarks."""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import threading
+import time
+import uuid
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlsplit
+
+ZONE = {"id": "3b1c2a7e-0000-4000-8000-000000000001", "name": "zone-1", "networktype": "Advanced"}
+TEMPLATE = {"id": "3b1c2a7e-0000-4000-8000-000000000002", "name": "debian-12", "displaytext": "Debian 12", "isready": True, "zoneid": ZONE["id"]}
+SERVICE_OFFERING = {"id": "3b1c2a7e-0000-4000-8000-000000000003", "name": "small", "cpunumber": 2, "memory": 2048}
+NETWORK = {"id": "3b1c2a7e-0000-4000-8000-000000000004", "name": "net-a", "displaytext": "net-a", "zoneid": ZONE["id"]}
+VPC = {"id": "3b1c2a7e-0000-4000-8000-000000000006", "name": "vpc-a", "displaytext": "vpc-a", "zoneid": ZONE["id"]}
+NETWORK_ACL = {"id": "3b1c2a7e-0000-4000-8000-000000000007", "name": "acl-a", "vpcid": VPC["id"]}
+IP_ADDRESS = {"id": "3b1c2a7e-0000-4000-8000-000000000005", "ipaddress": "198.51.100.1", "zoneid": ZONE["id"], "associatednetworkid": NETWORK["id"]}
+LB_RULE = {
+    "id": "3b1c2a7e-0000-4000-8000-000000000008",
+    "name": "lb-web",
+    "publicipid": IP_ADDRESS["id"],
+    "publicip": IP_ADDRESS["ipaddress"],
+    "publicport": "80",
+    "privateport": "8080",
+    "algorithm": "roundrobin",
+    "zoneid": ZONE["id"],
+    "networkid": NETWORK["id"],
+}
+LB_INTERNAL = {
+    "id": "3b1c2a7e-0000-4000-8000-000000000009",
+    "name": "lb-internal",
+    "algorithm": "roundrobin",
+    "networkid": NETWORK["id"],
+    "sourceipaddress": "10.0.0.10",
+    "sourceipaddressnetworkid": NETWORK["id"],
+    "loadbalancerrule": [{"sourceport": 80, "instanceport": 8080, "state": "Active"}],
+}
+
+
+def get_instance(i, name=None):
+    name = name or "vm-%d" % i
+    return {
+        "id": str(uuid.UUID(int=i + 1)),
+        "name": name,
+        "displayname": name,
+        "zoneid": ZONE["id"],
+        "zonename": ZONE["name"],
+        "domain": "ROOT",
+        "domainid": "3b1c2a7e-0000-4000-8000-000000000000",
+        "account": "admin",
+        "username": "admin",
+        "templateid": TEMPLATE["id"],
+        "templatename": TEMPLATE["name"],
+        "serviceofferingid": SERVICE_OFFERING["id"],
+        "serviceofferingname": SERVICE_OFFERING["name"],
+        "haenable": False,
+        "passwordenabled": True,
+        "hypervisor": "KVM",
+        "cpuspeed": 1000,
+        "cpunumber": 2,
+        "memory": 2048,
+        "isdynamicallyscalable": False,
+        "state": "Running",
+        "cpuused": "1.5%",
+        "created": "2026-01-01T12:00:00+0100",
+        "keypairs": [],
+        "securitygroup": [],
+        "affinitygroup": [{"name": "ag-%d" % (i % 10)}],
+        "nic": [
+            {
+                "id": str(uuid.UUID(int=(1 << 64) + i)),
+                "ipaddress": "10.%d.%d.%d" % (i // 62500, i // 250 % 250, i % 250),
+                "networkid": NETWORK["id"],
+                "networkname": NETWORK["name"],
+                "isdefault": True,
+                "macaddress": "02:00:00:%02x:%02x:%02x" % (i >> 16 & 255, i >> 8 & 255, i & 255),
+            }
+        ],
+        "tags": [{"key": "sla", "value": "gold"}, {"key": "index", "value": str(i)}],
+    }
+
+
+def get_volumes(instance, count):
+    return [
+        {
+            "id": "%s-%d" % (instance["id"], j),
+            "name": "ROOT-%s" % instance["name"] if j == 0 else "DATA-%s-%d" % (instance["name"], j),
+            "type": "ROOT" if j == 0 else "DATADISK",
+            "size": 10737418240,
+            "virtualmachineid": instance["id"],
+            "zoneid": ZONE["id"],
+        }
+        for j in range(count)
+    ]
+
+
+class CloudStackStub:
+    """Serve the API of a cloud with a number of instances and volumes per instance.
+
+    Every request is delayed by the latency in seconds and counted per command.
+    """
+
+    def __init__(self, instances=100, volumes_per_instance=2, latency=0.0):
+        self.latency = latency
+        self.volumes_per_instance = volumes_per_instance
+        self.instances = dict((vm["id"], vm) for vm in (get_instance(i) for i in range(instances)))
+        self.jobs = {}
+        self.firewall_rules = {}
+        self.network_acl_rules = {}
+        self.security_groups = dict(
+            (name, {"id": str(uuid.uuid4()), "name": name, "account": "admin", "ingressrule": [], "egressrule": []}) for name in ("default", "web", "bastion")
+        )
+        self.load_balancer_members = {LB_RULE["id"]: set(), LB_INTERNAL["id"]: set()}
+        self.tags = dict((("UserVm", vm["id"]), dict((tag["key"], tag["value"]) for tag in vm["tags"])) for vm in self.instances.values())
+        self.calls = Counter()
+        self._lock = threading.Lock()
+        self._server = None
+
+    @property
+    def url(self):
+        return "http://127.0.0.1:%d/client/api" % self._server.server_address[1]
+
+    def start(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately, avoid delayed ACKs of keep-alive connections
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.respond(dict(parse_qsl(urlsplit(self.path).query)))
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                self.respond(dict(parse_qsl(urlsplit(self.path).query) + parse_qsl(body)))
+
+            def respond(self, params):
+                status, data = stub.handle(params)
+                body = json.dumps(data).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
+
+    def reset_calls(self):
+        with self._lock:
+            self.calls.clear()
+
+    @property
+    def total_calls(self):
+        return sum(self.calls.values())
+
+    def handle(self, params):
+        command = params.get("command", "")
+        with self._lock:
+            self.calls[command] += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+        handler = getattr(self, "cmd_%s" % command, None)
+        if handler is None:
+            if command.startswith("list"):
+                return 200, {"%sresponse" % command.lower(): {}}
+            return 431, {"errorresponse": {"errorcode": 431, "errortext": "Unsupported command %s" % command}}
+
+        with self._lock:
+            data = handler(params)
+        return 200, {"%sresponse" % command.lower(): data}
+
+    def _page(self, key, items, params):
+        if not items:
+            return {}
+        page, page_size = int(params.get("page", 1)), int(params.get("pagesize", 500))
+        return {"count": len(items), key: items[(page - 1) * page_size : page * page_size]}
+
+    def _add_job(self, result):
+        jobid = str(uuid.uuid4())
+        self.jobs[jobid] = {"jobid": jobid, "jobstatus": 1, "jobresultcode": 0, "jobresult": result}
+        return {"jobid": jobid}
+
+    def cmd_listVirtualMachines(self, params):
+        instances = list(self.instances.values())
+        ids = params.get("ids") or params.get("id")
+        if ids:
+            ids = ids.split(",")
+            instances = [vm for vm in instances if vm["id"] in ids]
+        if params.get("name"):
+            instances = [vm for vm in instances if vm["name"] == params["name"]]
+        if params.get("keyword"):
+            keyword = params["keyword"].lower()
+            instances = [vm for vm in instances if keyword in vm["name"].lower() or keyword in vm["displayname"].lower()]
+        if params.get("zoneid"):
+            instances = [vm for vm in instances if vm["zoneid"] == params["zoneid"]]
+        if params.get("networkid"):
+            instances = [vm for vm in instances if any(nic["networkid"] == params["networkid"] for nic in vm["nic"])]
+        return self._page("virtualmachine", instances, params)
+
+    def cmd_listVolumes(self, params):
+        instances = self.instances.values()
+        if params.get("virtualmachineid"):
+            instances = [vm for vm in instances if vm["id"] == params["virtualmachineid"]]
+        volumes = [volume for vm in instances for volume in get_volumes(vm, self.volumes_per_instance)]
+        return self._page("volume", volumes, params)
+
+    def cmd_listZones(self, params):
+        return self._page("zone", [ZONE], params)
+
+    def cmd_listTemplates(self, params):
+        return self._page("template", [TEMPLATE], params)
+
+    def cmd_listServiceOfferings(self, params):
+        return self._page("serviceoffering", [SERVICE_OFFERING], params)
+
+    def cmd_listHypervisors(self, params):
+        return {"count": 1, "hypervisor": [{"name": "KVM"}]}
+
+    def cmd_listNetworks(self, params):
+        return self._page("network", [NETWORK], params)
+
+    def cmd_listAsyncJobs(self, params):
+        return self._page("asyncjobs", list(self.jobs.values()), params)
+
+    def cmd_queryAsyncJobResult(self, params):
+        return self.jobs[params["jobid"]]
+
+    def cmd_deployVirtualMachine(self, params):
+        instance = get_instance(len(self.instances), name=params.get("name"))
+        instance["displayname"] = params.get("displayname") or instance["name"]
+        self.instances[instance["id"]] = instance
+        return dict(self._add_job({"virtualmachine": instance}), id=instance["id"])
+
+    def cmd_startVirtualMachine(self, params):
+        self.instances[params["id"]]["state"] = "Running"
+        return self._add_job({"virtualmachine": self.instances[params["id"]]})
+
+    def cmd_stopVirtualMachine(self, params):
+        self.instances[params["id"]]["state"] = "Stopped"
+        return self._add_job({"virtualmachine": self.instances[params["id"]]})
+
+    def cmd_listPublicIpAddresses(self, params):
+        return self._page("publicipaddress", [IP_ADDRESS], params)
+
+    def cmd_listFirewallRules(self, params):
+        rules = [rule for rule in self.firewall_rules.values() if rule["ipaddressid"] == params.get("ipaddressid")]
+        return self._page("firewallrule", rules, params)
+
+    def cmd_createFirewallRule(self, params):
+        rule = {
+            "id": str(uuid.uuid4()),
+            "ipaddressid": params["ipaddressid"],
+            "ipaddress": IP_ADDRESS["ipaddress"],
+            "protocol": params["protocol"],
+            "cidrlist": params.get("cidrlist", "0.0.0.0/0"),
+            "state": "Active",
+        }
+        for key in ("startport", "endport", "icmptype", "icmpcode"):
+            if key in params:
+                rule[key] = int(params[key])
+        self.firewall_rules[rule["id"]] = rule
+        return dict(self._add_job({"firewallrule": rule}), id=rule["id"])
+
+    def cmd_deleteFirewallRule(self, params):
+        del self.firewall_rules[params["id"]]
+        return self._add_job({"success": True})
+
+    def cmd_listVPCs(self, params):
+        return self._page("vpc", [VPC], params)
+
+    def cmd_listNetworkACLLists(self, params):
+        return self._page("networkacllist", [NETWORK_ACL], params)
+
+    def cmd_listNetworkACLs(self, params):
+        rules = [rule for rule in self.network_acl_rules.values() if rule["aclid"] == params.get("aclid")]
+        return self._page("networkacl", rules, params)
+
+    def _set_network_acl_rule(self, rule, params):
+        for key in ("protocol", "cidrlist", "action", "traffictype"):
+            if key in params:
+                rule[key] = params[key]
+        for key in ("number", "startport", "endport", "icmptype", "icmpcode"):
+            if key in params:
+                rule[key] = int(params[key])
+        return self._add_job({"networkacl": rule})
+
+    def cmd_createNetworkACL(self, params):
+        rule = {"id": str(uuid.uuid4()), "aclid": params["aclid"], "cidrlist": "0.0.0.0/0", "action": "Allow", "traffictype": "Ingress", "state": "Active"}
+        self.network_acl_rules[rule["id"]] = rule
+        return dict(self._set_network_acl_rule(rule, params), id=rule["id"])
+
+    def cmd_updateNetworkACLItem(self, params):
+        return self._set_network_acl_rule(self.network_acl_rules[params["id"]], params)
+
+    def cmd_deleteNetworkACL(self, params):
+        del self.network_acl_rules[params["id"]]
+        return self._add_job({"success": True})
+
+    def cmd_listSecurityGroups(self, params):
+        security_groups = list(self.security_groups.values())
+        if params.get("securitygroupname"):
+            security_groups = [sg for sg in security_groups if sg["name"] == params["securitygroupname"]]
+        return self._page("securitygroup", security_groups, params)
+
+    def _authorize_security_group_rules(self, params, key):
+        security_group = [sg for sg in self.security_groups.values() if sg["id"] == params["securitygroupid"]][0]
+        rule = {"protocol": params["protocol"]}
+        for param in ("startport", "endport", "icmptype", "icmpcode"):
+            if param in params:
+                rule[param] = int(params[param])
+
+        targets = [{"cidr": cidr} for cidr in params.get("cidrlist", "").split(",") if cidr]
+        idx = 0
+        while "usersecuritygrouplist[%d].group" % idx in params:
+            targets.append({"securitygroupname": params["usersecuritygrouplist[%d].group" % idx], "account": params["usersecuritygrouplist[%d].account" % idx]})
+            idx += 1
+
+        rules = [dict(rule, ruleid=str(uuid.uuid4()), **target) for target in targets]
+        security_group[key].extend(rules)
+        return self._add_job({"securitygroup": dict(security_group, **{key: rules})})
+
+    def cmd_authorizeSecurityGroupIngress(self, params):
+        return self._authorize_security_group_rules(params, "ingressrule")
+
+    def cmd_authorizeSecurityGroupEgress(self, params):
+        return self._authorize_security_group_rules(params, "egressrule")
+
+    def _revoke_security_group_rule(self, params, key):
+        for security_group in self.security_groups.values():
+            security_group[key] = [rule for rule in security_group[key] if rule["ruleid"] != params["id"]]
+        return self._add_job({"success": True})
+
+    def cmd_revokeSecurityGroupIngress(self, params):
+        return self._revoke_security_group_rule(params, "ingressrule")
+
+    def cmd_revokeSecurityGroupEgress(self, params):
+        return self._revoke_security_group_rule(params, "egressrule")
+
+    def cmd_listLoadBalancerRules(self, params):
+        rules = [LB_RULE] if params.get("name") in (None, LB_RULE["name"]) else []
+        return self._page("loadbalancerrule", rules, params)
+
+    def cmd_listLoadBalancerRuleInstances(self, params):
+        instances = [self.instances[i] for i in sorted(self.load_balancer_members[params["id"]])]
+        return self._page("loadbalancerruleinstance", instances, params)
+
+    def cmd_listLoadBalancers(self, params):
+        load_balancers = [LB_INTERNAL] if params.get("name") in (None, LB_INTERNAL["name"]) else []
+        members = self.load_balancer_members[LB_INTERNAL["id"]]
+        # Members are reported with their internal instance name
+        load_balancers = [dict(lb, loadbalancerinstance=[{"id": i, "name": "i-2-%s-VM" % i[-4:]} for i in sorted(members)]) for lb in load_balancers]
+        return self._page("loadbalancer", load_balancers, params)
+
+    def cmd_assignToLoadBalancerRule(self, params):
+        self.load_balancer_members[params["id"]].update(params["virtualmachineids"].split(","))
+        return self._add_job({"success": True})
+
+    def cmd_removeFromLoadBalancerRule(self, params):
+        self.load_balancer_members[params["id"]].difference_update(params["virtualmachineids"].split(","))
+        return self._add_job({"success": True})
+
+    def cmd_listTags(self, params):
+        tags = [
+            {"resourcetype": resource_type, "resourceid": resource_id, "key": key, "value": value}
+            for (resource_type, resource_id), resource_tags in self.tags.items()
+            for key, value in resource_tags.items()
+        ]
+        for param in ("resourcetype", "resourceid", "key", "value"):
+            if params.get(param):
+                tags = [tag for tag in tags if tag[param] == params[param]]
+        return self._page("tag", tags, params)
+
+    def _get_tags(self, params):
+        tags = {}
+        idx = 0
+        while "tags[%d].key" % idx in params:
+            tags[params["tags[%d].key" % idx]] = params.get("tags[%d].value" % idx)
+            idx += 1
+        return tags
+
+    def cmd_createTags(self, params):
+        tags = self._get_tags(params)
+        for resource_id in params["resourceids"].split(","):
+            resource_tags = self.tags.setdefault((params["resourcetype"], resource_id), {})
+            if set(tags) & set(resource_tags):
+                return {"errorcode": 431, "errortext": "Tag already exists"}
+            resource_tags.update(tags)
+        return self._add_job({"success": True})
+
+    def cmd_deleteTags(self, params):
+        tags = self._get_tags(params)
+        for resource_id in params["resourceids"].split(","):
+            resource_tags = self.tags.get((params["resourcetype"], resource_id), {})
+            for key, value in tags.items():
+                if resource_tags.get(key) == value or value is None:
+                    resource_tags.pop(key, None)
+        return self._add_job({"success": True})
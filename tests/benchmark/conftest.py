@@ -0,0 +1,92 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+"""Benchmarks of the plugins against a local stub of the CloudStack API.
+
+Run from the root of the collection, installed in an ansible_collections tree:
+
+    pip install -r tests/benchmark/requirements.txt
+    pytest tests/benchmark --benchmark-columns=min,mean,max,rounds
+
+Select a scale with e.g. ``-k "1000 and not 10000"`` and simulate the API latency in seconds with
+the CLOUDSTACK_STUB_LATENCY env variable.
+"""
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import io
+import json
+import os
+import sys
+import tracemalloc
+
+import pytest
+from ansible.plugins.loader import init_plugin_loader
+
+sys.path.insert(0, os.path.dirname(__file__))
+
+from cloudstack_stub import CloudStackStub  # noqa: E402
+
+
+def get_collections_path():
+    """Return the directory the ansible_collections tree of the collection is in."""
+    for path in (os.path.dirname(os.path.abspath(__file__)), os.getenv("PWD") or os.getcwd()):
+        while os.path.dirname(path) != path:
+            if os.path.basename(path) == "ansible_collections":
+                return os.path.dirname(path)
+            path = os.path.dirname(path)
+    raise RuntimeError("The collection must be run in an ansible_collections tree")
+
+
+# Number of instances in the cloud
+SCALES = [100, 1000, 10000]
+
+init_plugin_loader([get_collections_path()])
+
+
+@pytest.fixture(scope="module", params=SCALES, ids=lambda scale: "%d" % scale)
+def stub(request):
+    with CloudStackStub(instances=request.param, latency=float(os.getenv("CLOUDSTACK_STUB_LATENCY", 0))) as stub:
+        yield stub
+
+
+@pytest.fixture
+def api_env(stub, monkeypatch, tmp_path):
+    monkeypatch.setenv("CLOUDSTACK_ENDPOINT", stub.url)
+    monkeypatch.setenv("CLOUDSTACK_KEY", "key")
+    monkeypatch.setenv("CLOUDSTACK_SECRET", "secret")
+    monkeypatch.setenv("CLOUDSTACK_CACHE_DIR", str(tmp_path))
+    return stub
+
+
+def run_module(module, args):
+    """Run the main() of a module with the args, return the result."""
+    from ansible.module_utils.testing import patch_module_args
+
+    stdout = io.StringIO()
+    with patch_module_args(args), contextlib.redirect_stdout(stdout):
+        with pytest.raises(SystemExit):
+            module.main()
+    result = json.loads(stdout.getvalue())
+    assert not result.get("failed"), result.get("msg")
+    return result
+
+
+def measure(benchmark, stub, func, rounds=3):
+    """Benchmark the function, the API calls and memory peak of a single run are added to the extra info."""
+    stub.reset_calls()
+    tracemalloc.start()
+    try:
+        result = func()
+        benchmark.extra_info["memory_peak_kb"] = tracemalloc.get_traced_memory()[1] // 1024
+    finally:
+        tracemalloc.stop()
+    benchmark.extra_info["api_calls"] = stub.total_calls
+    benchmark.extra_info["api_calls_per_command"] = dict(stub.calls)
+
+    benchmark.pedantic(func, rounds=rounds, iterations=1)
+    return result
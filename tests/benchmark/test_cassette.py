@@ -0,0 +1,26 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import instance_info
+
+
+def test_cassette_replay(benchmark, api_env, monkeypatch, tmp_path):
+    cassette = tmp_path / "instance_info.jsonl"
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE", str(cassette))
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE_MODE", "record")
+    recorded = run_module(instance_info, {"api_stats": True})
+
+    # Replay without the API, a change of the API calls fails the run
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE_MODE", "replay")
+    replayed = measure(benchmark, api_env, lambda: run_module(instance_info, {"api_stats": True}))
+
+    assert benchmark.extra_info["api_calls"] == 0
+    assert replayed["instances"] == recorded["instances"]
+    assert replayed["cloudstack_api_stats"]["requests"] == recorded["cloudstack_api_stats"]["requests"]
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+from cloudstack_stub import IP_ADDRESS, ZONE, CloudStackStub
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import firewall
+
+FIREWALL_ARGS = {
+    "zone": ZONE["name"],
+    "ip_address": IP_ADDRESS["ipaddress"],
+    "api_poll_interval": 0.01,
+}
+
+# A policy of 300 rules
+RULES = [{"port": 1000 + i, "cidrs": ["10.%d.0.0/16" % (i % 7), "192.168.%d.0/24" % (i % 5)]} for i in range(300)]
+
+
+@pytest.fixture(scope="module")
+def stub():
+    # The rules do not depend on the number of instances
+    with CloudStackStub(instances=100) as stub:
+        yield stub
+
+
+def test_firewall_rules(benchmark, api_env):
+    # Create the policy once, only the unchanged policy is benchmarked
+    run_module(firewall, dict(FIREWALL_ARGS, rules=RULES))
+    measure(benchmark, api_env, lambda: run_module(firewall, dict(FIREWALL_ARGS, rules=RULES, purge=True)))
@@ -0,0 +1,44 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from cloudstack_stub import TEMPLATE, SERVICE_OFFERING, ZONE
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import instance
+
+INSTANCE_ARGS = {
+    "zone": ZONE["name"],
+    "template": TEMPLATE["name"],
+    "service_offering": SERVICE_OFFERING["name"],
+}
+
+
+def test_instance_unchanged(benchmark, api_env):
+    # The name is a prefix of the names of many other instances
+    result = measure(benchmark, api_env, lambda: run_module(instance, dict(INSTANCE_ARGS, name="vm-1")))
+    assert not result["changed"]
+
+
+def test_instance_fleet_unchanged(benchmark, api_env):
+    instances = [{"name": "vm-%d" % i} for i in range(0, len(api_env.instances), 10)]
+    result = measure(benchmark, api_env, lambda: run_module(instance, dict(INSTANCE_ARGS, instances=instances)))
+    assert not result["changed"]
+    assert len(result["instances"]) == len(instances)
+
+
+def test_instance_fleet_deploy(benchmark, api_env):
+    runs = []
+
+    def deploy():
+        runs.append(len(runs))
+        instances = [{"name": "new-%d-%d" % (len(runs), i)} for i in range(20)]
+        return run_module(instance, dict(INSTANCE_ARGS, instances=instances))
+
+    result = measure(benchmark, api_env, deploy)
+    assert result["changed"]
+    assert len(result["instances"]) == 20
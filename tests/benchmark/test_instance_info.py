@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import instance_info
+
+
+def test_instance_info_all(benchmark, api_env):
+    result = measure(benchmark, api_env, lambda: run_module(instance_info, {}))
+    assert len(result["instances"]) == len(api_env.instances)
+    # The volumes are listed in pages, not per instance
+    assert benchmark.extra_info["api_calls_per_command"]["listVolumes"] < len(api_env.instances) / 10
+
+
+def test_instance_info_lean(benchmark, api_env):
+    result = measure(benchmark, api_env, lambda: run_module(instance_info, {"details": ["min"], "fields": ["name", "state"], "volumes": False}))
+    assert len(result["instances"]) == len(api_env.instances)
+    assert "listVolumes" not in benchmark.extra_info["api_calls_per_command"]
+
+
+def test_instance_info_name(benchmark, api_env):
+    result = measure(benchmark, api_env, lambda: run_module(instance_info, {"name": "vm-42"}))
+    assert [i["name"] for i in result["instances"]] == ["vm-42"]
@@ -0,0 +1,55 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+
+import pytest
+from ansible.inventory.data import InventoryData
+from ansible.parsing.dataloader import DataLoader
+from ansible.plugins.loader import inventory_loader
+from conftest import measure
+
+from ansible_collections.ngine_io.cloudstack.plugins.inventory.instance import INVENTORY_NORMALIZATION_J2, InventoryModule
+
+
+def parse_inventory(path):
+    inventory = InventoryData()
+    plugin = inventory_loader.get("ngine_io.cloudstack.instance")
+    plugin.parse(inventory, DataLoader(), str(path), cache=False)
+    return inventory
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        {},
+        {"details": ["nics"], "fields": ["zone", "state"]},
+        {"normalization_template": "instance:\n  name: {{ instance.name }}\n  v4_default_ip: {{ instance.nic[0].ipaddress }}\n  state: {{ instance.state }}\n"},
+    ],
+    ids=["default", "lean", "template"],
+)
+def test_inventory_instance(benchmark, api_env, tmp_path, options):
+    path = tmp_path / "bench.cloudstack-instances.yml"
+    config = dict(options, plugin="ngine_io.cloudstack.instance", api_url=api_env.url, api_key="key", api_secret="secret")
+    # JSON is valid YAML
+    path.write_text(json.dumps(config))
+
+    inventory = measure(benchmark, api_env, lambda: parse_inventory(path))
+    assert len(inventory.hosts) == len(api_env.instances)
+
+
+@pytest.mark.parametrize("normalization", ["mapper", "template"])
+def test_inventory_instance_normalization(benchmark, api_env, normalization):
+    plugin = InventoryModule()
+    plugin.get_option = lambda option: None
+    instances = list(api_env.instances.values())
+
+    if normalization == "mapper":
+        measure(benchmark, api_env, lambda: [plugin.normalize_instance_data(i) for i in instances])
+    else:
+        measure(benchmark, api_env, lambda: [plugin.render_instance_data(i, INVENTORY_NORMALIZATION_J2) for i in instances])
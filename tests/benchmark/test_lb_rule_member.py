@@ -0,0 +1,41 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from cloudstack_stub import IP_ADDRESS, LB_INTERNAL, LB_RULE, NETWORK, ZONE
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import lb_internal_member, lb_rule_member
+
+LB_RULE_MEMBER_ARGS = {
+    "name": LB_RULE["name"],
+    "ip_address": IP_ADDRESS["ipaddress"],
+    "zone": ZONE["name"],
+    "api_poll_interval": 0.01,
+}
+
+LB_INTERNAL_MEMBER_ARGS = {
+    "name": LB_INTERNAL["name"],
+    "network": NETWORK["name"],
+    "zone": ZONE["name"],
+    "api_poll_interval": 0.01,
+}
+
+VMS = ["vm-%d" % i for i in range(0, 100, 2)]
+
+
+def test_lb_rule_member(benchmark, api_env):
+    run_module(lb_rule_member, dict(LB_RULE_MEMBER_ARGS, vms=VMS))
+
+    # The unchanged members are benchmarked
+    measure(benchmark, api_env, lambda: run_module(lb_rule_member, dict(LB_RULE_MEMBER_ARGS, vms=VMS)))
+
+
+def test_lb_internal_member(benchmark, api_env):
+    run_module(lb_internal_member, dict(LB_INTERNAL_MEMBER_ARGS, vms=VMS))
+
+    measure(benchmark, api_env, lambda: run_module(lb_internal_member, dict(LB_INTERNAL_MEMBER_ARGS, vms=VMS[:1])))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import time
+
+from ansible.plugins.loader import lookup_loader
+from cloudstack_stub import CloudStackStub
+from conftest import measure
+
+
+def run_lookup(stub, command, **kwargs):
+    lookup = lookup_loader.get("ngine_io.cloudstack.api")
+    return lookup.run([command], api_url=stub.url, api_key="key", api_secret="secret", **kwargs)
+
+
+def test_lookup_api_list(benchmark, api_env):
+    lookup = lookup_loader.get("ngine_io.cloudstack.api")
+    result = measure(
+        benchmark,
+        api_env,
+        lambda: lookup.run(["listVirtualMachines"], api_url=api_env.url, api_key="key", api_secret="secret", query_params={"listall": True}),
+    )
+    assert result
+
+
+def test_lookup_api_cached(benchmark, api_env):
+    # A lookup in vars is evaluated each time the variable is referenced, e.g. in a loop
+    lookup = lookup_loader.get("ngine_io.cloudstack.api")
+
+    def run():
+        return [
+            lookup.run(["listVirtualMachines"], api_url=api_env.url, api_key="key", api_secret="secret", query_params={"listall": True}, cache=True)
+            for i in range(100)
+        ]
+
+    measure(benchmark, api_env, run)
+
+
+def test_lookup_api_fields(benchmark, api_env):
+    measure(benchmark, api_env, lambda: run_lookup(api_env, "listVirtualMachines", query_params={"listall": True}, fields=["name", "state"]))
+
+
+def test_lookup_api_max_items(benchmark, api_env):
+    measure(benchmark, api_env, lambda: run_lookup(api_env, "listVirtualMachines", query_params={"listall": True}, max_items=150, pagesize=100))
+
+
+def test_lookup_api_multiple(benchmark, api_env):
+    specs = {
+        "zones": {"command": "listZones"},
+        "networks": {"command": "listNetworks", "query_params": {"zoneid": "1"}},
+        "service_offerings": "listServiceOfferings",
+        "instances": {"command": "listVirtualMachines", "query_params": {"listall": True}},
+    }
+    measure(benchmark, api_env, lambda: run_lookup(api_env, specs, fields=["name"]))
+
+
+def test_lookup_api_multiple_concurrent():
+    # The endpoints are queried concurrently, about as fast as the slowest
+    lookup = lookup_loader.get("ngine_io.cloudstack.api")
+    with CloudStackStub(instances=10, latency=0.2) as stub:
+        started = time.time()
+        result = lookup.run([["listZones", "listNetworks", "listServiceOfferings", "listTemplates"]], api_url=stub.url, api_key="key", api_secret="secret")
+        assert time.time() - started < 0.6
+    assert sorted(result[0]) == ["listNetworks", "listServiceOfferings", "listTemplates", "listZones"]
+    assert stub.total_calls == 4
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+from cloudstack_stub import NETWORK_ACL, VPC, ZONE, CloudStackStub
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import network_acl_rule
+
+ACL_ARGS = {
+    "zone": ZONE["name"],
+    "vpc": VPC["name"],
+    "network_acl": NETWORK_ACL["name"],
+    "api_poll_interval": 0.01,
+}
+
+# An ACL of 500 rules
+RULES = [{"port": 1000 + i, "cidrs": ["10.%d.0.0/16" % (i % 7)]} for i in range(499)] + [{"protocol": "all", "action_policy": "deny"}]
+
+
+@pytest.fixture(scope="module")
+def stub():
+    # The rules do not depend on the number of instances
+    with CloudStackStub(instances=100) as stub:
+        yield stub
+
+
+def test_network_acl_rules(benchmark, api_env):
+    # Create the ACL once, only the unchanged ACL is benchmarked
+    run_module(network_acl_rule, dict(ACL_ARGS, rules=RULES))
+    measure(benchmark, api_env, lambda: run_module(network_acl_rule, dict(ACL_ARGS, rules=RULES)))
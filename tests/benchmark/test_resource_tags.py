@@ -0,0 +1,23 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import resource_tags
+
+RESOURCE_TAGS_ARGS = {
+    "resource_type": "UserVm",
+    "filter_tags": [{"key": "sla", "value": "gold"}],
+    "api_poll_interval": 0.01,
+}
+
+
+def test_resource_tags(benchmark, api_env):
+    # Tag the instances once, only the unchanged tags are benchmarked
+    run_module(resource_tags, dict(RESOURCE_TAGS_ARGS, tags=[{"key": "env", "value": "prod"}]))
+    measure(benchmark, api_env, lambda: run_module(resource_tags, dict(RESOURCE_TAGS_ARGS, tags=[{"key": "env", "value": "prod"}])))
@@ -0,0 +1,35 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+from cloudstack_stub import CloudStackStub
+from conftest import measure, run_module
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import security_group_rule
+
+SG_ARGS = {
+    "security_group": "web",
+    "api_poll_interval": 0.01,
+}
+
+# 20 ports allowed from 20 networks each and from a security group, 420 rules in total
+RULES = [{"port": 8000 + i, "cidrs": ["10.%d.0.0/16" % j for j in range(20)]} for i in range(20)]
+RULES += [{"port": 8000 + i, "user_security_group": "bastion"} for i in range(20)]
+
+
+@pytest.fixture(scope="module")
+def stub():
+    # The rules do not depend on the number of instances
+    with CloudStackStub(instances=100) as stub:
+        yield stub
+
+
+def test_security_group_rules(benchmark, api_env):
+    # Authorize the rules once, only the unchanged group is benchmarked
+    run_module(security_group_rule, dict(SG_ARGS, rules=RULES))
+    measure(benchmark, api_env, lambda: run_module(security_group_rule, dict(SG_ARGS, rules=RULES, purge=True)))
@@ -18,3 +18,10 @@ ansible-playbook playbooks/instance-inventory-test.yml "$@"
 
 ansible-inventory --list -i cloudstack-instances.yml
 
+
+# Second run is served from the inventory cache and must be identical
+rm -rf ./inventory-cache
+ansible-inventory --list -i cached.cloudstack-instances.yml > cached-1.json
+test -n "$(ls ./inventory-cache)"
+ansible-inventory --list -i cached.cloudstack-instances.yml > cached-2.json
+diff cached-1.json cached-2.json
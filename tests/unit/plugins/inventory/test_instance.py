@@ -0,0 +1,275 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible.errors import AnsibleError
+
+from ansible_collections.ngine_io.cloudstack.plugins.inventory.instance import InventoryModule
+
+
+def get_instance(i):
+    instance = {
+        "id": "7c1f9a3e-0000-4000-8000-%012d" % i,
+        "name": "vm-%d" % i,
+        "displayname": "VM %d" % i,
+        "zonename": "ch-zrh-ix-01",
+        "domain": "ROOT" if i % 2 else "Customers/ACME",
+        "account": "admin",
+        "username": "admin",
+        "templatename": "Linux Debian 12 64-bit",
+        "serviceofferingname": "Small Instance",
+        "haenable": bool(i % 2),
+        "passwordenabled": True,
+        "hypervisor": "KVM",
+        "cpuspeed": 1000,
+        "cpunumber": 2,
+        "memory": 2048,
+        "isdynamicallyscalable": False,
+        "state": "Running" if i % 3 else "Stopped",
+        "cpuused": "1.5%",
+        "created": "2026-01-01T12:00:00+0100",
+        "nic": [
+            {"ipaddress": "10.0.%d.%d" % (i // 250, i % 250), "networkname": "net-a"},
+            {"ipaddress": "192.168.0.%d" % (i % 250), "networkname": "net-b"},
+        ],
+    }
+    if i % 2:
+        instance["publicip"] = "198.51.100.%d" % (i % 250)
+    if i % 3:
+        instance["hostname"] = "host-%d" % (i % 7)
+    if i % 4:
+        instance["project"] = "project-%d" % (i % 4)
+    if i % 5:
+        instance["group"] = "web"
+    if i % 6:
+        instance["diskofferingname"] = "Performance"
+    if i % 7:
+        instance["affinitygroup"] = [{"name": "ag-1"}, {"name": "ag-2"}]
+    if i % 8:
+        # YAML typed tag values, e.g. booleans and numbers
+        instance["tags"] = [
+            {"key": "sla", "value": "gold"},
+            {"key": "backup", "value": "true"},
+            {"key": "prio", "value": "%d" % (i % 10)},
+            {"key": "ratio", "value": "0.5"},
+            {"key": "empty", "value": ""},
+        ]
+    if i % 9 == 0:
+        del instance["cpuused"]
+    return instance
+
+
+@pytest.fixture
+def inventory():
+    inventory = InventoryModule()
+    inventory.get_option = lambda option: None
+    return inventory
+
+
+def test_normalize_instance_data_equals_template(inventory):
+    for i in range(500):
+        instance = get_instance(i)
+        assert inventory.normalize_instance_data(instance) == inventory.render_instance_data(instance)
+
+
+def test_normalize_instance_data_custom_template(inventory):
+    inventory.get_option = lambda option: "instance:\n  name: {{ instance.name | upper }}\n" if option == "normalization_template" else None
+    assert inventory.normalize_instance_data(get_instance(1)) == {"name": "VM-1"}
+
+
+def test_get_instances_merges_zones_and_projects(inventory, mocker):
+    options = {
+        "filter_by_zone": ["zone-a", "zone-b-id"],
+        "filter_by_project": ["project-1", "project-2"],
+        "query_workers": 2,
+    }
+    inventory.get_option = options.get
+    mocker.patch.object(inventory, "init_cs")
+    lookups = {
+        "listZones": {"zone": [{"id": "zone-a-id", "name": "zone-a"}, {"id": "zone-b-id", "name": "zone-b"}]},
+        "listProjects": {"project": [{"id": "project-1-id", "name": "project-1"}, {"id": "project-2-id", "name": "project-2"}]},
+    }
+    mocker.patch.object(inventory, "query_api", side_effect=lambda command, **args: lookups[command])
+
+    queries = []
+
+    def query_instances(args):
+        queries.append((args["zoneid"], args["projectid"]))
+        # vm-19 is returned by every query
+        return [get_instance(int(args["projectid"][8])), get_instance(10 + len(args["zoneid"]))]
+
+    mocker.patch.object(inventory, "_query_instances", side_effect=query_instances)
+
+    instances = inventory.get_instances()
+
+    assert sorted(queries) == [
+        ("zone-a-id", "project-1-id"),
+        ("zone-a-id", "project-2-id"),
+        ("zone-b-id", "project-1-id"),
+        ("zone-b-id", "project-2-id"),
+    ]
+    assert sorted(i["name"] for i in instances) == ["vm-1", "vm-19", "vm-2"]
+
+
+def test_get_instances_all_projects(inventory, mocker):
+    inventory.get_option = {"filter_by_project": ["-1"]}.get
+    mocker.patch.object(inventory, "init_cs")
+    query = mocker.patch.object(inventory, "query_api", return_value=[get_instance(1)])
+
+    assert [i["name"] for i in inventory.get_instances()] == ["vm-1"]
+    assert query.call_args == mocker.call("listVirtualMachines", tags=None, details=None, fetch_list=True, projectid="-1", zoneid=None)
+
+
+def test_get_instances_all_projects_combined(inventory, mocker):
+    inventory.get_option = {"filter_by_project": ["-1", "project-1"]}.get
+    mocker.patch.object(inventory, "init_cs")
+
+    with pytest.raises(AnsibleError, match="project -1 of all projects can not be combined"):
+        inventory.get_instances()
+
+
+def test_get_instances_incremental(inventory, mocker, tmp_path):
+    options = {
+        "snapshot_dir": str(tmp_path),
+        "api_url": "https://cloud.example.com/client/api",
+        "query_workers": 1,
+    }
+    inventory.get_option = options.get
+    mocker.patch.object(inventory, "init_cs")
+
+    instances = dict((i["id"], i) for i in [get_instance(i) for i in range(5)])
+    events = [{"id": "event-1", "type": "VM.START", "created": "2026-01-01T12:00:00+0100"}]
+    startdates = []
+
+    def query_api(command, **args):
+        if command == "listEvents":
+            if "startdate" in args:
+                startdates.append(args["startdate"])
+                return events
+            return {"event": events[:1]}
+        if command == "listVirtualMachines":
+            ids = args.get("ids") or list(instances)
+            return [instances[i] for i in ids if i in instances]
+        raise AssertionError(command)
+
+    query = mocker.patch.object(inventory, "query_api", side_effect=query_api)
+
+    # Full refresh without a snapshot
+    assert len(inventory.get_instances_incremental("cloudstack-instances.yml")) == 5
+
+    # Instance 1 stopped, instance 2 expunged
+    changed_id, removed_id = list(instances)[1:3]
+    instances[changed_id] = dict(instances[changed_id], state="Stopped")
+    del instances[removed_id]
+    events = [
+        {"id": "event-3", "type": "VM.EXPUNGE", "created": "2026-01-01T12:05:00+0100", "resourcetype": "VirtualMachine", "resourceid": removed_id},
+        {"id": "event-2", "type": "VM.STOP", "created": "2026-01-01T12:04:00+0100", "resourcetype": "VirtualMachine", "resourceid": changed_id},
+        {"id": "event-1", "type": "VM.START", "created": "2026-01-01T12:00:00+0100"},
+    ]
+    query.reset_mock()
+
+    result = inventory.get_instances_incremental("cloudstack-instances.yml")
+
+    assert len(result) == 4
+    assert [i["state"] for i in result if i["name"] == "vm-1"] == ["Stopped"]
+    assert query.call_args_list[-1] == mocker.call(
+        "listVirtualMachines", tags=None, details=None, fetch_list=True, projectid=None, zoneid=None, ids=[removed_id, changed_id]
+    )
+
+    # Changes not related to an instance trigger a full refresh
+    events = [{"id": "event-4", "type": "CREATE_TAGS", "created": "2026-01-01T12:06:00+0100"}] + events
+    query.reset_mock()
+
+    assert len(inventory.get_instances_incremental("cloudstack-instances.yml")) == 4
+    assert query.call_args_list[-1] == mocker.call("listVirtualMachines", tags=None, details=None, fetch_list=True, projectid=None, zoneid=None)
+    assert startdates == ["2026-01-01 12:00:00", "2026-01-01 12:05:00"]
+
+
+def test_get_instances_incremental_projects(inventory, mocker, tmp_path):
+    options = {
+        "snapshot_dir": str(tmp_path),
+        "api_url": "https://cloud.example.com/client/api",
+        "filter_by_project": ["project-1", "project-2"],
+        "query_workers": 1,
+    }
+    inventory.get_option = options.get
+    mocker.patch.object(inventory, "init_cs")
+
+    instances = dict((i["id"], i) for i in [dict(get_instance(i), project="project-%d" % (i % 2 + 1)) for i in range(4)])
+    project_ids = {"project-1-id": "project-1", "project-2-id": "project-2"}
+    # Events of instances in projects are only listed by project
+    events = {
+        None: [{"id": "event-0", "type": "USER.LOGIN", "created": "2026-01-01T11:00:00+0100"}],
+        "project-1-id": [{"id": "event-1", "type": "VM.START", "created": "2026-01-01T12:00:00+0100"}],
+        "project-2-id": [],
+    }
+
+    def query_api(command, **args):
+        if command == "listProjects":
+            return {"project": [{"id": k, "name": v} for k, v in project_ids.items()]}
+        if command == "listEvents":
+            project_events = events[args.get("projectid")]
+            if "startdate" in args:
+                return project_events
+            return {"event": project_events[:1]}
+        if command == "listVirtualMachines":
+            found = [i for i in instances.values() if project_ids[args["projectid"]] == i["project"]]
+            return [i for i in found if not args.get("ids") or i["id"] in args["ids"]]
+        raise AssertionError(command)
+
+    mocker.patch.object(inventory, "query_api", side_effect=query_api)
+    mocker.patch.object(inventory, "_query_instances", side_effect=lambda args: query_api("listVirtualMachines", **args))
+
+    assert len(inventory.get_instances_incremental("cloudstack-instances.yml")) == 4
+
+    # An instance of project-2 stopped
+    changed_id = [i["id"] for i in instances.values() if i["project"] == "project-2"][0]
+    instances[changed_id] = dict(instances[changed_id], state="Stopped")
+    events["project-2-id"] = [
+        {"id": "event-2", "type": "VM.STOP", "created": "2026-01-01T12:04:00+0100", "resourcetype": "VirtualMachine", "resourceid": changed_id}
+    ]
+
+    result = inventory.get_instances_incremental("cloudstack-instances.yml")
+    assert [i["state"] for i in result if i["name"] == instances[changed_id]["name"]] == ["Stopped"]
+
+
+def test_get_instances_trims_fields(inventory, mocker):
+    options = {
+        "hostname": "v4_default_ip",
+        "fields": ["zone", "tags"],
+        "details": ["nics"],
+    }
+    inventory.get_option = options.get
+    mocker.patch.object(inventory, "init_cs")
+    query = mocker.patch.object(inventory, "query_api", return_value=[get_instance(i) for i in range(3)])
+
+    instances = inventory.get_instances()
+
+    assert query.call_args == mocker.call("listVirtualMachines", tags=None, details=["nics"], fetch_list=True, projectid=None, zoneid=None)
+    assert [sorted(i) for i in instances] == [
+        ["name", "v4_default_ip", "zone"],
+        ["name", "tags", "v4_default_ip", "zone"],
+        ["name", "tags", "v4_default_ip", "zone"],
+    ]
+    assert instances[1] == {
+        "name": "vm-1",
+        "v4_default_ip": "10.0.0.1",
+        "zone": "ch-zrh-ix-01",
+        "tags": {"sla": "gold", "backup": True, "prio": 1, "ratio": 0.5, "empty": None},
+    }
+    assert instances == [dict((k, v) for k, v in inventory.render_instance_data(get_instance(i)).items() if k in instances[i]) for i in range(3)]
+
+
+def test_get_instances_unknown_fields(inventory, mocker):
+    inventory.get_option = {"hostname": "v4_default_ip", "fields": ["zone", "foo"]}.get
+    mocker.patch.object(inventory, "init_cs")
+    mocker.patch.object(inventory, "query_api", return_value=[get_instance(1)])
+
+    with pytest.raises(AnsibleError, match="Unknown fields: foo"):
+        inventory.get_instances()
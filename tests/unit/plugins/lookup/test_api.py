@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+from ansible.errors import AnsibleError
+
+from ansible_collections.ngine_io.cloudstack.plugins.lookup import api
+from ansible_collections.ngine_io.cloudstack.plugins.lookup.api import LookupModule
+
+# Defaults of the options used by the tests
+OPTIONS = {
+    "cache": False,
+    "cache_ttl": 60,
+}
+
+RESOURCES = {
+    "listZones": ("zone", [{"id": "zone-1-id", "name": "zone-1"}]),
+    "listNetworks": ("network", [{"id": "net-a-id", "name": "net-a"}]),
+    "listServiceOfferings": ("serviceoffering", [{"id": "small-id", "name": "small"}]),
+}
+
+
+def get_instance(i):
+    return {
+        "id": "7c1f9a3e-0000-4000-8000-%012d" % i,
+        "name": "vm-%d" % i,
+        "state": "Running",
+        "affinitygroup": [{"name": "ag-%d" % (i % 10)}],
+    }
+
+
+class CloudStackApi:
+    """Answer the list commands of a cloud with a number of instances page by page, the calls are recorded."""
+
+    def __init__(self, instances):
+        self.resources = dict(RESOURCES, listVirtualMachines=("virtualmachine", [get_instance(i) for i in range(instances)]))
+        self.calls = []
+
+    def __call__(self, client, command, args, retries=0):
+        self.calls.append((command, dict(args)))
+        key, items = self.resources[command]
+        page, page_size = int(args.get("page", 1)), int(args.get("pagesize", 500))
+        return {"count": len(items), key: items[(page - 1) * page_size : page * page_size]}
+
+
+@pytest.fixture
+def cloudstack_api(mocker):
+    cloudstack_api = CloudStackApi(instances=1200)
+    mocker.patch("ansible_collections.ngine_io.cloudstack.plugins.module_utils.cloudstack_api.call_api", side_effect=cloudstack_api)
+    mocker.patch.dict(api._CACHE, clear=True)
+    return cloudstack_api
+
+
+@pytest.fixture
+def lookup():
+    lookup = LookupModule()
+    options = {}
+
+    def set_options(direct=None, **kwargs):
+        options.clear()
+        options.update(OPTIONS)
+        options.update(direct or {})
+
+    lookup.set_options = set_options
+    lookup.get_option = lambda option, *args: options.get(option)
+    return lookup
+
+
+def run_lookup(lookup, terms, **kwargs):
+    return lookup.run(terms, api_url="https://cloud.example.com/client/api", api_key="key", api_secret="secret", **kwargs)
+
+
+def test_lookup_api_not_cached_by_default(lookup, cloudstack_api):
+    for i in range(3):
+        assert run_lookup(lookup, ["listZones"])[0]["zone"][0]["name"] == "zone-1"
+    assert len(cloudstack_api.calls) == 3
+
+
+def test_lookup_api_cached(lookup, cloudstack_api, mocker):
+    now = mocker.patch("time.time", return_value=1000.0)
+
+    results = [run_lookup(lookup, ["listZones"], cache=True) for i in range(3)]
+    assert results[0] == results[-1]
+    assert len(cloudstack_api.calls) == 1
+
+    # Other args are cached apart
+    run_lookup(lookup, ["listZones"], query_params={"id": "zone-1-id"}, cache=True)
+    assert len(cloudstack_api.calls) == 2
+
+    # Expired after the TTL
+    now.return_value = 1061.0
+    run_lookup(lookup, ["listZones"], cache=True)
+    assert len(cloudstack_api.calls) == 3
+
+
+def test_lookup_api_mutating_not_cached(lookup, cloudstack_api):
+    cloudstack_api.resources["deployVirtualMachine"] = ("virtualmachine", [get_instance(1)])
+    for i in range(2):
+        run_lookup(lookup, ["deployVirtualMachine"], cache=True)
+    assert len(cloudstack_api.calls) == 2
+
+
+def test_lookup_api_fields(lookup, cloudstack_api):
+    result = run_lookup(lookup, ["listVirtualMachines"], fields=["name", "state"])
+    assert len(result) == 1200
+    assert result[0] == {"name": "vm-0", "state": "Running"}
+    assert [args["page"] for command, args in cloudstack_api.calls] == [1, 2, 3]
+
+
+def test_lookup_api_max_items(lookup, cloudstack_api):
+    # Only the pages needed are fetched
+    result = run_lookup(lookup, ["listVirtualMachines"], max_items=150, pagesize=100)
+    assert [vm["name"] for vm in result] == ["vm-%d" % i for i in range(150)]
+    assert [(args["page"], args["pagesize"]) for command, args in cloudstack_api.calls] == [(1, 100), (2, 100)]
+
+    # The page size defaults to the max items
+    cloudstack_api.calls = []
+    result = run_lookup(lookup, ["listVirtualMachines"], max_items=10)
+    assert len(result) == 10
+    assert [(args["page"], args["pagesize"]) for command, args in cloudstack_api.calls] == [(1, 10)]
+
+
+def test_lookup_api_page(lookup, cloudstack_api):
+    result = run_lookup(lookup, ["listVirtualMachines"], page=2, pagesize=10, fields=["name"])
+    assert result == [{"name": "vm-%d" % i} for i in range(10, 20)]
+    assert len(cloudstack_api.calls) == 1
+
+
+def test_lookup_api_query(lookup, cloudstack_api):
+    pytest.importorskip("jmespath")
+    result = run_lookup(lookup, ["listVirtualMachines"], query="[?affinitygroup[0].name=='ag-3'].name")
+    assert result == ["vm-%d" % i for i in range(3, 1200, 10)]
+
+
+def test_lookup_api_query_missing_lib(lookup, cloudstack_api, mocker):
+    mocker.patch.object(api, "HAS_LIB_JMESPATH", False)
+    with pytest.raises(AnsibleError, match="install jmespath"):
+        run_lookup(lookup, ["listVirtualMachines"], query="[].name")
+
+
+def test_lookup_api_multiple(lookup, cloudstack_api):
+    specs = {
+        "zones": {"command": "listZones"},
+        "networks": {"command": "listNetworks", "query_params": {"zoneid": "zone-1-id"}},
+        "service_offerings": "listServiceOfferings",
+    }
+    result = run_lookup(lookup, [specs], query_params={"listall": True}, fields=["name"])
+    assert result == [
+        {
+            "zones": [{"name": "zone-1"}],
+            "networks": [{"name": "net-a"}],
+            "service_offerings": [{"name": "small"}],
+        }
+    ]
+    # The query params of an endpoint are merged into the common ones
+    calls = dict(cloudstack_api.calls)
+    assert calls["listNetworks"]["zoneid"] == "zone-1-id"
+    assert calls["listNetworks"]["listall"]
+    assert "zoneid" not in calls["listZones"]
+
+
+def test_lookup_api_multiple_list(lookup, cloudstack_api):
+    result = run_lookup(lookup, ["listZones", {"command": "listNetworks", "name": "nets"}])
+    assert sorted(result[0]) == ["listZones", "nets"]
+    assert result[0]["listZones"]["zone"][0]["name"] == "zone-1"
+    assert result[0]["nets"]["network"][0]["name"] == "net-a"
+
+
+@pytest.mark.parametrize(
+    "terms, msg",
+    [
+        (["listZones", "listZones"], "Duplicate endpoint listZones"),
+        ([{"zones": {"query_params": {"id": "zone-1-id"}}}], "Missing command to query for zones"),
+        ([{}], "You must pass at least one endpoint"),
+    ],
+)
+def test_lookup_api_multiple_invalid(lookup, cloudstack_api, terms, msg):
+    with pytest.raises(AnsibleError, match=msg):
+        run_lookup(lookup, terms)
+    assert not cloudstack_api.calls
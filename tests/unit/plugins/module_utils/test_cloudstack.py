@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import json
+import time
+
+import pytest
+from cs import CloudStackApiException
+from requests import Response
+from requests.exceptions import ConnectionError, ConnectTimeout, ReadTimeout
+from urllib3.exceptions import MaxRetryError, NewConnectionError
+
+from ansible_collections.ngine_io.cloudstack.plugins.module_utils.cloudstack import (
+    AnsibleCloudStack,
+    CloudStackApiStats,
+    CloudStackCassetteError,
+    CloudStackLookupCache,
+    CloudStackRateLimiter,
+    CloudStackSession,
+    call_api,
+)
+
+
+def get_rate_limiter(tmp_path, rate, api_key="key"):
+    return CloudStackRateLimiter(path=str(tmp_path), rate=rate, endpoint="https://cloud.example.com/client/api", api_key=api_key)
+
+
+@pytest.fixture
+def clock(mocker):
+    """Mock the time, a sleep advances the clock, the waits are recorded."""
+    clock = mocker.Mock(now=1000.0, waits=[])
+
+    def sleep(seconds):
+        clock.waits.append(seconds)
+        clock.now += seconds
+
+    mocker.patch("time.time", side_effect=lambda: clock.now)
+    mocker.patch("time.sleep", side_effect=sleep)
+    return clock
+
+
+def test_rate_limiter_shared_bucket(tmp_path, clock):
+    # Limiters of different processes share the bucket of the API key by the state file
+    limiters = [get_rate_limiter(tmp_path, 20) for i in range(4)]
+
+    for i in range(30):
+        limiters[i % 4].acquire()
+
+    # A burst of 20 requests, the next 10 at 20 requests per second
+    assert clock.waits == pytest.approx([0.05] * 10)
+
+
+def test_rate_limiter_refill(tmp_path, clock):
+    limiter = get_rate_limiter(tmp_path, 2)
+    for i in range(2):
+        limiter.acquire()
+    assert not clock.waits
+
+    # Half a token refilled, the other half is waited for
+    clock.now += 0.25
+    limiter.acquire()
+    assert clock.waits == pytest.approx([0.25])
+
+
+def test_rate_limiter_per_api_key(tmp_path, clock):
+    for i in range(2):
+        get_rate_limiter(tmp_path, 1, api_key="key-1").acquire()
+    assert clock.waits == pytest.approx([1.0])
+
+    get_rate_limiter(tmp_path, 1, api_key="key-2").acquire()
+    assert clock.waits == pytest.approx([1.0])
+
+
+def test_lookup_cache_invalidate(tmp_path):
+    cache = CloudStackLookupCache(path=str(tmp_path), ttl=60, endpoint="https://cloud.example.com/client/api", api_key="key")
+    for command in ("listZones", "listNetworks", "listVPCs"):
+        cache.set(command, {"name": "a"}, [{"id": "%s-id" % command}])
+
+    cache.invalidate("createZone")
+    assert cache.get("listZones", {"name": "a"}) is None
+    assert cache.get("listNetworks", {"name": "a"}) == [{"id": "listNetworks-id"}]
+
+    # The networks of a VPC are listed with the VPC
+    cache.invalidate("deleteNetwork")
+    assert cache.get("listNetworks", {"name": "a"}) is None
+    assert cache.get("listVPCs", {"name": "a"}) is None
+
+
+def test_session_retries_throttled_requests(mocker):
+    sleep = mocker.patch("time.sleep")
+    session = CloudStackSession(retries=2)
+    throttled = mocker.Mock(status_code=429, headers={"Retry-After": "3"})
+    ok = mocker.Mock(status_code=200, headers={})
+    send = mocker.patch.object(session.session, "send", side_effect=[throttled, throttled, ok])
+
+    with session as s:
+        assert s.send("request", timeout=10) is ok
+
+    assert send.call_args_list == [mocker.call("request", timeout=10)] * 3
+    assert sleep.call_args_list == [mocker.call(3)] * 2
+
+
+def test_session_gives_up_throttled_requests(mocker):
+    sleep = mocker.patch("time.sleep")
+    session = CloudStackSession(retries=1)
+    throttled = mocker.Mock(status_code=429, headers={})
+    mocker.patch.object(session.session, "send", return_value=throttled)
+
+    assert session.send("request") is throttled
+    assert sleep.call_count == 1
+
+
+def get_api_error(mocker, status_code):
+    return CloudStackApiException("HTTP %d response from CloudStack" % status_code, response=mocker.Mock(status_code=status_code))
+
+
+@pytest.mark.parametrize(
+    "command,error,calls",
+    [
+        # Read-only commands are retried on transient errors
+        ("listVirtualMachines", "server_error", 3),
+        ("listVirtualMachines", "read_timeout", 3),
+        ("queryAsyncJobResult", "connection_reset", 3),
+        ("listVirtualMachines", "client_error", 1),
+        ("listVirtualMachines", "permission_denied", 1),
+        # Mutating commands are retried only if not sent
+        ("deployVirtualMachine", "connect_timeout", 3),
+        ("deployVirtualMachine", "connection_refused", 3),
+        ("deployVirtualMachine", "server_error", 1),
+        ("deployVirtualMachine", "read_timeout", 1),
+        ("deployVirtualMachine", "connection_reset", 1),
+    ],
+)
+def test_call_api_retries(mocker, command, error, calls):
+    mocker.patch("time.sleep")
+    errors = {
+        "server_error": get_api_error(mocker, 502),
+        "client_error": get_api_error(mocker, 431),
+        "permission_denied": get_api_error(mocker, 531),
+        "read_timeout": ReadTimeout("Read timed out"),
+        "connect_timeout": ConnectTimeout("Connect timed out"),
+        "connection_refused": ConnectionError(MaxRetryError(None, "/client/api", NewConnectionError(None, "Connection refused"))),
+        "connection_reset": ConnectionError("Connection reset by peer"),
+    }
+    client = mocker.Mock()
+    api = getattr(client, command)
+    api.side_effect = [errors[error], errors[error], {"count": 0}]
+
+    if calls == 3:
+        assert call_api(client, command, {"id": "1"}, retries=2) == {"count": 0}
+    else:
+        with pytest.raises(type(errors[error])):
+            call_api(client, command, {"id": "1"}, retries=2)
+    assert api.call_args_list == [mocker.call(id="1")] * calls
+
+
+def test_call_api_gives_up(mocker):
+    mocker.patch("time.sleep")
+    client = mocker.Mock()
+    client.listZones.side_effect = ReadTimeout("Read timed out")
+
+    with pytest.raises(ReadTimeout):
+        call_api(client, "listZones", {}, retries=3)
+    assert client.listZones.call_count == 4
+
+
+def test_api_stats(mocker, tmp_path):
+    stats_file = tmp_path / "stats.jsonl"
+    stats = CloudStackApiStats(stats_file=str(stats_file), module_name="ngine_io.cloudstack.instance_info")
+    session = CloudStackSession(stats=stats)
+    responses = [mocker.Mock(status_code=200, headers={}, content=b"x" * size) for size in (100, 50, 10)]
+    mocker.patch.object(session.session, "send", side_effect=responses)
+
+    for query in ("command=listVirtualMachines&page=1&pagesize=2&zoneid=1", "command=listVirtualMachines&page=2&pagesize=2&zoneid=1"):
+        session.send(mocker.Mock(url="https://cloud.example.com/client/api?%s&apiKey=key&signature=sig" % query, body=None))
+    session.send(mocker.Mock(url="https://cloud.example.com/client/api", body="command=deployVirtualMachine&name=vm-1&zoneid=1"))
+    stats.add_job("job-1", time.time() - 2, 2, 3)
+
+    assert stats.summary["requests"] == 3
+    assert stats.summary["bytes"] == 160
+    assert stats.summary["commands"]["listVirtualMachines"]["pages"] == 2
+    assert sum(stats.summary["commands"]["listVirtualMachines"]["latency"].values()) == 2
+    assert stats.summary["commands"]["deployVirtualMachine"]["requests"] == 1
+    assert stats.summary["jobs"] == {"count": 1, "duration": 2, "polls": 3}
+
+    records = [json.loads(line) for line in stats_file.read_text().splitlines()]
+    assert [r["type"] for r in records] == ["request", "request", "request", "job"]
+    assert records[0]["args"] == ["zoneid"]
+    assert records[2]["args"] == ["name", "zoneid"]
+    assert records[2]["module"] == "ngine_io.cloudstack.instance_info"
+
+
+def get_response(status_code, body):
+    response = Response()
+    response.status_code = status_code
+    response.reason = "OK"
+    response.headers["Content-Type"] = "application/json; charset=UTF-8"
+    response._content = body.encode("utf-8")
+    return response
+
+
+def test_cassette_record_replay(mocker, monkeypatch, tmp_path):
+    cassette = tmp_path / "cassette.jsonl"
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE", str(cassette))
+    requests = [
+        ("GET", "https://cloud.example.com/client/api?command=queryAsyncJobResult&jobid=1&apiKey=key&expires=1&signature=sig-%d" % i, None) for i in range(3)
+    ]
+    requests.append(("POST", "https://cloud.example.com/client/api", "command=deployVirtualMachine&name=vm-1&signature=sig"))
+    bodies = ['{"jobstatus": 0}', '{"jobstatus": 1}', '{"jobstatus": 1}', '{"jobid": "1"}']
+
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE_MODE", "record")
+    session = CloudStackSession()
+    mocker.patch.object(session.session, "send", side_effect=[get_response(200, body) for body in bodies])
+    for method, url, body in requests:
+        session.send(mocker.Mock(method=method, url=url, body=body))
+
+    records = cassette.read_text()
+    assert "sig" not in records
+    assert "apiKey" not in records
+
+    # Replayed in the recorded order without network, by a new session
+    monkeypatch.setenv("CLOUDSTACK_CASSETTE_MODE", "replay")
+    session = CloudStackSession()
+    send = mocker.patch.object(session.session, "send")
+    responses = [session.send(mocker.Mock(method=method, url=url.replace("sig-", "other-"), body=body)) for method, url, body in requests]
+    assert [r.json() for r in responses] == [json.loads(body) for body in bodies]
+    assert responses[0].headers["content-type"] == "application/json; charset=UTF-8"
+    assert not send.called
+
+    # The last response of a request is repeated, unknown requests fail
+    assert session.send(mocker.Mock(method="GET", url=requests[0][1], body=None)).json() == {"jobstatus": 1}
+    with pytest.raises(CloudStackCassetteError, match="No response recorded"):
+        session.send(mocker.Mock(method="GET", url="https://cloud.example.com/client/api?command=listZones", body=None))
+
+
+def get_cloudstack(mocker, api, **params):
+    """Return an AnsibleCloudStack of a module with the params, API calls are answered by the api function."""
+    mocker.patch("ansible_collections.ngine_io.cloudstack.plugins.module_utils.cloudstack.call_api", side_effect=api)
+    params = dict(
+        {
+            "api_url": "https://cloud.example.com/client/api",
+            "api_key": "key",
+            "api_secret": "secret",
+            "api_timeout": 10,
+            "api_http_method": "get",
+            "api_poll_interval": 1,
+        },
+        **params
+    )
+    module = mocker.Mock(params=params, check_mode=False)
+    module.fail_json.side_effect = lambda **kwargs: pytest.fail(kwargs["msg"])
+    return AnsibleCloudStack(module)
+
+
+def get_jobs_api(calls):
+    """Return an API of async jobs, jobs are finished after they were listed or queried once."""
+    jobs = {}
+
+    def api(client, command, args, retries=0):
+        calls.append((command, args))
+        if command == "deployVirtualMachine":
+            jobid = "job-%d" % len(jobs)
+            jobs[jobid] = {"jobid": jobid, "jobstatus": 0}
+            return {"jobid": jobid, "id": args["name"]}
+
+        listed = list(jobs.values()) if command == "listAsyncJobs" else [jobs[args["jobid"]]]
+        res = [dict(job) for job in listed]
+        for job in listed:
+            job.update(jobstatus=1, jobresult={"virtualmachine": {"name": "vm-%s" % job["jobid"]}})
+        if command == "listAsyncJobs":
+            return {"count": len(res), "asyncjobs": res}
+        return res[0]
+
+    return api
+
+
+def test_poll_jobs_lists_recent_jobs(mocker):
+    mocker.patch("time.sleep")
+    # 2026-01-01T00:00:00Z
+    mocker.patch("time.time", return_value=1767225600.0)
+    calls = []
+    acs = get_cloudstack(mocker, get_jobs_api(calls))
+
+    results = acs.run_jobs([("deployVirtualMachine", {"name": "vm-%d" % i}) for i in range(4)], key="virtualmachine")
+    assert results == [{"name": "vm-job-%d" % i} for i in range(4)]
+
+    # Only jobs since the submission, with a tolerated clock skew of 5 minutes
+    list_calls = [args for command, args in calls if command == "listAsyncJobs"]
+    assert len(list_calls) == 2
+    assert all(args["startdate"] == "2025-12-31T23:55:00+0000" for args in list_calls)
+    assert "queryAsyncJobResult" not in [command for command, args in calls]
+
+
+def test_poll_jobs_queries_few_jobs(mocker):
+    mocker.patch("time.sleep")
+    calls = []
+    acs = get_cloudstack(mocker, get_jobs_api(calls))
+
+    results = acs.run_jobs([("deployVirtualMachine", {"name": "vm-%d" % i}) for i in range(2)], key="virtualmachine")
+    assert results == [{"name": "vm-job-%d" % i} for i in range(2)]
+    assert [command for command, args in calls].count("queryAsyncJobResult") == 4
+    assert "listAsyncJobs" not in [command for command, args in calls]
+
+
+@pytest.mark.parametrize("api_poll_interval, waits", [(None, (0.25, 0.5)), (0, (0, 0)), (2, (1, 2))])
+def test_poll_jobs_interval(mocker, api_poll_interval, waits):
+    sleep = mocker.patch("time.sleep")
+    acs = get_cloudstack(mocker, get_jobs_api([]), api_poll_interval=api_poll_interval)
+
+    acs.run_jobs([("deployVirtualMachine", {"name": "vm-0"})], key="virtualmachine")
+    # An explicit 0 is kept, the default of the argument spec if not given
+    assert sleep.call_count == 1
+    assert waits[0] <= sleep.call_args[0][0] <= waits[1]
+
+
+@pytest.mark.parametrize("api_stats", [False, True])
+def test_poll_jobs_stats(mocker, api_stats):
+    mocker.patch("time.sleep")
+    acs = get_cloudstack(mocker, get_jobs_api([]), api_stats=api_stats)
+
+    acs.run_jobs([("deployVirtualMachine", {"name": "vm-%d" % i}) for i in range(3)], key="virtualmachine")
+
+    # The jobs are recorded only in the API stats if enabled
+    assert "job_stats" not in acs.result
+    if api_stats:
+        assert acs.result["cloudstack_api_stats"]["jobs"]["count"] == 3
+    else:
+        assert "cloudstack_api_stats" not in acs.result
+
+
+def get_vms_api(calls, vms):
+    """Return an API listing the instances, a name is matched as substring like the API does."""
+
+    def api(client, command, args, retries=0):
+        calls.append((command, args))
+        res = [vm for vm in vms if args.get("name", "") in vm["name"]]
+        return {"count": len(res), "virtualmachine": res}
+
+    return api
+
+
+VMS = [{"id": "vm-%d-id" % i, "name": "vm-%d" % i} for i in range(12)]
+
+
+def test_get_vms_index(mocker):
+    calls = []
+    acs = get_cloudstack(mocker, get_vms_api(calls, VMS))
+
+    index = acs.get_vms_index(["vm-1", "vm-2-id"], networkid="net-a-id")
+    assert index["vm-1"] is index["vm-1-id"]
+    assert index["vm-2-id"]["name"] == "vm-2"
+    # One listing scoped by the args
+    assert len(calls) == 1
+    assert calls[0][1]["networkid"] == "net-a-id"
+    assert "name" not in calls[0][1]
+
+
+def test_get_vms_index_single_name(mocker):
+    calls = []
+    acs = get_cloudstack(mocker, get_vms_api(calls, VMS))
+
+    # vm-10 and vm-11 match too, the exact match wins
+    index = acs.get_vms_index(["vm-1"], zoneid="zone-1-id")
+    assert index["vm-1"]["id"] == "vm-1-id"
+    assert sorted(index) == ["vm-1", "vm-1-id"]
+    assert [(command, args["name"], args["zoneid"]) for command, args in calls] == [("listVirtualMachines", "vm-1", "zone-1-id")]
+
+    # A UUID does not match by name, all instances are listed
+    calls[:] = []
+    index = acs.get_vms_index(["vm-3-id"], zoneid="zone-1-id")
+    assert index["vm-3-id"]["name"] == "vm-3"
+    assert len(calls) == 2
+    assert "name" not in calls[1][1]
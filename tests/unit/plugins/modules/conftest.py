@@ -0,0 +1,95 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import contextlib
+import io
+import json
+import uuid
+
+import pytest
+from ansible.module_utils.testing import patch_module_args
+
+
+class CloudStackApi:
+    """Fake API answering the commands of a module, the calls are recorded.
+
+    List commands return the items of the resources page by page unless a handler is registered.
+    The results of the async commands are returned by jobs, finished at once.
+    """
+
+    def __init__(self):
+        self.resources = {}
+        self.handlers = {}
+        self.async_commands = set()
+        self.jobs = {}
+        self.calls = []
+
+    def add_resources(self, command, key, items):
+        self.resources[command] = (key, items)
+
+    def add_handler(self, command, handler, is_async=False):
+        self.handlers[command] = handler
+        if is_async:
+            self.async_commands.add(command)
+
+    @property
+    def commands(self):
+        return [command for command, args in self.calls]
+
+    def __call__(self, client, command, args, retries=0):
+        self.calls.append((command, dict(args)))
+        if command == "queryAsyncJobResult":
+            return self.jobs[args["jobid"]]
+        if command == "listAsyncJobs":
+            return {"count": len(self.jobs), "asyncjobs": list(self.jobs.values())}
+
+        if command in self.handlers:
+            res = self.handlers[command](args)
+            if command not in self.async_commands:
+                return res
+            jobid = str(uuid.uuid4())
+            self.jobs[jobid] = {"jobid": jobid, "jobstatus": 1, "jobresultcode": 0, "jobresult": res}
+            return {"jobid": jobid}
+
+        if command.startswith("list"):
+            key, items = self.resources.get(command, (None, []))
+            if not items:
+                return {}
+            page, page_size = int(args.get("page", 1)), int(args.get("pagesize", 500))
+            return {"count": len(items), key: items[(page - 1) * page_size : page * page_size]}
+        raise AssertionError("Unexpected command %s" % command)
+
+
+@pytest.fixture
+def cloudstack_api(mocker):
+    cloudstack_api = CloudStackApi()
+    mocker.patch("ansible_collections.ngine_io.cloudstack.plugins.module_utils.cloudstack.call_api", side_effect=cloudstack_api)
+    return cloudstack_api
+
+
+@pytest.fixture
+def run_module(monkeypatch, mocker, tmp_path):
+    """Return a function running the main() of a module with the args, returning the result."""
+    monkeypatch.setenv("CLOUDSTACK_ENDPOINT", "https://cloud.example.com/client/api")
+    monkeypatch.setenv("CLOUDSTACK_KEY", "key")
+    monkeypatch.setenv("CLOUDSTACK_SECRET", "secret")
+    monkeypatch.setenv("CLOUDSTACK_CACHE_DIR", str(tmp_path))
+    mocker.patch("time.sleep")
+
+    def run(module, args, check_mode=False, failed=False):
+        if check_mode:
+            args = dict(args, _ansible_check_mode=True)
+        stdout = io.StringIO()
+        with patch_module_args(args), contextlib.redirect_stdout(stdout):
+            with pytest.raises(SystemExit):
+                module.main()
+        result = json.loads(stdout.getvalue())
+        assert bool(result.get("failed")) == failed, result.get("msg")
+        return result
+
+    return run
@@ -0,0 +1,152 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import firewall
+
+FIREWALL_ARGS = {
+    "zone": "zone-1",
+    "ip_address": "198.51.100.1",
+}
+
+EGRESS_ARGS = {
+    "zone": "zone-1",
+    "network": "net-a",
+    "type": "egress",
+    "protocol": "tcp",
+}
+
+
+def get_rule(rule_id, port, cidrs="0.0.0.0/0", **kwargs):
+    return dict(
+        {
+            "id": rule_id,
+            "ipaddressid": "ip-1-id",
+            "protocol": "tcp",
+            "startport": port,
+            "endport": port,
+            "cidrlist": cidrs,
+            "state": "Active",
+        },
+        **kwargs
+    )
+
+
+def to_list(value):
+    return ",".join(value) if isinstance(value, list) else value
+
+
+@pytest.fixture
+def rules(cloudstack_api):
+    """Firewall rules of the IP address and the network, changed by the jobs."""
+    rules = {}
+
+    def list_rules(args):
+        items = list(rules.values())
+        return {"count": len(items), "firewallrule": items} if items else {}
+
+    def create_rule(args):
+        rule = {"id": "rule-%d-id" % len(cloudstack_api.jobs), "protocol": args["protocol"], "cidrlist": to_list(args.get("cidrlist")), "state": "Active"}
+        if args.get("destcidrlist"):
+            rule["destcidrlist"] = to_list(args["destcidrlist"])
+        for key in ("startport", "endport", "icmptype", "icmpcode"):
+            if args.get(key) is not None:
+                rule[key] = int(args[key])
+        rules[rule["id"]] = rule
+        return {"firewallrule": rule}
+
+    def delete_rule(args):
+        del rules[args["id"]]
+        return {"success": True}
+
+    cloudstack_api.add_resources("listZones", "zone", [{"id": "zone-1-id", "name": "zone-1"}])
+    cloudstack_api.add_resources("listPublicIpAddresses", "publicipaddress", [{"id": "ip-1-id", "ipaddress": "198.51.100.1", "zoneid": "zone-1-id"}])
+    cloudstack_api.add_resources("listNetworks", "network", [{"id": "net-a-id", "name": "net-a", "displaytext": "net-a", "cidr": "10.0.0.0/24"}])
+    for prefix in ("", "Egress"):
+        cloudstack_api.add_handler("list%sFirewallRules" % prefix, list_rules)
+        cloudstack_api.add_handler("create%sFirewallRule" % prefix, create_rule, is_async=True)
+        cloudstack_api.add_handler("delete%sFirewallRule" % prefix, delete_rule, is_async=True)
+    return rules
+
+
+def test_firewall_rules_create(run_module, cloudstack_api, rules):
+    specs = [{"port": 80}, {"port": 443, "cidrs": ["10.0.0.0/8", "192.168.0.0/16"]}, {"protocol": "icmp", "icmp_type": 8, "icmp_code": 0}, {"port": 80}]
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=specs))
+    assert result["changed"]
+    assert len(result["rules"]) == 3
+    assert cloudstack_api.commands.count("createFirewallRule") == 3
+    assert sorted(rule.get("startport", 0) for rule in rules.values()) == [0, 80, 443]
+
+    # The CIDRs in another order are the same rule
+    cloudstack_api.calls = []
+    specs[1]["cidrs"].reverse()
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=specs, purge=True))
+    assert not result["changed"]
+    assert cloudstack_api.commands.count("listFirewallRules") == 1
+    assert "createFirewallRule" not in cloudstack_api.commands
+    assert not result["purged_rules"]
+
+
+def test_firewall_rules_duplicate_spec_existing(run_module, cloudstack_api, rules):
+    rules["rule-1-id"] = get_rule("rule-1-id", 80)
+
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}, {"port": 80}]))
+    assert not result["changed"]
+    assert [rule["id"] for rule in result["rules"]] == ["rule-1-id"]
+    assert "createFirewallRule" not in cloudstack_api.commands
+
+
+def test_firewall_rules_purge(run_module, cloudstack_api, rules):
+    # Rule 2 duplicates rule 1, rule 3 is not in the policy
+    rules.update((rule["id"], rule) for rule in [get_rule("rule-1-id", 80), get_rule("rule-2-id", 80), get_rule("rule-3-id", 22)])
+
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}, {"port": 443}], purge=True))
+    assert result["changed"]
+    assert sorted(rule["id"] for rule in result["purged_rules"]) == ["rule-2-id", "rule-3-id"]
+    assert sorted(rule["startport"] for rule in rules.values()) == [80, 443]
+    assert "rule-1-id" in rules
+
+    # Without purge other rules are kept
+    rules["rule-3-id"] = get_rule("rule-3-id", 22)
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}]))
+    assert not result["changed"]
+    assert "rule-3-id" in rules
+
+
+def test_firewall_rules_absent(run_module, cloudstack_api, rules):
+    rules.update((rule["id"], rule) for rule in [get_rule("rule-1-id", 80), get_rule("rule-2-id", 22)])
+
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}, {"port": 443}], state="absent"))
+    assert result["changed"]
+    assert [rule["id"] for rule in result["rules"]] == ["rule-1-id"]
+    assert list(rules) == ["rule-2-id"]
+
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}, {"port": 443}], state="absent"))
+    assert not result["changed"]
+
+
+def test_firewall_rules_check_mode(run_module, cloudstack_api, rules):
+    rules["rule-1-id"] = get_rule("rule-1-id", 22)
+
+    result = run_module(firewall, dict(FIREWALL_ARGS, rules=[{"port": 80}], purge=True), check_mode=True)
+    assert result["changed"]
+    assert [rule["id"] for rule in result["purged_rules"]] == ["rule-1-id"]
+    assert [command for command in cloudstack_api.commands if not command.startswith("list")] == []
+    assert list(rules) == ["rule-1-id"]
+
+
+def test_firewall_rules_egress_dest_cidrs(run_module, cloudstack_api, rules):
+    specs = [{"port": 8080, "dest_cidrs": ["192.0.2.0/24"]}, {"port": 8080, "dest_cidrs": ["198.51.100.0/24"]}]
+    result = run_module(firewall, dict(EGRESS_ARGS, rules=specs))
+    assert result["changed"]
+    assert cloudstack_api.commands.count("createEgressFirewallRule") == 2
+    assert sorted(rule["destcidrlist"] for rule in rules.values()) == ["192.0.2.0/24", "198.51.100.0/24"]
+
+    result = run_module(firewall, dict(EGRESS_ARGS, rules=list(reversed(specs)), purge=True))
+    assert not result["changed"]
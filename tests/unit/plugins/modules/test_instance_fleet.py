@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import instance
+
+
+def get_instance(i, state="Running"):
+    return {
+        "id": "vm-%d-id" % i,
+        "name": "vm-%d" % i,
+        "displayname": "vm-%d" % i,
+        "state": state,
+        "zonename": "zone-1",
+        "tags": [],
+    }
+
+
+@pytest.fixture
+def fleet(cloudstack_api):
+    """Existing instances of the fleet, the jobs change their state."""
+    vms = dict((vm["id"], vm) for vm in (get_instance(i) for i in range(3)))
+
+    def list_vms(args):
+        items = [vm for vm in vms.values() if not args.get("ids") or vm["id"] in args["ids"]]
+        return {"count": len(items), "virtualmachine": items} if items else {}
+
+    def set_state(state):
+        def handler(args):
+            vms[args["id"]]["state"] = state
+            return {"virtualmachine": vms[args["id"]]}
+
+        return handler
+
+    def destroy(args):
+        vm = vms.pop(args["id"]) if args.get("expunge") else vms[args["id"]]
+        vm["state"] = "Expunging" if args.get("expunge") else "Destroyed"
+        return {"virtualmachine": vm}
+
+    cloudstack_api.add_resources("listZones", "zone", [{"id": "zone-1-id", "name": "zone-1"}])
+    cloudstack_api.add_handler("listVirtualMachines", list_vms)
+    cloudstack_api.add_handler("startVirtualMachine", set_state("Running"), is_async=True)
+    cloudstack_api.add_handler("stopVirtualMachine", set_state("Stopped"), is_async=True)
+    cloudstack_api.add_handler("destroyVirtualMachine", destroy, is_async=True)
+    return vms
+
+
+INSTANCES = [{"name": "vm-%d" % i} for i in range(3)]
+
+
+def get_args(**kwargs):
+    return dict({"instances": INSTANCES, "zone": "zone-1"}, **kwargs)
+
+
+def test_instance_fleet_stop_start_without_template(run_module, cloudstack_api, fleet):
+    result = run_module(instance, get_args(state="stopped"))
+    assert result["changed"]
+    assert [i["state"] for i in result["instances"]] == ["Stopped"] * 3
+    assert cloudstack_api.commands.count("stopVirtualMachine") == 3
+    # Nothing to deploy, the template and the offering are not resolved
+    assert "listTemplates" not in cloudstack_api.commands
+    assert "listServiceOfferings" not in cloudstack_api.commands
+
+    result = run_module(instance, get_args(state="stopped"))
+    assert not result["changed"]
+
+    result = run_module(instance, get_args(state="started"))
+    assert result["changed"]
+    assert [i["state"] for i in result["instances"]] == ["Running"] * 3
+
+
+def test_instance_fleet_deploy_requires_template(run_module, cloudstack_api, fleet):
+    result = run_module(instance, get_args(instances=INSTANCES + [{"name": "vm-new"}], state="started"), failed=True)
+    assert result["msg"] == "Template or ISO is required."
+
+
+def test_instance_fleet_check_mode(run_module, cloudstack_api, fleet):
+    result = run_module(instance, get_args(state="stopped"), check_mode=True)
+    assert result["changed"]
+    assert all(i["changed"] for i in result["instances"])
+    assert "stopVirtualMachine" not in cloudstack_api.commands
+    assert all(vm["state"] == "Running" for vm in fleet.values())
+
+
+def test_instance_fleet_expunged(run_module, cloudstack_api, fleet):
+    result = run_module(instance, get_args(instances=INSTANCES[:2], state="expunged", max_jobs=1))
+    assert result["changed"]
+    assert sorted(fleet) == ["vm-2-id"]
+    # The expunged instances are not returned with their stale state
+    assert result["instances"] == [
+        {"name": "vm-0", "display_name": "vm-0", "changed": True},
+        {"name": "vm-1", "display_name": "vm-1", "changed": True},
+    ]
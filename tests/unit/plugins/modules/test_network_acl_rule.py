@@ -0,0 +1,128 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import network_acl_rule
+
+ACL_ARGS = {
+    "zone": "zone-1",
+    "vpc": "vpc-a",
+    "network_acl": "acl-a",
+}
+
+RULES = [{"port": 80}, {"port": 443, "cidrs": ["10.0.0.0/8"]}, {"protocol": "all", "action_policy": "deny"}]
+
+
+def get_rule(number, port, **kwargs):
+    return dict(
+        {
+            "id": "rule-%d-id" % number,
+            "aclid": "acl-a-id",
+            "number": number,
+            "protocol": "tcp",
+            "startport": port,
+            "endport": port,
+            "cidrlist": "0.0.0.0/0",
+            "action": "Allow",
+            "traffictype": "Ingress",
+        },
+        **kwargs
+    )
+
+
+@pytest.fixture
+def rules(cloudstack_api):
+    """Rules of the network ACL by ID, changed by the jobs."""
+    rules = {}
+
+    def list_rules(args):
+        items = [rule for rule in rules.values() if rule["aclid"] == args["aclid"]]
+        return {"count": len(items), "networkacl": items} if items else {}
+
+    def set_rule(rule, args):
+        for key in ("protocol", "cidrlist", "action", "traffictype"):
+            if args.get(key) is not None:
+                rule[key] = args[key]
+        for key in ("number", "startport", "endport", "icmptype", "icmpcode"):
+            if args.get(key) is not None:
+                rule[key] = int(args[key])
+        return {"networkacl": rule}
+
+    def create_rule(args):
+        rule = {"id": "rule-%d-id" % args["number"], "aclid": args["aclid"]}
+        rules[rule["id"]] = rule
+        return set_rule(rule, args)
+
+    def delete_rule(args):
+        del rules[args["id"]]
+        return {"success": True}
+
+    cloudstack_api.add_resources("listZones", "zone", [{"id": "zone-1-id", "name": "zone-1"}])
+    cloudstack_api.add_resources("listVPCs", "vpc", [{"id": "vpc-a-id", "name": "vpc-a", "displaytext": "vpc-a", "zoneid": "zone-1-id"}])
+    cloudstack_api.add_resources("listNetworkACLLists", "networkacllist", [{"id": "acl-a-id", "name": "acl-a", "vpcid": "vpc-a-id"}])
+    cloudstack_api.add_handler("listNetworkACLs", list_rules)
+    cloudstack_api.add_handler("createNetworkACL", create_rule, is_async=True)
+    cloudstack_api.add_handler("updateNetworkACLItem", lambda args: set_rule(rules[args["id"]], args), is_async=True)
+    cloudstack_api.add_handler("deleteNetworkACL", delete_rule, is_async=True)
+    return rules
+
+
+def test_network_acl_rules_create(run_module, cloudstack_api, rules):
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=RULES))
+    assert result["changed"]
+    assert result["plan"] == {"create": [1, 2, 3], "update": [], "delete": []}
+    assert [(rule["rule_position"], rule["protocol"], rule["action_policy"]) for rule in result["rules"]] == [
+        (1, "tcp", "allow"),
+        (2, "tcp", "allow"),
+        (3, "all", "deny"),
+    ]
+    assert result["rules"][1]["cidrs"] == ["10.0.0.0/8"]
+
+    cloudstack_api.calls = []
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=RULES))
+    assert not result["changed"]
+    assert result["plan"] == {"create": [], "update": [], "delete": []}
+    assert cloudstack_api.commands.count("listNetworkACLs") == 1
+
+
+def test_network_acl_rules_changed(run_module, cloudstack_api, rules):
+    rules.update((rule["id"], rule) for rule in [get_rule(1, 80), get_rule(2, 22), get_rule(3, 8080), get_rule(4, 8443)])
+
+    # Rule 2 changed, rule 3 kept, rule 4 not in the list anymore, rule 10 added
+    specs = [{"port": 80}, {"port": 443}, {"port": 8080}, {"rule_position": 10, "protocol": "all", "action_policy": "deny"}]
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=specs))
+    assert result["changed"]
+    assert result["plan"] == {"create": [10], "update": [2], "delete": [4]}
+    assert sorted((rule["number"], rule.get("startport")) for rule in rules.values()) == [(1, 80), (2, 443), (3, 8080), (10, None)]
+    assert cloudstack_api.commands.count("updateNetworkACLItem") == 1
+
+
+def test_network_acl_rules_duplicate_position(run_module, cloudstack_api, rules):
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=[{"port": 80}, {"rule_position": 1, "port": 443}]), failed=True)
+    assert result["msg"] == "Duplicate rule position in rules: 1"
+    assert not [command for command in cloudstack_api.commands if not command.startswith("list")]
+
+
+def test_network_acl_rules_absent(run_module, cloudstack_api, rules):
+    rules.update((rule["id"], rule) for rule in [get_rule(1, 80), get_rule(2, 22), get_rule(3, 8080)])
+
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=[{"port": 80}, {"rule_position": 5, "port": 22}], state="absent"))
+    assert result["changed"]
+    assert result["plan"] == {"create": [], "update": [], "delete": [1]}
+    assert sorted(rule["number"] for rule in rules.values()) == [2, 3]
+
+
+def test_network_acl_rules_check_mode(run_module, cloudstack_api, rules):
+    rules.update((rule["id"], rule) for rule in [get_rule(1, 80), get_rule(2, 22), get_rule(4, 8443)])
+
+    result = run_module(network_acl_rule, dict(ACL_ARGS, rules=RULES), check_mode=True)
+    assert result["changed"]
+    assert result["plan"] == {"create": [3], "update": [2], "delete": [4]}
+    assert not [command for command in cloudstack_api.commands if not command.startswith("list")]
+    assert sorted(rule["number"] for rule in rules.values()) == [1, 2, 4]
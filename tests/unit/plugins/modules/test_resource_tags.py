@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import resource_tags
+
+RESOURCE_IDS = ["vm-%d-id" % i for i in range(3)]
+
+
+def get_args(**kwargs):
+    return dict({"resource_type": "UserVm", "resource_ids": RESOURCE_IDS, "tags": [{"key": "env", "value": "prod"}]}, **kwargs)
+
+
+@pytest.fixture
+def tags(cloudstack_api):
+    """Tags by resource ID, changed by the jobs."""
+    tags = {}
+
+    def list_tags(args):
+        items = [
+            {"resourcetype": "UserVm", "resourceid": resource_id, "key": key, "value": value}
+            for resource_id, resource_tags in sorted(tags.items())
+            for key, value in sorted(resource_tags.items())
+        ]
+        for param in ("resourcetype", "resourceid", "key", "value"):
+            if args.get(param):
+                items = [tag for tag in items if tag[param] == args[param]]
+        return {"count": len(items), "tag": items} if items else {}
+
+    def create_tags(args):
+        for resource_id in args["resourceids"]:
+            tags.setdefault(resource_id, {}).update((tag["key"], tag["value"]) for tag in args["tags"])
+        return {"success": True}
+
+    def delete_tags(args):
+        for resource_id in args["resourceids"]:
+            for tag in args["tags"]:
+                tags.get(resource_id, {}).pop(tag["key"], None)
+        return {"success": True}
+
+    cloudstack_api.add_handler("listTags", list_tags)
+    cloudstack_api.add_handler("createTags", create_tags, is_async=True)
+    cloudstack_api.add_handler("deleteTags", delete_tags, is_async=True)
+    return tags
+
+
+def test_resource_tags_create(run_module, cloudstack_api, tags):
+    tags["vm-0-id"] = {"env": "prod"}
+
+    result = run_module(resource_tags, get_args())
+    assert result["changed"]
+    assert result["resources"][2] == {"id": "vm-2-id", "tags": [{"key": "env", "value": "prod"}]}
+    # The resources needing the same tags are tagged by one job
+    assert [args["resourceids"] for command, args in cloudstack_api.calls if command == "createTags"] == [["vm-1-id", "vm-2-id"]]
+    # The tags of a few resources are listed per resource
+    assert sorted(args["resourceid"] for command, args in cloudstack_api.calls if command == "listTags") == RESOURCE_IDS
+
+    result = run_module(resource_tags, get_args())
+    assert not result["changed"]
+
+
+def test_resource_tags_many_resources(run_module, cloudstack_api, tags):
+    resource_ids = ["vm-%d-id" % i for i in range(resource_tags.TAGS_PER_RESOURCE_MAX + 1)]
+    tags.update((resource_id, {"env": "prod"}) for resource_id in resource_ids[1:])
+    tags["vm-other-id"] = {"env": "dev"}
+
+    result = run_module(resource_tags, get_args(resource_ids=resource_ids))
+    assert result["changed"]
+    # The tags of the key are listed at once
+    assert [(args["key"], args.get("resourceid")) for command, args in cloudstack_api.calls if command == "listTags"] == [("env", None)]
+    assert [args["resourceids"] for command, args in cloudstack_api.calls if command == "createTags"] == [["vm-0-id"]]
+    assert tags["vm-other-id"] == {"env": "dev"}
+
+
+def test_resource_tags_no_resources(run_module, cloudstack_api, tags):
+    args = {"resource_type": "UserVm", "filter_tags": [{"key": "sla", "value": "gold"}], "tags": [{"key": "env", "value": "prod"}]}
+    result = run_module(resource_tags, args)
+    assert not result["changed"]
+    assert result["resources"] == []
+    # Only the filter is listed
+    assert cloudstack_api.commands == ["listTags"]
+
+
+def test_resource_tags_update_purge(run_module, cloudstack_api, tags):
+    tags.update({"vm-0-id": {"env": "dev", "owner": "ops"}, "vm-1-id": {"env": "dev"}, "vm-2-id": {"env": "prod"}})
+
+    result = run_module(resource_tags, get_args(purge=True))
+    assert result["changed"]
+    assert all(resource["tags"] == [{"key": "env", "value": "prod"}] for resource in result["resources"])
+    assert tags == dict((resource_id, {"env": "prod"}) for resource_id in RESOURCE_IDS)
+    # Updated tags are deleted before created again
+    assert [command for command in cloudstack_api.commands if command.endswith("Tags") and command != "listTags"] == ["deleteTags", "deleteTags", "createTags"]
+
+    # Without purge other tags are kept
+    tags["vm-0-id"]["owner"] = "ops"
+    result = run_module(resource_tags, get_args())
+    assert not result["changed"]
+    assert tags["vm-0-id"] == {"env": "prod", "owner": "ops"}
+
+
+def test_resource_tags_absent(run_module, cloudstack_api, tags):
+    tags.update({"vm-0-id": {"env": "prod"}, "vm-1-id": {"env": "dev"}})
+
+    result = run_module(resource_tags, get_args(tags=[{"key": "env", "value": "prod"}], state="absent"))
+    assert result["changed"]
+    assert tags == {"vm-0-id": {}, "vm-1-id": {"env": "dev"}}
+
+    # A tag without value is removed regardless of its value
+    result = run_module(resource_tags, get_args(tags=[{"key": "env"}], state="absent"))
+    assert result["changed"]
+    assert tags == {"vm-0-id": {}, "vm-1-id": {}}
+
+
+def test_resource_tags_check_mode(run_module, cloudstack_api, tags):
+    result = run_module(resource_tags, get_args(), check_mode=True)
+    assert result["changed"]
+    assert [command for command in cloudstack_api.commands if command != "listTags"] == []
+    assert tags == {}
@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+# Copyright (c) 2026, agent <agent@local>
+# GNU General Public License v3.0+ (see COPYING or https://www.gnu.org/licenses/gpl-3.0.txt)
+
+from __future__ import absolute_import, division, print_function
+
+__metaclass__ = type
+
+import pytest
+
+from ansible_collections.ngine_io.cloudstack.plugins.modules import security_group_rule
+
+SG_ARGS = {
+    "security_group": "web",
+}
+
+
+def get_rule(rule_id, port, cidr="0.0.0.0/0", **kwargs):
+    return dict({"ruleid": rule_id, "protocol": "tcp", "startport": port, "endport": port, "cidr": cidr}, **kwargs)
+
+
+@pytest.fixture
+def security_groups(cloudstack_api):
+    """Security groups by name, their rules changed by the jobs."""
+    security_groups = dict((name, {"id": "%s-id" % name, "name": name, "account": "admin", "ingressrule": [], "egressrule": []}) for name in ("web", "bastion"))
+
+    def list_security_groups(args):
+        items = [sg for name, sg in security_groups.items() if args.get("securitygroupname") in (None, name)]
+        return {"count": len(items), "securitygroup": items} if items else {}
+
+    def authorize(key):
+        def handler(args):
+            security_group = [sg for sg in security_groups.values() if sg["id"] == args["securitygroupid"]][0]
+            rule = dict((param, int(args[param])) for param in ("startport", "endport", "icmptype", "icmpcode") if args.get(param) is not None)
+            rule["protocol"] = args["protocol"]
+            targets = [{"cidr": cidr} for cidr in args.get("cidrlist") or []]
+            targets += [{"securitygroupname": group["group"], "account": group["account"]} for group in args.get("usersecuritygrouplist") or []]
+            rules = [dict(rule, ruleid="rule-%d-id" % (len(cloudstack_api.jobs) * 100 + i), **target) for i, target in enumerate(targets)]
+            security_group[key].extend(rules)
+            return {"securitygroup": dict(security_group, **{key: rules})}
+
+        return handler
+
+    def revoke(key):
+        def handler(args):
+            for security_group in security_groups.values():
+                security_group[key] = [rule for rule in security_group[key] if rule["ruleid"] != args["id"]]
+            return {"success": True}
+
+        return handler
+
+    cloudstack_api.add_handler("listSecurityGroups", list_security_groups)
+    for sg_type in ("Ingress", "Egress"):
+        key = sg_type.lower() + "rule"
+        cloudstack_api.add_handler("authorizeSecurityGroup%s" % sg_type, authorize(key), is_async=True)
+        cloudstack_api.add_handler("revokeSecurityGroup%s" % sg_type, revoke(key), is_async=True)
+    return security_groups
+
+
+def test_security_group_rules_create(run_module, cloudstack_api, security_groups):
+    specs = [
+        {"port": 80, "cidrs": ["10.0.0.0/8", "192.168.0.0/16"]},
+        {"port": 22, "user_security_group": "bastion"},
+        {"type": "egress", "protocol": "icmp", "icmp_type": -1, "icmp_code": -1},
+    ]
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=specs))
+    assert result["changed"]
+    assert len(result["rules"]) == 4
+    assert all("id" in rule for rule in result["rules"])
+    # The CIDRs of a port are authorized in one command
+    assert cloudstack_api.commands.count("authorizeSecurityGroupIngress") == 2
+    assert cloudstack_api.commands.count("authorizeSecurityGroupEgress") == 1
+    assert sorted(rule.get("cidr") or rule["securitygroupname"] for rule in security_groups["web"]["ingressrule"]) == [
+        "10.0.0.0/8",
+        "192.168.0.0/16",
+        "bastion",
+    ]
+
+    cloudstack_api.calls = []
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=specs, purge=True))
+    assert not result["changed"]
+    assert not result["purged_rules"]
+    assert cloudstack_api.commands == ["listSecurityGroups"]
+
+
+def test_security_group_rules_duplicate_spec(run_module, cloudstack_api, security_groups):
+    security_groups["web"]["ingressrule"].append(get_rule("rule-1-id", 80))
+
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}, {"port": 80}, {"port": 443}, {"port": 443}]))
+    assert result["changed"]
+    assert [rule["start_port"] for rule in result["rules"]] == [80, 443]
+    assert result["rules"][0]["id"] == "rule-1-id"
+    assert cloudstack_api.commands.count("authorizeSecurityGroupIngress") == 1
+    assert len(security_groups["web"]["ingressrule"]) == 2
+
+
+def test_security_group_rules_purge(run_module, cloudstack_api, security_groups):
+    # Rule 2 and 3 duplicate rule 1, rule 4 is not in the policy
+    security_groups["web"]["ingressrule"].extend([get_rule("rule-1-id", 80), get_rule("rule-2-id", 80), get_rule("rule-3-id", 80), get_rule("rule-4-id", 22)])
+
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}], purge=True))
+    assert result["changed"]
+    assert [rule["id"] for rule in result["rules"]] == ["rule-1-id"]
+    assert sorted(rule["id"] for rule in result["purged_rules"]) == ["rule-2-id", "rule-3-id", "rule-4-id"]
+    assert [rule["ruleid"] for rule in security_groups["web"]["ingressrule"]] == ["rule-1-id"]
+
+    # Without purge other rules are kept
+    security_groups["web"]["ingressrule"].append(get_rule("rule-4-id", 22))
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}]))
+    assert not result["changed"]
+    assert len(security_groups["web"]["ingressrule"]) == 2
+
+
+def test_security_group_rules_absent(run_module, cloudstack_api, security_groups):
+    security_groups["web"]["ingressrule"].extend([get_rule("rule-1-id", 80), get_rule("rule-2-id", 80), get_rule("rule-3-id", 22)])
+
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}, {"port": 443}], state="absent"))
+    assert result["changed"]
+    assert sorted(rule["id"] for rule in result["rules"]) == ["rule-1-id", "rule-2-id"]
+    assert [rule["ruleid"] for rule in security_groups["web"]["ingressrule"]] == ["rule-3-id"]
+
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}, {"port": 443}], state="absent"))
+    assert not result["changed"]
+
+
+def test_security_group_rules_check_mode(run_module, cloudstack_api, security_groups):
+    security_groups["web"]["ingressrule"].append(get_rule("rule-1-id", 22))
+
+    result = run_module(security_group_rule, dict(SG_ARGS, rules=[{"port": 80}], purge=True), check_mode=True)
+    assert result["changed"]
+    assert [rule["id"] for rule in result["purged_rules"]] == ["rule-1-id"]
+    assert [command for command in cloudstack_api.commands if not command.startswith("list")] == []
+    assert [rule["ruleid"] for rule in security_groups["web"]["ingressrule"]] == ["rule-1-id"]